@@ -0,0 +1,59 @@
+"""
+Compare repeated function lookups with and without the function cache.
+
+usage: python benchmarks/bench_function_cache.py eptalights.db [--limit N]
+"""
+
+import argparse
+import time
+
+from eptalights import DatabaseAPI
+
+
+def bench(name: str, fids: list[str], lookup, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for fid in fids:
+            lookup(fid)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    per_lookup = best / len(fids) * 1e6
+    print(f"{name:<10} {best:8.3f}s total {per_lookup:10.1f}us/lookup")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dbpath", help="path to an eptalights database")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    uncached_api = DatabaseAPI(
+        args.dbpath, read_only=True, function_cache_max_entries=0
+    )
+    cached_api = DatabaseAPI(
+        args.dbpath, read_only=True, function_cache_max_entries=args.limit
+    )
+
+    fids = [
+        summary.fid
+        for _, summary in zip(range(args.limit), cached_api.search_function_summaries())
+    ]
+    if not fids:
+        parser.error("database has no functions")
+
+    # fill the cache, the timed lookups are all repeated ones
+    cached_api.get_functions_by_ids(fids)
+
+    print(f"{len(fids)} functions")
+    uncached = bench("uncached", fids, uncached_api.get_function_by_id, args.repeat)
+    cached = bench("cached", fids, cached_api.get_function_by_id, args.repeat)
+    print(f"speedup    {uncached / cached:.2f}x")
+    print(cached_api.function_cache_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare the validated and trusted decode paths for function blobs.
+
+usage: python benchmarks/bench_function_decode.py eptalights.db [--limit N]
+"""
+
+import argparse
+import sqlite3
+import time
+
+import msgpack
+
+from eptalights import models
+
+
+def load_blobs(dbpath: str, limit: int) -> list[bytes]:
+    con = sqlite3.connect(f"file:{dbpath}?mode=ro", uri=True)
+    try:
+        rows = con.execute(
+            "SELECT function_data FROM functions ORDER BY fid LIMIT ?", (limit,)
+        ).fetchall()
+    finally:
+        con.close()
+    return [row[0] for row in rows]
+
+
+def bench(name: str, items: list, decode, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            decode(item)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    per_function = best / len(items) * 1e6
+    print(f"{name:<10} {best:8.3f}s total {per_function:10.1f}us/function")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dbpath", help="path to an eptalights database")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    blobs = load_blobs(args.dbpath, args.limit)
+    if not blobs:
+        parser.error("database has no functions")
+
+    # both decode paths leave their input untouched, so unpack once
+    functions_data = [msgpack.unpackb(blob, strict_map_key=False) for blob in blobs]
+
+    for data in functions_data:
+        trusted_model = models.FunctionModel.model_validate_trusted(data)
+        if trusted_model != models.FunctionModel(**data):
+            raise SystemExit(f"decode mismatch for {data['fid']}")
+
+    print(f"{len(blobs)} functions, {sum(map(len, blobs))} bytes")
+    bench(
+        "unpack",
+        blobs,
+        lambda blob: msgpack.unpackb(blob, strict_map_key=False),
+        args.repeat,
+    )
+    validated = bench(
+        "validated",
+        functions_data,
+        lambda data: models.FunctionModel(**data),
+        args.repeat,
+    )
+    trusted = bench(
+        "trusted",
+        functions_data,
+        models.FunctionModel.model_validate_trusted,
+        args.repeat,
+    )
+    print(f"speedup    {validated / trusted:.2f}x (excluding unpack)")
+
+
+if __name__ == "__main__":
+    main()
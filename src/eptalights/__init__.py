@@ -2,6 +2,8 @@ from importlib.metadata import version
 
 from eptalights.core.loader import LoaderAPI
 from eptalights.core.db import DatabaseAPI
+from eptalights.core.writer import DatabaseWriter
+from eptalights.core.diff import diff_databases
 from eptalights.core.api import LocalAPI, RemoteAPI
 
 __version__ = version("eptalights-python")
@@ -10,5 +12,7 @@ __all__ = [
     "LocalAPI",
     "RemoteAPI",
     "DatabaseAPI",
+    "DatabaseWriter",
+    "diff_databases",
     "LoaderAPI",
 ]
@@ -12,6 +12,7 @@ import zipfile
 import io
 from pathlib import Path
 import tempfile
+from typing import Iterable, Iterator
 
 EPTALIGHTS_GRAPHQL_API_ENDPOINT = "http://platform.eptalights.com/graphql/"
 
@@ -26,7 +27,10 @@ class LocalAPI(DatabaseAPI, LoaderAPI):
     ):
         LoaderAPI.__init__(self, config_path)
         if connect_db:
-            self.db_init(self.config.local_database_path)
+            self.db_init(
+                self.config.local_database_path,
+                profile=self.config.local_database_profile,
+            )
 
         """
         Initialize the GraphQL client.
@@ -75,8 +79,14 @@ class LocalAPI(DatabaseAPI, LoaderAPI):
         send locally pending dataflow requests.
         """
         for df_action in self.iter_dataflow_actions(
-            status=models.DataflowActionStatusType.LOCAL_PENDING
+            status=models.DataflowActionStatusType.LOCAL_PENDING, lazy=True
         ):
+            if df_action.request is None:
+                # its function changed since, the request can't be sent as made
+                continue
+
+            # the remote service takes the request with its whole function,
+            # while stored requests may only reference it
             request_b64 = self._encode_dataflow_action_request_to_b64(df_action.request)
             mutation = """
             mutation DataflowActionInit($input: DataflowActionInitInput!) {
@@ -167,21 +177,33 @@ class LocalAPI(DatabaseAPI, LoaderAPI):
         if response_data["response"]["success"] is False:
             raise Exception(response_data["response"]["error_message"])
 
+        df_updates = []
+        completed_remote_action_ids = []
         for dataflow_action in response_data["dataflow_action_results"]:
             if dataflow_action["dataflow_stage"] == "completed":
-                self.update_dataflow_action_by_remote_id(
-                    remote_action_id=dataflow_action["action_id"],
-                    status=models.DataflowActionStatusType.DONE,
-                    response_b64=dataflow_action["dataflow_response_bytes"],
+                df_updates.append(
+                    {
+                        "remote_action_id": dataflow_action["action_id"],
+                        "status": models.DataflowActionStatusType.DONE,
+                        "response_b64": dataflow_action["dataflow_response_bytes"],
+                    }
                 )
-                self._send_remove_dataflow_action(dataflow_action["action_id"])
+                completed_remote_action_ids.append(dataflow_action["action_id"])
 
             if dataflow_action["dataflow_stage"] in ["init", "queued", "processing"]:
-                self.update_dataflow_action_by_remote_id(
-                    remote_action_id=dataflow_action["action_id"],
-                    status=models.DataflowActionStatusType.REMOTE_PROCESSING,
+                df_updates.append(
+                    {
+                        "remote_action_id": dataflow_action["action_id"],
+                        "status": models.DataflowActionStatusType.REMOTE_PROCESSING,
+                    }
                 )
 
+        self.update_dataflow_actions_bulk(df_updates)
+
+        # only remove remote actions once their responses are stored locally
+        for remote_action_id in completed_remote_action_ids:
+            self._send_remove_dataflow_action(remote_action_id)
+
     def dataflow_update(self):
         self._send_local_pending_dataflow_actions()
         self._fetch_and_update_ongoing_dataflow_actions()
@@ -191,20 +213,21 @@ class LocalAPI(DatabaseAPI, LoaderAPI):
         action_id: UUID4 | str,
         wait_for_response: bool = False,
     ):
-        df_action = self.get_dataflow_action(action_id)
+        # poll lazily, only the final action is deserialized
+        df_action = self.get_dataflow_action(action_id, lazy=True)
         if df_action.status == models.DataflowActionStatusType.DONE:
-            return df_action
+            return df_action.model
 
         if wait_for_response is True:
             while True:
-                df_action = self.get_dataflow_action(df_action.action_id)
+                df_action = self.get_dataflow_action(df_action.action_id, lazy=True)
                 if df_action.status == models.DataflowActionStatusType.DONE:
                     break
 
                 self.dataflow_update()
                 time.sleep(random.uniform(3, 7))
 
-        return df_action
+        return df_action.model
 
     def dataflow_run(
         self,
@@ -212,14 +235,43 @@ class LocalAPI(DatabaseAPI, LoaderAPI):
         wait_for_response: bool = False,
         delete_after_read: bool = False,
         use_cached_response: bool = True,
+        engine: str = "remote",
     ) -> models.DataflowActionModel:
-        df_action = self.create_dataflow_action(datafow_request, delete_after_read)
+        """
+        engine is "remote" (the Eptalights service) or "local", which runs
+        the request in-process with the LocalDataflowEngine, offline and
+        without polling. requests with sink_specs need the local engine.
+        """
+        if engine == "local":
+            return self.dataflow_run_local(
+                datafow_request,
+                delete_after_read,
+                use_cached_response=use_cached_response,
+                cache_max_age=self.config.dataflow_cache_ttl_secs,
+            )
+        if engine != "remote":
+            raise ValueError(f"Unknown dataflow engine {engine}")
+        if datafow_request.sink_specs:
+            # the remote service would ignore them
+            raise ValueError("sink_specs need engine='local'")
+
+        df_action = self.create_dataflow_action(
+            datafow_request,
+            delete_after_read,
+            use_cached_response=use_cached_response,
+            cache_max_age=self.config.dataflow_cache_ttl_secs,
+        )
+        if df_action.status == models.DataflowActionStatusType.DONE:
+            # cached response
+            return df_action
+
         self.dataflow_update()
 
         if wait_for_response is True:
             while True:
-                df_action = self.get_dataflow_action(df_action.action_id)
+                df_action = self.get_dataflow_action(df_action.action_id, lazy=True)
                 if df_action.status == models.DataflowActionStatusType.DONE:
+                    df_action = df_action.model
                     break
 
                 self.dataflow_update()
@@ -227,6 +279,28 @@ class LocalAPI(DatabaseAPI, LoaderAPI):
 
         return df_action
 
+    def dataflow_run_many(
+        self,
+        datafow_requests: Iterable[models.DataflowRequestModel],
+        workers: int = None,
+        ordered: bool = True,
+        delete_after_read: bool = False,
+        use_cached_response: bool = True,
+    ) -> Iterator[models.DataflowActionModel]:
+        """
+        run many requests sharing one sink callback with the
+        LocalDataflowEngine, in parallel processes, see
+        DatabaseAPI.dataflow_run_many.
+        """
+        return super().dataflow_run_many(
+            datafow_requests,
+            workers=workers,
+            ordered=ordered,
+            delete_after_read=delete_after_read,
+            use_cached_response=use_cached_response,
+            cache_max_age=self.config.dataflow_cache_ttl_secs,
+        )
+
     def build_init(self, name=None) -> None:
         query = """
         mutation BuildClientInit($input: BuildClientInitInput!) {
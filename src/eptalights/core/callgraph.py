@@ -0,0 +1,322 @@
+import sys
+from array import array
+from collections import deque
+from typing import Iterable, Optional
+
+from eptalights.core.cache import LRUCache
+
+CALLGRAPH_CACHE_MAX_ENTRIES = 4096
+
+# int32 is plenty for node and edge indexes and keeps the graph compact
+ARRAY_TYPECODE = "i"
+# persisted arrays are little-endian whatever the host byte order
+ARRAY_BYTEORDER = "little"
+
+
+def _array_to_bytes(values: array) -> bytes:
+    if sys.byteorder != ARRAY_BYTEORDER:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _array_from_bytes(typecode: str, data: bytes, byteorder: str) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    return values
+
+
+def _csr(num_of_nodes: int, adjacency: list[set]) -> tuple[array, array]:
+    """
+    pack per-node adjacency sets into CSR (offsets, targets) arrays, the
+    neighbours of node i being targets[offsets[i]:offsets[i + 1]].
+    """
+    offsets = array(ARRAY_TYPECODE, [0])
+    targets = array(ARRAY_TYPECODE)
+
+    for node in range(num_of_nodes):
+        targets.extend(sorted(adjacency[node]))
+        offsets.append(len(targets))
+
+    return offsets, targets
+
+
+class CallGraph:
+    """
+    A whole-program call graph over function ids.
+
+    Nodes are fids, numbered in sorted order. Caller -> callee edges, their
+    reverse, and calls to functions that are not in the database
+    (`external_callees`, e.g libc) are kept in compact CSR integer arrays.
+
+    Callee names are resolved to fids by function name, preferring
+    functions defined in the caller's own file (e.g static functions) and
+    otherwise linking to every function with that name.
+
+    Query results are memoized, so treat returned values as read-only.
+    """
+
+    def __init__(
+        self,
+        fids: list[str],
+        offsets: array,
+        targets: array,
+        reverse_offsets: array,
+        reverse_targets: array,
+        external_names: list[str],
+        external_offsets: array,
+        external_targets: array,
+        cache_max_entries: int = CALLGRAPH_CACHE_MAX_ENTRIES,
+    ):
+        self.fids = fids
+        self.offsets = offsets
+        self.targets = targets
+        self.reverse_offsets = reverse_offsets
+        self.reverse_targets = reverse_targets
+        self.external_names = external_names
+        self.external_offsets = external_offsets
+        self.external_targets = external_targets
+
+        self._node_by_fid = {fid: node for node, fid in enumerate(fids)}
+        self._cache = LRUCache(max_entries=cache_max_entries)
+
+    @classmethod
+    def build(
+        cls,
+        functions: Iterable[tuple[str, str, str]],
+        callsites: Iterable[tuple[str, str]],
+    ) -> "CallGraph":
+        """
+        build from (fid, name, filepath) function rows and
+        (caller fid, callee name) callsite rows.
+        """
+        functions = sorted(functions)
+        fids = [fid for fid, _, _ in functions]
+        node_by_fid = {fid: node for node, fid in enumerate(fids)}
+        filepath_by_node = [filepath for _, _, filepath in functions]
+
+        nodes_by_name = {}
+        for node, (_, name, _) in enumerate(functions):
+            nodes_by_name.setdefault(name, []).append(node)
+
+        callees = [set() for _ in fids]
+        callers = [set() for _ in fids]
+        external_callees = [set() for _ in fids]
+        external_names = {}
+
+        for caller_fid, callee_name in callsites:
+            caller = node_by_fid.get(caller_fid)
+            if caller is None:
+                continue
+
+            candidates = nodes_by_name.get(callee_name)
+            if not candidates:
+                external = external_names.setdefault(callee_name, len(external_names))
+                external_callees[caller].add(external)
+                continue
+
+            local_candidates = [
+                node
+                for node in candidates
+                if filepath_by_node[node] == filepath_by_node[caller]
+            ]
+            for callee in local_candidates or candidates:
+                callees[caller].add(callee)
+                callers[callee].add(caller)
+
+        offsets, targets = _csr(len(fids), callees)
+        reverse_offsets, reverse_targets = _csr(len(fids), callers)
+        external_offsets, external_targets = _csr(len(fids), external_callees)
+
+        return cls(
+            fids=fids,
+            offsets=offsets,
+            targets=targets,
+            reverse_offsets=reverse_offsets,
+            reverse_targets=reverse_targets,
+            external_names=list(external_names),
+            external_offsets=external_offsets,
+            external_targets=external_targets,
+        )
+
+    def to_dict(self) -> dict:
+        """
+        a msgpack friendly representation, see from_dict.
+        """
+        return {
+            "typecode": ARRAY_TYPECODE,
+            "byteorder": ARRAY_BYTEORDER,
+            "fids": self.fids,
+            "offsets": _array_to_bytes(self.offsets),
+            "targets": _array_to_bytes(self.targets),
+            "reverse_offsets": _array_to_bytes(self.reverse_offsets),
+            "reverse_targets": _array_to_bytes(self.reverse_targets),
+            "external_names": self.external_names,
+            "external_offsets": _array_to_bytes(self.external_offsets),
+            "external_targets": _array_to_bytes(self.external_targets),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CallGraph":
+        # graphs persisted before the byte order was recorded used the
+        # native one of the host that wrote them
+        byteorder = data.get("byteorder", sys.byteorder)
+
+        def load_array(key: str) -> array:
+            return _array_from_bytes(data["typecode"], data[key], byteorder)
+
+        return cls(
+            fids=data["fids"],
+            offsets=load_array("offsets"),
+            targets=load_array("targets"),
+            reverse_offsets=load_array("reverse_offsets"),
+            reverse_targets=load_array("reverse_targets"),
+            external_names=data["external_names"],
+            external_offsets=load_array("external_offsets"),
+            external_targets=load_array("external_targets"),
+        )
+
+    @property
+    def num_of_functions(self) -> int:
+        return len(self.fids)
+
+    @property
+    def num_of_edges(self) -> int:
+        return len(self.targets)
+
+    def _node(self, fid: str) -> int:
+        node = self._node_by_fid.get(fid)
+        if node is None:
+            raise ValueError(f"Function with id {fid} not found")
+        return node
+
+    def _successors(self, node: int) -> array:
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def _predecessors(self, node: int) -> array:
+        return self.reverse_targets[
+            self.reverse_offsets[node] : self.reverse_offsets[node + 1]
+        ]
+
+    def _memoized(self, key: tuple, compute):
+        result = self._cache.get(key)
+        if result is None:
+            result = compute()
+            self._cache.put(key, result)
+        return result
+
+    def callees(self, fid: str) -> tuple[str, ...]:
+        node = self._node(fid)
+        return self._memoized(
+            ("callees", node),
+            lambda: tuple(self.fids[callee] for callee in self._successors(node)),
+        )
+
+    def callers(self, fid: str) -> tuple[str, ...]:
+        node = self._node(fid)
+        return self._memoized(
+            ("callers", node),
+            lambda: tuple(self.fids[caller] for caller in self._predecessors(node)),
+        )
+
+    def external_callees(self, fid: str) -> tuple[str, ...]:
+        """
+        names called by fid that don't resolve to a function in the
+        database, e.g library functions.
+        """
+        node = self._node(fid)
+        start, stop = self.external_offsets[node], self.external_offsets[node + 1]
+        return tuple(
+            self.external_names[external]
+            for external in self.external_targets[start:stop]
+        )
+
+    def _bfs(self, node: int, depth: Optional[int], neighbours) -> dict[int, int]:
+        distances = {node: 0}
+        queue = deque([node])
+
+        while queue:
+            current = queue.popleft()
+            distance = distances[current]
+            if depth is not None and distance >= depth:
+                continue
+
+            for neighbour in neighbours(current):
+                if neighbour not in distances:
+                    distances[neighbour] = distance + 1
+                    queue.append(neighbour)
+
+        return distances
+
+    def reachable_from(self, fid: str, depth: Optional[int] = None) -> dict[str, int]:
+        """
+        functions transitively called by fid, within depth calls if given,
+        mapped to their call distance from fid (in BFS order, fid excluded).
+        """
+        node = self._node(fid)
+
+        def compute():
+            distances = self._bfs(node, depth, self._successors)
+            return {
+                self.fids[other]: distance
+                for other, distance in distances.items()
+                if other != node
+            }
+
+        return self._memoized(("reachable_from", node, depth), compute)
+
+    def paths_between(
+        self,
+        src_fid: str,
+        dst_fid: str,
+        max_depth: int = 10,
+        max_paths: int = 100,
+    ) -> tuple[tuple[str, ...], ...]:
+        """
+        call paths (lists of fids, both ends included) from src_fid to
+        dst_fid, without cycles and at most max_depth calls long. stops
+        after max_paths paths.
+        """
+        src, dst = self._node(src_fid), self._node(dst_fid)
+
+        def compute():
+            # only walk nodes that can still reach dst in the calls left
+            distance_to_dst = self._bfs(dst, max_depth, self._predecessors)
+            if src not in distance_to_dst:
+                return ()
+
+            paths = []
+            path = [src]
+            on_path = {src}
+
+            def walk(node: int):
+                if len(paths) >= max_paths:
+                    return
+                if node == dst:
+                    paths.append(tuple(self.fids[n] for n in path))
+                    return
+
+                calls_left = max_depth - (len(path) - 1)
+                for callee in self._successors(node):
+                    if callee in on_path:
+                        continue
+                    if distance_to_dst.get(callee, max_depth + 1) > calls_left - 1:
+                        continue
+
+                    path.append(callee)
+                    on_path.add(callee)
+                    walk(callee)
+                    on_path.discard(callee)
+                    path.pop()
+
+            walk(src)
+            return tuple(paths)
+
+        return self._memoized(
+            ("paths_between", src, dst, max_depth, max_paths), compute
+        )
+
+    def clear_cache(self):
+        self._cache.clear()
@@ -4,7 +4,8 @@ import os
 import pathlib
 import time
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy.exc import OperationalError
 from tabulate import tabulate
 import eptalights
 from eptalights import models
@@ -135,12 +136,12 @@ def search_function():
         raise Exception(f"transformed_output not found - {api.local_database_path}")
 
     table = []
-    for fn in api.search_functions(filter_by_name=args.query):
+    for fn in api.search_function_summaries(filter_by_name=args.query):
         table.append(
             [
                 fn.fid,
                 fn.name,
-                len(fn.steps),
+                fn.num_of_steps,
             ]
         )
 
@@ -152,6 +153,67 @@ def search_function():
     print(tabulate(table, table_headers, tablefmt="grid"))
 
 
+def diff_builds():
+    parser = argparse.ArgumentParser(
+        description="list functions added, removed or changed between two builds"
+    )
+    parser.add_argument("old_database")
+    parser.add_argument("new_database")
+    parser.add_argument("-a", "--all", action="store_true", help="include unchanged")
+    args = parser.parse_args()
+
+    for database_path in (args.old_database, args.new_database):
+        if not pathlib.Path(database_path).exists():
+            raise Exception(f"database not found - {database_path}")
+
+    counts = {}
+    for diff in eptalights.diff_databases(
+        args.old_database, args.new_database, include_unchanged=args.all
+    ):
+        counts[diff.diff_type.value] = counts.get(diff.diff_type.value, 0) + 1
+        print(f"{diff.diff_type.value}\t{diff.fid}")
+
+    _LOG.info(f"diff: {counts}")
+
+
+def index_database():
+    parser = argparse.ArgumentParser(
+        description="fill the summary columns and indexes of a database"
+    )
+    parser.add_argument("database")
+    parser.add_argument("--steps", action="store_true", help="build the steps index")
+    parser.add_argument(
+        "--variables", action="store_true", help="build the variables index"
+    )
+    parser.add_argument(
+        "--components", action="store_true", help="store function components"
+    )
+    parser.add_argument("--rebuild", action="store_true", help="rebuild all rows")
+    args = parser.parse_args()
+
+    if not pathlib.Path(args.database).exists():
+        raise Exception(f"database not found - {args.database}")
+
+    api = eptalights.DatabaseAPI(args.database)
+
+    counts = {
+        "summaries": api.build_function_summaries(rebuild=args.rebuild),
+    }
+    if args.steps:
+        counts["steps"] = api.build_steps_index(rebuild=args.rebuild)
+    if args.variables:
+        counts["variables"] = api.build_variables_index(rebuild=args.rebuild)
+    if args.components:
+        counts["components"] = api.build_function_components(rebuild=args.rebuild)
+
+    try:
+        api.build_search_index()
+    except OperationalError:
+        _LOG.warning("sqlite has no FTS5 trigram support, name searches use LIKE")
+
+    _LOG.info(f"functions indexed: {counts}")
+
+
 def decompile_all():
     parser = argparse.ArgumentParser(description="search function by name or filename")
     parser.add_argument("-p", "--project", required=False, default="./eptalights.toml")
@@ -211,7 +273,7 @@ def dataflow_action_list():
         status = models.DataflowActionStatusType(args.status.upper())
 
     table = []
-    for df_action in api.iter_dataflow_actions(status=status):
+    for df_action in api.iter_dataflow_action_summaries(status=status):
         table.append(
             [
                 df_action.action_id,
@@ -250,6 +312,19 @@ def dataflow_actions_clear():
     parser = argparse.ArgumentParser(description="Update dataflow actions")
     parser.add_argument("-p", "--project", required=False, default="./eptalights.toml")
     parser.add_argument("-s", "--status", required=False, default=None)
+    parser.add_argument(
+        "-o",
+        "--older-than-days",
+        type=float,
+        required=False,
+        default=None,
+        help="only delete actions created more than this many days ago",
+    )
+    parser.add_argument(
+        "--stale",
+        action="store_true",
+        help="only delete responses of functions that changed since",
+    )
     args = parser.parse_args()
 
     api = eptalights.LocalAPI(args.project)
@@ -265,5 +340,13 @@ def dataflow_actions_clear():
     """
     delete existing actions
     """
-    for df_action in api.iter_dataflow_actions(status=status):
-        api.delete_dataflow_action(df_action.action_id)
+    if args.stale:
+        num_of_deleted = api.invalidate_dataflow_cache()
+    else:
+        older_than = None
+        if args.older_than_days is not None:
+            older_than = timedelta(days=args.older_than_days)
+        num_of_deleted = api.delete_dataflow_actions(
+            status=status, older_than=older_than
+        )
+    _LOG.info(f"deleted {num_of_deleted} dataflow actions")
@@ -0,0 +1,946 @@
+import time
+from collections import deque
+from typing import Callable, NamedTuple, Optional
+
+from eptalights import models
+
+# same bounds as the remote service
+DATAFLOW_MAX_TIMEOUT_SECS = 600
+
+# functions a callee name (or a function's callers) resolve to, at most
+DATAFLOW_MAX_RESOLVED_FUNCTIONS = 32
+
+# for all parameters, when summarizing a function
+DATAFLOW_SUMMARY_TIMEOUT_SECS = 10
+
+
+class DataflowTimeout(Exception):
+    pass
+
+
+class _WorkItem(NamedTuple):
+    """
+    an SSA version reached by the tracked data, with the path that got there.
+    """
+
+    fid: str
+    ssa_name: str
+    # uses of ssa_name must be reachable from this step, None for any use
+    from_step_index: Optional[int]
+    # whether a use at from_step_index itself counts (i.e it isn't the def)
+    include_from_step: bool
+    record_attribute: Optional[str]
+    events: tuple
+    passthru_callsites: tuple
+    data_mutation_count: int
+    # (caller fid, call step index) of the calls descended into, innermost last
+    call_stack: tuple = ()
+    # calls descended into or returned out of to reach ssa_name
+    call_depth: int = 0
+
+
+class _FunctionIndex:
+    """
+    per-function lookups the engine needs, built once per function.
+    """
+
+    def __init__(self, function: models.FunctionModel):
+        self.function = function
+        self.steps = {step.step_index: step for step in function.steps}
+
+        self.ssa_variables = {}
+        self.phi_results = {}
+        for variable in function.variable_manager.variables.values():
+            for ssa_name, ssa_variable in variable.unique_ssa_variables.items():
+                self.ssa_variables[ssa_name] = (variable, ssa_variable)
+            for phi_ssa_name, incoming_ssa_names in variable.phi_ssa_variables.items():
+                for incoming_ssa_name in incoming_ssa_names:
+                    self.phi_results.setdefault(incoming_ssa_name, []).append(
+                        phi_ssa_name
+                    )
+
+        self.block_of_step = {}
+        for block_index, step_indexes in function.cfg.basicblock_steps.items():
+            for step_index in step_indexes:
+                self.block_of_step[step_index] = block_index
+        for step in function.steps:
+            if step.basicblock_index is not None:
+                self.block_of_step.setdefault(step.step_index, step.basicblock_index)
+
+        self._reachable_blocks = {}
+
+    def callsite_id(self, step_index: int) -> Optional[str]:
+        callsite_ssa_name = self.function.callsite_manager.step_callsites.get(
+            step_index
+        )
+        if callsite_ssa_name is None:
+            return None
+        callsite = self.function.callsite_manager.callsites.get(callsite_ssa_name)
+        if callsite is not None and callsite.cid:
+            return callsite.cid
+        return f"{self.function.fid}:{callsite_ssa_name}"
+
+    def param_entry_ssa_names(self, arg_index: int) -> list[str]:
+        """
+        the SSA versions of the arg_index-th parameter on function entry,
+        i.e those not defined by any step.
+        """
+        function_args = self.function.variable_manager.function_args
+        if arg_index >= len(function_args):
+            return []
+
+        variable = self.function.variable_manager.variables.get(
+            function_args[arg_index]
+        )
+        if variable is None:
+            return []
+
+        ssa_variables = variable.unique_ssa_variables.values()
+        return [
+            ssa_variable.ssa_name
+            for ssa_variable in ssa_variables
+            if not ssa_variable.variable_defined_at_steps
+        ] or [ssa_variable.ssa_name for ssa_variable in ssa_variables]
+
+    def reachable_blocks(self, block_index: int) -> set:
+        """
+        blocks reachable from block_index through at least one edge.
+        """
+        if block_index not in self._reachable_blocks:
+            edges = self.function.cfg.basicblock_edges
+            reachable = set()
+            queue = deque(edges.get(block_index, []))
+            while queue:
+                block = queue.popleft()
+                if block in reachable:
+                    continue
+                reachable.add(block)
+                queue.extend(edges.get(block, []))
+            self._reachable_blocks[block_index] = reachable
+        return self._reachable_blocks[block_index]
+
+    def is_reachable(self, from_step_index: int, step_index: int) -> bool:
+        from_block = self.block_of_step.get(from_step_index)
+        block = self.block_of_step.get(step_index)
+        if from_block is None or block is None:
+            # no CFG information, fall back to step order
+            return step_index >= from_step_index
+        if block == from_block and step_index >= from_step_index:
+            return True
+        return block in self.reachable_blocks(from_block)
+
+
+def _arg_indexes(step, ssa_name: str) -> list[int]:
+    """
+    positions of the arguments of a CALL step reading ssa_name, either
+    directly or inside another operand (e.g `&x`, `x->data`).
+    """
+    arg_indexes = []
+    for arg_index, operand in enumerate(step.fargs):
+        if operand.ssa_name == ssa_name or any(
+            token.token_type == models.TokenType.IS_VARIABLE and token.value == ssa_name
+            for token in operand.tokens
+        ):
+            arg_indexes.append(arg_index)
+    return arg_indexes
+
+
+class SinkMatcher:
+    """
+    sink specs compiled for matching: grouped by op, with their function
+    names and argument positions as sets.
+    """
+
+    def __init__(self, sink_specs: list[models.SinkSpecModel]):
+        self._specs_by_op = {}
+        for spec in sink_specs:
+            self._specs_by_op.setdefault(spec.op, []).append(
+                (
+                    frozenset(spec.fnames) or None,
+                    frozenset(spec.arg_indexes) or None,
+                    spec.data_direction,
+                    spec.result,
+                )
+            )
+
+    def match(
+        self, event: models.DataflowEventModel, step
+    ) -> Optional[models.SinkResultType]:
+        """
+        the result of the first spec matching event, or None.
+        """
+        for fnames, arg_indexes, data_direction, result in self._specs_by_op.get(
+            event.op, ()
+        ):
+            if data_direction is not None and event.data_direction != data_direction:
+                continue
+            if fnames is not None and step.fname not in fnames:
+                continue
+            if arg_indexes is not None and arg_indexes.isdisjoint(
+                _arg_indexes(step, event.ssa_variable_name)
+            ):
+                continue
+            return result
+        return None
+
+
+class LocalDataflowEngine:
+    """
+    Runs a DataflowRequestModel locally, following the source variable
+    through the SSA def-use information of the function, and with function
+    resolvers, across the functions it calls and is called by.
+
+    Starting from the SSA versions of the source variable, a worklist visits
+    every use of a tracked version that is reachable in the CFG, emitting a
+    "read" event, and continues into the versions defined at that step
+    (assignments, call results) and the phi versions merging it, emitting
+    "write" events. Every event goes to the request's sink specs, compiled
+    into a SinkMatcher, and if none matches, to the sink callback: OK
+    records the path so far, STOP abandons it, CONTINUE follows the data
+    further.
+    Each (function, SSA version, record attribute, call stack) is visited
+    once, so paths are the shortest ones reaching each sink.
+
+    Calls are followed up to the request's max_call_depth:
+
+    - `resolve_callees(function, fname)` returns the functions a call to
+      fname may reach. A tracked argument continues from the matching
+      parameter of each callee, and the callee's returns flow back into the
+      destination of that call. Calls that are not resolved (or past
+      max_call_depth) pass the data from their arguments to their
+      destination, as in the intra-procedural case.
+    - `resolve_callers(function)` returns (caller, call step index) pairs.
+      Returning the tracked data from the function the analysis started in
+      (or ascended to) continues at the destination of every such call.
+    - `resolve_summary(function, deadline)` returns a
+      FunctionDataflowSummaryModel (see summarize_function_dataflow),
+      computed by time.monotonic() deadline at the latest. At resolved
+      calls past max_call_depth, the destination is only reached if a
+      callee may return the tracked argument, and the data continues at
+      the arguments a callee writes it into. Calls that are descended into
+      continue there when a callee stores the data through a parameter,
+      e.g `*out = x`.
+
+    With strict_record_attributes_tracking, a use that reads specific
+    record attributes of the tracked variable is skipped unless the tracked
+    attribute is among them.
+
+    Past timeout_secs, the paths found so far are returned with
+    status=False. Exceptions raised by the sink callback or the resolvers
+    are not caught.
+
+    Example:
+        engine = LocalDataflowEngine()
+        df_response = engine.run(df_request)
+    """
+
+    def __init__(
+        self,
+        resolve_callees: Callable[
+            [models.FunctionModel, str], list[models.FunctionModel]
+        ] = None,
+        resolve_callers: Callable[
+            [models.FunctionModel], list[tuple[models.FunctionModel, int]]
+        ] = None,
+        resolve_summary: Callable[
+            [models.FunctionModel], Optional[models.FunctionDataflowSummaryModel]
+        ] = None,
+    ):
+        self.resolve_callees = resolve_callees
+        self.resolve_callers = resolve_callers
+        self.resolve_summary = resolve_summary
+
+    def run(
+        self, df_request: models.DataflowRequestModel, deadline: float = None
+    ) -> models.DataflowResponseModel:
+        """
+        deadline (a time.monotonic() value) further bounds the request's
+        timeout_secs, e.g to share one time budget between runs.
+        """
+        timeout_secs = min(df_request.timeout_secs, DATAFLOW_MAX_TIMEOUT_SECS)
+        run_deadline = time.monotonic() + timeout_secs
+        if deadline is not None:
+            run_deadline = min(run_deadline, deadline)
+        dataflow_run = _DataflowRun(self, df_request, run_deadline)
+
+        try:
+            roots = dataflow_run.roots()
+            if not roots:
+                return models.DataflowResponseModel(
+                    status=False,
+                    error_message=(
+                        f"Source variable {df_request.source_variable_name} not found"
+                    ),
+                )
+
+            dataflow_run.walk(roots)
+
+        except DataflowTimeout:
+            return models.DataflowResponseModel(
+                status=False,
+                paths=dataflow_run.paths,
+                error_message=f"Dataflow analysis timed out after {timeout_secs} secs",
+            )
+
+        return models.DataflowResponseModel(status=True, paths=dataflow_run.paths)
+
+
+class _DataflowRun:
+    """
+    the state of one LocalDataflowEngine.run().
+    """
+
+    def __init__(
+        self,
+        engine: LocalDataflowEngine,
+        df_request: models.DataflowRequestModel,
+        deadline: float,
+    ):
+        self.engine = engine
+        self.df_request = df_request
+        self.deadline = deadline
+        self.paths = []
+        self.sink_matcher = SinkMatcher(df_request.sink_specs)
+
+        root_index = _FunctionIndex(df_request.function)
+        self.root_fid = df_request.function.fid
+        self.function_indexes = {self.root_fid: root_index}
+        self.callees = {}
+        self.summaries = {}
+
+    def check_deadline(self):
+        if time.monotonic() > self.deadline:
+            raise DataflowTimeout()
+
+    def function_index(self, function: models.FunctionModel) -> _FunctionIndex:
+        function_index = self.function_indexes.get(function.fid)
+        if function_index is None:
+            function_index = _FunctionIndex(function)
+            self.function_indexes[function.fid] = function_index
+        return function_index
+
+    def resolve_callees(
+        self, function_index: _FunctionIndex, fname: str
+    ) -> list[_FunctionIndex]:
+        key = (function_index.function.fid, fname)
+        if key not in self.callees:
+            self.callees[key] = [
+                self.function_index(callee)
+                for callee in self.engine.resolve_callees(
+                    function_index.function, fname
+                )
+            ]
+        return self.callees[key]
+
+    def resolve_summaries(
+        self, callees: list[_FunctionIndex]
+    ) -> Optional[list[models.FunctionDataflowSummaryModel]]:
+        """
+        the summaries of all callees, or None if any is unknown or partial.
+        """
+        summaries = []
+        for callee_index in callees:
+            fid = callee_index.function.fid
+            if fid not in self.summaries:
+                self.summaries[fid] = self.engine.resolve_summary(
+                    callee_index.function, self.deadline
+                )
+                # computing the summary may have used up the time left
+                self.check_deadline()
+
+            summary = self.summaries[fid]
+            if summary is None or not summary.complete:
+                return None
+            summaries.append(summary)
+        return summaries
+
+    def roots(self) -> list[_WorkItem]:
+        """
+        the SSA versions the source variable (a variable or SSA name) starts
+        from. with start_from_step_index, only versions defined or used at
+        that step, and only their uses reachable from it.
+        """
+        function_index = self.function_indexes[self.root_fid]
+        source = self.df_request.source_variable_name
+        if source in function_index.ssa_variables:
+            ssa_names = [source]
+        else:
+            variable = function_index.function.variable_manager.variables.get(source)
+            if variable is None:
+                return []
+            ssa_names = list(variable.unique_ssa_variables)
+
+        start_step_index = self.df_request.start_from_step_index
+        roots = []
+        for ssa_name in ssa_names:
+            _, ssa_variable = function_index.ssa_variables[ssa_name]
+
+            if start_step_index is None:
+                from_step_index = min(
+                    ssa_variable.variable_defined_at_steps, default=None
+                )
+                include_from_step = False
+            elif start_step_index in ssa_variable.variable_defined_at_steps:
+                from_step_index = start_step_index
+                include_from_step = False
+            elif start_step_index in ssa_variable.variable_used_at_steps:
+                from_step_index = start_step_index
+                include_from_step = True
+            else:
+                continue
+
+            record_attributes = ssa_variable.record_attributes_defined_at_steps.get(
+                from_step_index, []
+            )
+            roots.append(
+                _WorkItem(
+                    fid=self.root_fid,
+                    ssa_name=ssa_name,
+                    from_step_index=from_step_index,
+                    include_from_step=include_from_step,
+                    record_attribute=(
+                        record_attributes[0] if record_attributes else None
+                    ),
+                    events=(),
+                    passthru_callsites=(),
+                    data_mutation_count=0,
+                )
+            )
+
+        return roots
+
+    def walk(self, roots: list[_WorkItem]):
+        def visit_key(item: _WorkItem) -> tuple:
+            return (item.fid, item.ssa_name, item.record_attribute, item.call_stack)
+
+        worklist = deque(roots)
+        visited = {visit_key(item) for item in roots}
+
+        while worklist:
+            self.check_deadline()
+
+            item = worklist.popleft()
+            for next_item in self.follow(item):
+                key = visit_key(next_item)
+                if key in visited:
+                    continue
+                visited.add(key)
+                worklist.append(next_item)
+
+    def event(
+        self,
+        function_index: _FunctionIndex,
+        step,
+        variable: models.VariableModel,
+        ssa_variable: models.SSAVariableModel,
+        data_direction: str,
+        record_attribute: Optional[str],
+        depth: int,
+    ) -> models.DataflowEventModel:
+        step_index = step.step_index
+        used_inside_other_tokens = (
+            ssa_variable.used_inside_other_tokenized_operand_tokens_at_step or {}
+        )
+        return models.DataflowEventModel(
+            op=step.op,
+            lineno=step.lineno,
+            variable_name=variable.name,
+            ssa_variable_name=ssa_variable.ssa_name,
+            ssa_version=ssa_variable.ssa_version,
+            data_direction=data_direction,
+            var_depth_pos=depth,
+            step_index=step_index,
+            record_attributes_defined_here=(
+                ssa_variable.record_attributes_defined_at_steps.get(step_index, [])
+            ),
+            record_attributes_used_here=(
+                ssa_variable.record_attributes_used_at_steps.get(step_index, [])
+            ),
+            used_inside_other_tokenized_operand_tokens_here=(
+                step_index in used_inside_other_tokens
+            ),
+            current_record_attibute_tracked=record_attribute,
+            fid=function_index.function.fid,
+        )
+
+    def sink(
+        self,
+        function_index: _FunctionIndex,
+        step,
+        event: models.DataflowEventModel,
+        previous_events: tuple,
+    ) -> models.SinkResultType:
+        sink_result = self.sink_matcher.match(event, step)
+        if sink_result is not None:
+            return sink_result
+        if self.df_request.sink_callback_fn is None:
+            return models.SinkResultType.CONTINUE
+
+        state = models.DataflowStateModel(
+            current_event=event,
+            current_function=function_index.function,
+            current_step=step,
+            previous_events=list(previous_events),
+        )
+        return self.df_request.sink_callback_fn(state)
+
+    def follow(self, item: _WorkItem):
+        """
+        yields the work items reached from the uses of item's SSA version,
+        recording the paths its sinks accept.
+        """
+        function_index = self.function_indexes[item.fid]
+        if item.ssa_name not in function_index.ssa_variables:
+            return
+
+        variable, ssa_variable = function_index.ssa_variables[item.ssa_name]
+        depth = len(item.events)
+
+        for step_index in sorted(set(ssa_variable.variable_used_at_steps)):
+            self.check_deadline()
+
+            step = function_index.steps.get(step_index)
+            if step is None or step.op == models.OpType.LABEL:
+                continue
+
+            if item.from_step_index is not None:
+                if step_index == item.from_step_index and not item.include_from_step:
+                    continue
+                if not function_index.is_reachable(item.from_step_index, step_index):
+                    continue
+
+            record_attributes_used = ssa_variable.record_attributes_used_at_steps.get(
+                step_index, []
+            )
+            if (
+                self.df_request.strict_record_attributes_tracking
+                and item.record_attribute is not None
+                and record_attributes_used
+                and item.record_attribute not in record_attributes_used
+            ):
+                continue
+
+            event = self.event(
+                function_index,
+                step,
+                variable,
+                ssa_variable,
+                "read",
+                item.record_attribute,
+                depth,
+            )
+            events = item.events + (event,)
+
+            passthru_callsites = item.passthru_callsites
+            if step.op == models.OpType.CALL:
+                callsite_id = function_index.callsite_id(step_index)
+                if callsite_id is not None and callsite_id not in passthru_callsites:
+                    passthru_callsites = passthru_callsites + (callsite_id,)
+
+            sink_result = self.sink(function_index, step, event, item.events)
+            if sink_result == models.SinkResultType.OK:
+                self.paths.append(
+                    models.DataflowPathModel(
+                        events=list(events),
+                        passthru_callsites=list(passthru_callsites),
+                        data_mutation_count=item.data_mutation_count,
+                    )
+                )
+                continue
+            if sink_result == models.SinkResultType.STOP:
+                continue
+
+            if step.op == models.OpType.CALL:
+                yield from self.follow_call(
+                    function_index, item, step, events, passthru_callsites
+                )
+                continue
+
+            if step.op == models.OpType.RETURN:
+                yield from self.follow_return(
+                    function_index, item, events, passthru_callsites
+                )
+                continue
+
+            yield from self.follow_store(
+                function_index, item, step, events, passthru_callsites
+            )
+            yield from self.follow_definitions(
+                function_index,
+                step,
+                item,
+                events,
+                passthru_callsites,
+                call_stack=item.call_stack,
+                call_depth=item.call_depth,
+            )
+
+        for phi_ssa_name in function_index.phi_results.get(item.ssa_name, []):
+            yield item._replace(
+                ssa_name=phi_ssa_name, from_step_index=None, include_from_step=True
+            )
+
+    def call_arg_indexes(
+        self, function_index: _FunctionIndex, item: _WorkItem, step
+    ) -> list[int]:
+        callsite = function_index.function.callsite_manager.at_step(step.step_index)
+        if (
+            callsite is not None
+            and item.ssa_name not in callsite.ssa_variables_used_as_callsite_arg
+        ):
+            # e.g read as the called function pointer, not as an argument
+            return []
+        return _arg_indexes(step, item.ssa_name)
+
+    def follow_call(
+        self,
+        function_index: _FunctionIndex,
+        item: _WorkItem,
+        step,
+        events: tuple,
+        passthru_callsites: tuple,
+    ):
+        """
+        the tracked argument continues from the matching parameter of every
+        callee, the call's destination being reached from their returns.
+        past max_call_depth, the callees' summaries tell whether it reaches
+        the destination, and without them (e.g library functions) it does.
+        """
+        descend = item.call_depth < self.df_request.max_call_depth
+        arg_indexes = self.call_arg_indexes(function_index, item, step)
+
+        callees = []
+        if (
+            arg_indexes
+            and self.engine.resolve_callees is not None
+            and (descend or self.engine.resolve_summary is not None)
+        ):
+            callees = self.resolve_callees(function_index, step.fname)
+
+        # calls descended into are followed precisely, see follow_store
+        summaries = None
+        if callees and not descend and self.engine.resolve_summary is not None:
+            summaries = self.resolve_summaries(callees)
+
+        definitions = dict(call_stack=item.call_stack, call_depth=item.call_depth)
+
+        if summaries is not None:
+            written_arg_indexes = {
+                written_arg_index
+                for summary in summaries
+                for arg_index in arg_indexes
+                for written_arg_index in summary.params_to_params.get(arg_index, [])
+            }
+            yield from self.follow_definitions(
+                function_index,
+                step,
+                item,
+                events,
+                passthru_callsites,
+                ssa_names=[
+                    step.fargs[arg_index].ssa_name
+                    for arg_index in sorted(written_arg_indexes)
+                    if arg_index < len(step.fargs)
+                ],
+                **definitions,
+            )
+
+        if callees and descend:
+            call_stack = item.call_stack + (
+                (function_index.function.fid, step.step_index),
+            )
+            for callee_index in callees:
+                for arg_index in arg_indexes:
+                    for ssa_name in callee_index.param_entry_ssa_names(arg_index):
+                        yield _WorkItem(
+                            fid=callee_index.function.fid,
+                            ssa_name=ssa_name,
+                            from_step_index=None,
+                            include_from_step=True,
+                            record_attribute=item.record_attribute,
+                            events=events,
+                            passthru_callsites=passthru_callsites,
+                            data_mutation_count=item.data_mutation_count,
+                            call_stack=call_stack,
+                            call_depth=item.call_depth + 1,
+                        )
+            return
+
+        if summaries is not None and not any(
+            arg_index in summary.params_to_return
+            for summary in summaries
+            for arg_index in arg_indexes
+        ):
+            return
+
+        yield from self.follow_definitions(
+            function_index, step, item, events, passthru_callsites, **definitions
+        )
+
+    def follow_store(
+        self,
+        function_index: _FunctionIndex,
+        item: _WorkItem,
+        step,
+        events: tuple,
+        passthru_callsites: tuple,
+    ):
+        """
+        data stored through a parameter of a function that was descended
+        into, e.g `*out = x`, continues at the matching argument of the call.
+        """
+        if (
+            not item.call_stack
+            or step.op != models.OpType.ASSIGN
+            or step.dst is None
+            or step.dst.ssa_name in step.ssa_variables_defined_here
+        ):
+            return
+
+        function_args = function_index.function.variable_manager.function_args
+        if step.dst.variable_name not in function_args:
+            return
+        arg_index = function_args.index(step.dst.variable_name)
+
+        caller_fid, call_step_index = item.call_stack[-1]
+        caller_index = self.function_indexes[caller_fid]
+        call_step = caller_index.steps[call_step_index]
+        if arg_index >= len(call_step.fargs):
+            return
+
+        yield from self.follow_definitions(
+            caller_index,
+            call_step,
+            item,
+            events,
+            passthru_callsites,
+            call_stack=item.call_stack[:-1],
+            call_depth=item.call_depth,
+            ssa_names=[call_step.fargs[arg_index].ssa_name],
+        )
+
+    def follow_return(
+        self,
+        function_index: _FunctionIndex,
+        item: _WorkItem,
+        events: tuple,
+        passthru_callsites: tuple,
+    ):
+        """
+        returned data flows into the destination of the call that was
+        descended into, or without one, of every call to the function.
+        """
+        if item.call_stack:
+            caller_fid, call_step_index = item.call_stack[-1]
+            caller_index = self.function_indexes[caller_fid]
+            yield from self.follow_definitions(
+                caller_index,
+                caller_index.steps[call_step_index],
+                item,
+                events,
+                passthru_callsites,
+                call_stack=item.call_stack[:-1],
+                call_depth=item.call_depth,
+            )
+            return
+
+        if (
+            self.engine.resolve_callers is None
+            or item.call_depth >= self.df_request.max_call_depth
+        ):
+            return
+
+        for caller, call_step_index in self.engine.resolve_callers(
+            function_index.function
+        ):
+            caller_index = self.function_index(caller)
+            step = caller_index.steps.get(call_step_index)
+            if step is None:
+                continue
+
+            caller_passthru_callsites = passthru_callsites
+            callsite_id = caller_index.callsite_id(call_step_index)
+            if callsite_id is not None and callsite_id not in passthru_callsites:
+                caller_passthru_callsites = passthru_callsites + (callsite_id,)
+
+            yield from self.follow_definitions(
+                caller_index,
+                step,
+                item,
+                events,
+                caller_passthru_callsites,
+                call_stack=(),
+                call_depth=item.call_depth + 1,
+            )
+
+    def follow_definitions(
+        self,
+        function_index: _FunctionIndex,
+        step,
+        item: _WorkItem,
+        events: tuple,
+        passthru_callsites: tuple,
+        call_stack: tuple,
+        call_depth: int,
+        ssa_names: list[str] = None,
+    ):
+        """
+        the data read at (or returned to) step flows into every SSA version
+        it defines, or the given ones.
+        """
+        data_mutation_count = item.data_mutation_count
+        if step.op == models.OpType.CALL or (
+            step.op == models.OpType.ASSIGN and step.src.rhs is not None
+        ):
+            data_mutation_count += 1
+
+        if ssa_names is None:
+            ssa_names = step.ssa_variables_defined_here
+
+        for ssa_name in ssa_names:
+            if ssa_name not in function_index.ssa_variables or (
+                ssa_name == item.ssa_name and function_index.function.fid == item.fid
+            ):
+                continue
+
+            variable, ssa_variable = function_index.ssa_variables[ssa_name]
+            record_attributes = ssa_variable.record_attributes_defined_at_steps.get(
+                step.step_index, []
+            )
+            record_attribute = (
+                record_attributes[0] if record_attributes else item.record_attribute
+            )
+
+            event = self.event(
+                function_index,
+                step,
+                variable,
+                ssa_variable,
+                "write",
+                record_attribute,
+                len(events),
+            )
+            sink_result = self.sink(function_index, step, event, events)
+            if sink_result == models.SinkResultType.OK:
+                self.paths.append(
+                    models.DataflowPathModel(
+                        events=list(events + (event,)),
+                        passthru_callsites=list(passthru_callsites),
+                        data_mutation_count=data_mutation_count,
+                    )
+                )
+                continue
+            if sink_result == models.SinkResultType.STOP:
+                continue
+
+            yield _WorkItem(
+                fid=function_index.function.fid,
+                ssa_name=ssa_name,
+                from_step_index=step.step_index,
+                include_from_step=False,
+                record_attribute=record_attribute,
+                events=events + (event,),
+                passthru_callsites=passthru_callsites,
+                data_mutation_count=data_mutation_count,
+                call_stack=call_stack,
+                call_depth=call_depth,
+            )
+
+
+def summarize_function_dataflow(
+    function: models.FunctionModel,
+    content_hash: str,
+    timeout_secs: int = DATAFLOW_SUMMARY_TIMEOUT_SECS,
+    deadline: float = None,
+) -> models.FunctionDataflowSummaryModel:
+    """
+    follow each parameter of function from its entry SSA versions, within
+    function, and record whether it is returned, stored through another
+    parameter or into a global, and which functions it is passed to.
+
+    all parameters share timeout_secs, further bounded by deadline (a
+    time.monotonic() value). the summary is not complete if it ran out.
+    """
+    summary_deadline = time.monotonic() + timeout_secs
+    if deadline is not None:
+        summary_deadline = min(summary_deadline, deadline)
+
+    variable_manager = function.variable_manager
+    arg_index_by_name = {
+        name: arg_index for arg_index, name in enumerate(variable_manager.function_args)
+    }
+    function_index = _FunctionIndex(function)
+    engine = LocalDataflowEngine()
+
+    params_to_return = set()
+    params_to_params = {}
+    params_to_globals = {}
+    params_to_calls = {}
+    complete = True
+
+    def record_write(arg_index: int, variable_name: str):
+        if variable_name in arg_index_by_name:
+            if arg_index_by_name[variable_name] != arg_index:
+                params_to_params.setdefault(arg_index, set()).add(
+                    arg_index_by_name[variable_name]
+                )
+            return
+
+        variable = variable_manager.variables.get(variable_name)
+        if variable is not None and variable.vartype == models.VarType.GLOBAL_VARIABLE:
+            params_to_globals.setdefault(arg_index, set()).add(variable_name)
+
+    for arg_index in arg_index_by_name.values():
+
+        def sink_callback_fn(
+            state: models.DataflowStateModel, arg_index: int = arg_index
+        ) -> models.SinkResultType:
+            event, step = state.current_event, state.current_step
+
+            if event.data_direction == "write":
+                # assigning a parameter itself is not visible to callers
+                if event.variable_name not in arg_index_by_name:
+                    record_write(arg_index, event.variable_name)
+            elif event.op == models.OpType.RETURN:
+                params_to_return.add(arg_index)
+            elif event.op == models.OpType.CALL:
+                params_to_calls.setdefault(arg_index, set()).add(step.fname)
+            elif (
+                event.op == models.OpType.ASSIGN
+                and step.dst is not None
+                and step.dst.variable_name
+                and step.dst.ssa_name not in step.ssa_variables_defined_here
+            ):
+                # a store through the destination, e.g `*out = x`, `st->data = x`
+                record_write(arg_index, step.dst.variable_name)
+
+            return models.SinkResultType.CONTINUE
+
+        for ssa_name in function_index.param_entry_ssa_names(arg_index):
+            if not complete or time.monotonic() > summary_deadline:
+                complete = False
+                break
+
+            df_response = engine.run(
+                models.DataflowRequestModel(
+                    function=function,
+                    source_variable_name=ssa_name,
+                    sink_callback_fn=sink_callback_fn,
+                    timeout_secs=timeout_secs,
+                    strict_record_attributes_tracking=False,
+                ),
+                deadline=summary_deadline,
+            )
+            # a run only fails before the deadline when its source isn't
+            # found, which leaves no flow to record
+            complete = df_response.status or time.monotonic() <= summary_deadline
+
+    return models.FunctionDataflowSummaryModel(
+        fid=function.fid,
+        content_hash=content_hash,
+        params_to_return=sorted(params_to_return),
+        params_to_params={k: sorted(v) for k, v in params_to_params.items()},
+        params_to_globals={k: sorted(v) for k, v in params_to_globals.items()},
+        params_to_calls={k: sorted(v) for k, v in params_to_calls.items()},
+        complete=complete,
+    )
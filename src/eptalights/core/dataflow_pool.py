@@ -0,0 +1,107 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Iterable, Iterator
+
+import dill
+
+from eptalights import models
+
+# tasks queued per worker ahead of the results consumed, so that workers
+# never wait for the consumer while requests are streamed in lazily
+DATAFLOW_POOL_TASKS_PER_WORKER = 4
+
+# set once per worker process by _init_worker
+_worker_db = None
+_worker_sink_callback_fn = None
+_worker_run_options = None
+# complete dataflow summaries computed by the worker, by (fid, content_hash).
+# they are stored by the parent, so are kept to be reused by later tasks.
+_worker_summaries = {}
+
+
+def _init_worker(
+    db_class, db_options: dict, sink_callback_fn_bytes: bytes, run_options: dict
+):
+    """
+    opens the worker's own database connection and loads the sink callback
+    shared by all tasks, so that neither is shipped with every task. workers
+    only read the database, their results are stored by the parent.
+    """
+    global _worker_db, _worker_sink_callback_fn, _worker_run_options
+
+    _worker_db = db_class(**db_options)
+    _worker_sink_callback_fn = dill.loads(sink_callback_fn_bytes)
+    _worker_run_options = run_options
+
+
+def _run_task(task: tuple) -> tuple:
+    """
+    task is (index, fid or FunctionModel, other request fields). the
+    function is loaded by fid when it is the one stored in the database.
+    returns (index, unstored run), see DatabaseAPI._dataflow_run_unstored.
+    """
+    index, function, request_fields = task
+    if isinstance(function, str):
+        function = _worker_db.get_function_by_id(function)
+
+    run = _worker_db._dataflow_run_unstored(
+        models.DataflowRequestModel(
+            function=function,
+            sink_callback_fn=_worker_sink_callback_fn,
+            **request_fields,
+        ),
+        summaries=_worker_summaries,
+        **_worker_run_options,
+    )
+    if run.cached_action is not None:
+        # the caller has the request already, and the sink callback may not
+        # pickle by reference
+        run = run._replace(
+            cached_action=run.cached_action.model_copy(update={"request": None})
+        )
+    return index, run
+
+
+def _iter_task_results(
+    executor: Executor,
+    tasks: Iterable[tuple],
+    max_pending: int,
+    ordered: bool = True,
+) -> Iterator[tuple]:
+    """
+    submit tasks to executor with at most max_pending in flight, yielding
+    lists of the results ready together, in submission order, or as they
+    complete.
+    """
+    pending = deque() if ordered else set()
+
+    def completed(block: bool) -> list:
+        results = []
+        if ordered:
+            while pending and (block or pending[0].done()):
+                results.append(pending.popleft().result())
+                block = False
+            return results
+
+        if pending:
+            done, _ = wait(
+                pending, timeout=None if block else 0, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                pending.discard(future)
+                results.append(future.result())
+        return results
+
+    for task in tasks:
+        future = executor.submit(_run_task, task)
+        if ordered:
+            pending.append(future)
+        else:
+            pending.add(future)
+
+        results = completed(block=len(pending) >= max_pending)
+        if results:
+            yield results
+
+    while pending:
+        yield completed(block=True)
@@ -2,29 +2,66 @@ from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 
-from sqlalchemy import String, DateTime, Boolean
+from sqlalchemy import String, DateTime, Boolean, Integer
 from sqlalchemy.dialects.sqlite import TEXT as SQLITE_TEXT
 from sqlalchemy import ForeignKey
 
-from sqlalchemy import create_engine
-from sqlalchemy import select, func
+from sqlalchemy import create_engine, event
+from sqlalchemy import select, func, update, insert, delete, exists, inspect, text
+from sqlalchemy import bindparam, case
+from sqlalchemy import or_
+from sqlalchemy import table, column, literal, literal_column, tuple_, type_coerce
 from sqlalchemy import Index
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from pydantic import UUID4
 import msgpack
 import dill
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import time
 import uuid
 import hashlib
 import base64
-from typing import Iterator
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, NamedTuple, Optional
 
 from eptalights import models
+from eptalights.core.lazy import (
+    LazyFunctionModel,
+    LazyCallsiteModel,
+    LazyDataflowActionModel,
+)
+from eptalights.core.cache import LRUCache
+from eptalights.core.callgraph import CallGraph
+from eptalights.core.dataflow_engine import (
+    LocalDataflowEngine,
+    DATAFLOW_MAX_RESOLVED_FUNCTIONS,
+    DATAFLOW_SUMMARY_TIMEOUT_SECS,
+    summarize_function_dataflow,
+)
+from eptalights.core.dataflow_pool import (
+    DATAFLOW_POOL_TASKS_PER_WORKER,
+    _init_worker,
+    _iter_task_results,
+)
+from eptalights.models.sophia_ir.function import get_step_model
 
 ITER_DATAFLOW_ACTIONS_PAGE_SIZE = 25
+DELETE_DATAFLOW_ACTIONS_BATCH_SIZE = 500
+DATAFLOW_PATHS_INDEX_BATCH_SIZE = 100
+
+# marks a dataflow request stored with a reference to its function
+DATAFLOW_REQUEST_REF_KEY = "function_ref"
+FUNCTION_SUMMARIES_BATCH_SIZE = 1000
+FUNCTION_COMPONENTS_BATCH_SIZE = 500
+STREAM_BATCH_SIZE = 500
+FUNCTION_CACHE_MAX_ENTRIES = 1024
+# the trigram tokenizer can only look up queries of at least 3 characters
+SEARCH_INDEX_MIN_QUERY_LENGTH = 3
 
 
 def generate_uuid():
@@ -49,6 +86,28 @@ class FunctionTbl(Base):
     filepath: Mapped[str] = mapped_column(String, index=True, nullable=False)
     function_data: Mapped[str] = mapped_column(SQLITE_TEXT, nullable=True)
 
+    # summary columns, filled from function_data so that listing functions
+    # never needs to decode the blob. deferred, as older databases may not
+    # have them until the schema is upgraded.
+    num_of_steps: Mapped[int] = mapped_column(
+        Integer, index=True, nullable=True, deferred=True
+    )
+    num_of_callsites: Mapped[int] = mapped_column(
+        Integer, index=True, nullable=True, deferred=True
+    )
+    num_of_variables: Mapped[int] = mapped_column(
+        Integer, index=True, nullable=True, deferred=True
+    )
+    lineno_start: Mapped[int] = mapped_column(
+        Integer, index=True, nullable=True, deferred=True
+    )
+    lineno_end: Mapped[int] = mapped_column(
+        Integer, index=True, nullable=True, deferred=True
+    )
+    content_hash: Mapped[str] = mapped_column(
+        String, index=True, nullable=True, deferred=True
+    )
+
 
 class CallsiteTbl(Base):
     __tablename__ = "callsites"
@@ -56,7 +115,7 @@ class CallsiteTbl(Base):
     name: Mapped[str] = mapped_column(String, index=True, nullable=False)
     ssa_name: Mapped[str] = mapped_column(String, index=False, nullable=False)
     num_of_args: Mapped[int] = mapped_column(index=False, nullable=False, default=0)
-    fid: Mapped[str] = mapped_column(ForeignKey("functions.fid"))
+    fid: Mapped[str] = mapped_column(ForeignKey("functions.fid"), index=True)
     filepath: Mapped[str] = mapped_column(String, index=True, nullable=True)
 
 
@@ -66,13 +125,136 @@ class FileMetadataTbl(Base):
     file_metadata_data: Mapped[str] = mapped_column(SQLITE_TEXT, nullable=True)
 
 
+class FunctionComponentTbl(Base):
+    __tablename__ = "function_components"
+    fid: Mapped[str] = mapped_column(ForeignKey("functions.fid"), primary_key=True)
+    # content hash of the function the components were split from. rows
+    # not matching FunctionTbl.content_hash are stale and ignored.
+    content_hash: Mapped[str] = mapped_column(String, nullable=True)
+
+    # each component of function_data, msgpack encoded on its own. sqlite
+    # has to walk past earlier columns of a row to read a later one, so
+    # components are ordered from smallest to largest.
+    class_props: Mapped[str] = mapped_column(SQLITE_TEXT, nullable=True)
+    cfg: Mapped[str] = mapped_column(SQLITE_TEXT, nullable=True)
+    callsite_manager: Mapped[str] = mapped_column(SQLITE_TEXT, nullable=True)
+    variable_manager: Mapped[str] = mapped_column(SQLITE_TEXT, nullable=True)
+    steps: Mapped[str] = mapped_column(SQLITE_TEXT, nullable=True)
+
+
+class StepTbl(Base):
+    __tablename__ = "steps"
+    __table_args__ = (Index("ix_steps_op_fname", "op", "fname"),)
+    fid: Mapped[str] = mapped_column(ForeignKey("functions.fid"), primary_key=True)
+    step_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    op: Mapped[str] = mapped_column(String, nullable=False)
+    lineno: Mapped[int] = mapped_column(Integer, nullable=True)
+    basicblock_index: Mapped[int] = mapped_column(Integer, nullable=True)
+    fname: Mapped[str] = mapped_column(String, index=True, nullable=True)
+    num_of_args: Mapped[int] = mapped_column(Integer, index=True, nullable=True)
+
+
+class StepArgTbl(Base):
+    __tablename__ = "step_args"
+    __table_args__ = (Index("ix_step_args_arg_index_value", "arg_index", "value"),)
+    fid: Mapped[str] = mapped_column(String, primary_key=True)
+    step_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    arg_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    ssa_name: Mapped[str] = mapped_column(String, nullable=True)
+    variable_name: Mapped[str] = mapped_column(String, index=True, nullable=True)
+    # space separated TokenType names of the argument tokens
+    token_types: Mapped[str] = mapped_column(String, nullable=True)
+    value: Mapped[str] = mapped_column(String, nullable=True)
+
+
+class VariableTbl(Base):
+    __tablename__ = "variables"
+    __table_args__ = (
+        Index("ix_variables_vartype_type_declaration", "vartype", "type_declaration"),
+    )
+    fid: Mapped[str] = mapped_column(ForeignKey("functions.fid"), primary_key=True)
+    name: Mapped[str] = mapped_column(String, primary_key=True, index=True)
+    filepath: Mapped[str] = mapped_column(String, index=True, nullable=True)
+    vartype: Mapped[str] = mapped_column(String, nullable=True)
+    type_declaration: Mapped[str] = mapped_column(String, index=True, nullable=True)
+    full_declaration: Mapped[str] = mapped_column(String, nullable=True)
+    num_of_ssa_versions: Mapped[int] = mapped_column(Integer, nullable=True)
+
+
+class CallGraphTbl(Base):
+    __tablename__ = "callgraph"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    num_of_functions: Mapped[int] = mapped_column(Integer, nullable=False)
+    num_of_callsites: Mapped[int] = mapped_column(Integer, nullable=False)
+    # as for SearchIndexStateTbl, the state of the functions and callsites
+    # tables the graph was built from. DatabaseWriter also deletes the graph
+    # when it replaces a function.
+    max_function_rowid: Mapped[int] = mapped_column(Integer, nullable=True)
+    max_callsite_rowid: Mapped[int] = mapped_column(Integer, nullable=True)
+    callgraph_data: Mapped[str] = mapped_column(SQLITE_TEXT, nullable=False)
+
+
+class SearchIndexStateTbl(Base):
+    __tablename__ = "search_index_state"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # counts and largest rowids of the tables the search index was built
+    # from. any insert (or replace) raises the largest rowid, so rows
+    # written since the build show up as a changed state.
+    num_of_functions: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_function_rowid: Mapped[int] = mapped_column(Integer, nullable=True)
+    num_of_callsites: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_callsite_rowid: Mapped[int] = mapped_column(Integer, nullable=True)
+
+
+FUNCTION_COMPONENTS = (
+    "class_props",
+    "cfg",
+    "callsite_manager",
+    "variable_manager",
+    "steps",
+)
+
+
+# FTS5 trigram shadow indexes over names and file paths. these are virtual
+# tables, so they live outside of Base.metadata and are created by
+# DatabaseAPI.build_search_index(), which records SearchIndexStateTbl.
+FunctionSearchTbl = table(
+    "functions_fts",
+    column("fid"),
+    column("name"),
+    column("classname"),
+    column("filepath"),
+    column("rank"),
+)
+
+CallsiteSearchTbl = table(
+    "callsites_fts",
+    column("cid"),
+    column("name"),
+    column("rank"),
+)
+
+SEARCH_INDEX_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS functions_fts USING fts5("
+    "fid UNINDEXED, name, classname, filepath, tokenize='trigram')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS callsites_fts USING fts5("
+    "cid UNINDEXED, name, tokenize='trigram')",
+)
+
+
 class DataflowActionTbl(Base):
     __tablename__ = "dataflow_actions"
-    _table_args__ = (
-        Index("action_id_date_created_index", "date_created", "action_id"),
+    # keyset pagination walks (data_created, action_id), optionally per status
+    __table_args__ = (
+        Index("ix_dataflow_actions_data_created", "data_created", "action_id"),
         Index(
-            "action_id_date_created_status_index", "date_created", "action_id", "status"
+            "ix_dataflow_actions_status_data_created",
+            "status",
+            "data_created",
+            "action_id",
         ),
+        # DONE actions whose response isn't in dataflow_paths yet
+        Index("ix_dataflow_actions_num_of_paths_status", "num_of_paths", "status"),
     )
 
     action_id: Mapped[str] = mapped_column(
@@ -91,27 +273,846 @@ class DataflowActionTbl(Base):
     data_created: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+    # the analysed function, to invalidate cached responses once it changes.
+    # function_content_hash is only known for requests stored by reference.
+    fid: Mapped[str] = mapped_column(String, index=True, nullable=True)
+    function_content_hash: Mapped[str] = mapped_column(String, nullable=True)
+    # rows in dataflow_paths, None until the response is indexed there
+    num_of_paths: Mapped[int] = mapped_column(Integer, nullable=True)
+    # "local" or "remote", and the status of the stored response. only
+    # successful responses are reused, by requests to the same engine.
+    engine: Mapped[str] = mapped_column(String, nullable=True)
+    response_status: Mapped[bool] = mapped_column(Boolean, nullable=True)
 
     def data_created_as_ts(self):
-        return str(time.mktime(self.data_created.timetuple()))
+        return _datetime_as_ts(self.data_created)
+
+
+def _datetime_as_ts(value: datetime) -> str:
+    return str(time.mktime(value.timetuple()))
+
+
+DATAFLOW_ACTION_HEADER_COLUMNS = (
+    DataflowActionTbl.action_id,
+    DataflowActionTbl.dataflow_request_hash,
+    DataflowActionTbl.status,
+    DataflowActionTbl.remote_action_id,
+    DataflowActionTbl.delete_after_read,
+    DataflowActionTbl.data_created,
+)
+
+
+class DataflowPathTbl(Base):
+    """
+    the paths of DONE dataflow responses, one row each, with their sink
+    (last event) denormalized for triage queries.
+    """
+
+    __tablename__ = "dataflow_paths"
+    action_id: Mapped[str] = mapped_column(String, primary_key=True)
+    path_idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+    num_of_events: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    data_mutation_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sink_fid: Mapped[str] = mapped_column(String, index=True, nullable=True)
+    sink_filepath: Mapped[str] = mapped_column(String, index=True, nullable=True)
+    sink_step_index: Mapped[int] = mapped_column(Integer, nullable=True)
+    sink_op: Mapped[str] = mapped_column(String, index=True, nullable=True)
+    sink_variable_name: Mapped[str] = mapped_column(String, nullable=True)
+
+
+class DataflowEventTbl(Base):
+    __tablename__ = "dataflow_events"
+    __table_args__ = (
+        Index("ix_dataflow_events_fid_step_index", "fid", "step_index"),
+        Index("ix_dataflow_events_variable_name", "variable_name"),
+    )
+
+    action_id: Mapped[str] = mapped_column(String, primary_key=True)
+    path_idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # order of the event in its path
+    event_idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+    fid: Mapped[str] = mapped_column(String, nullable=True)
+    step_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    op: Mapped[str] = mapped_column(String, nullable=False)
+    lineno: Mapped[int] = mapped_column(Integer, nullable=True)
+    variable_name: Mapped[str] = mapped_column(String, nullable=False)
+    ssa_variable_name: Mapped[str] = mapped_column(String, nullable=True)
+    data_direction: Mapped[str] = mapped_column(String, nullable=True)
+
+
+class DataflowPathCallsiteTbl(Base):
+    __tablename__ = "dataflow_path_callsites"
+    action_id: Mapped[str] = mapped_column(String, primary_key=True)
+    path_idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+    cid: Mapped[str] = mapped_column(String, primary_key=True, index=True)
+    # the called function, if the callsite is in the database
+    name: Mapped[str] = mapped_column(String, index=True, nullable=True)
+
+
+# deleting an action (whichever way) deletes its indexed paths
+DATAFLOW_PATHS_DDL = tuple(
+    f"CREATE TRIGGER IF NOT EXISTS dataflow_actions_delete_{tbl.__tablename__} "
+    f"AFTER DELETE ON dataflow_actions BEGIN "
+    f"DELETE FROM {tbl.__tablename__} WHERE action_id = OLD.action_id; END"
+    for tbl in (DataflowPathTbl, DataflowEventTbl, DataflowPathCallsiteTbl)
+)
+
+
+class FunctionDataflowSummaryTbl(Base):
+    __tablename__ = "function_dataflow_summaries"
+    fid: Mapped[str] = mapped_column(String, primary_key=True)
+    # summaries of an older version of the function are never read
+    content_hash: Mapped[str] = mapped_column(String, primary_key=True)
+    summary_data: Mapped[str] = mapped_column(SQLITE_TEXT, nullable=False)
+    data_created: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+
+# tables written during analysis. with a read-only database profile these
+# live in a separate, writable sidecar database, created on the first write.
+DATAFLOW_TABLES = (
+    DataflowActionTbl,
+    DataflowPathTbl,
+    DataflowEventTbl,
+    DataflowPathCallsiteTbl,
+    FunctionDataflowSummaryTbl,
+)
+
+DATABASE_PROFILES = {
+    "default": {
+        "read_only": False,
+        "read_pragmas": {},
+        # streamed reads keep a read transaction open while the consumer
+        # iterates; WAL lets writes (e.g dataflow actions) proceed meanwhile.
+        # only databases created by DatabaseAPI are switched to WAL, see
+        # _connect_pragmas.
+        "write_pragmas": {"journal_mode": "WAL", "busy_timeout": 30000},
+    },
+    "analysis": {
+        "read_only": True,
+        "read_pragmas": {
+            "mmap_size": 1 << 30,  # 1 GiB
+            "cache_size": -262144,  # 256 MiB
+            "temp_store": "MEMORY",
+        },
+        "write_pragmas": {"journal_mode": "WAL", "busy_timeout": 30000},
+    },
+}
+
+
+# step fields that change when unrelated code moves, left out of content hashes
+CONTENT_HASH_IGNORED_KEYS = frozenset(["lineno"])
+
+
+def _normalize_for_content_hash(value):
+    if isinstance(value, dict):
+        # fields left at an empty default are dropped, so blobs that omit
+        # them hash the same as ones that spell them out
+        return [
+            [key, _normalize_for_content_hash(value[key])]
+            for key in sorted(value, key=str)
+            if key not in CONTENT_HASH_IGNORED_KEYS
+            and value[key] is not None
+            and value[key] != []
+            and value[key] != {}
+        ]
+    if isinstance(value, (list, tuple)):
+        return [_normalize_for_content_hash(item) for item in value]
+    return value
+
+
+def _step_content(step) -> dict:
+    """
+    a step (model or raw dict) as hashed: dumped by its IR model without
+    defaults, so a sparse blob hashes the same as a full model_dump().
+    """
+    if isinstance(step, dict):
+        step = get_step_model(step["op"]).model_validate(step)
+    # op is a default of every step model, keep it
+    return {
+        **step.model_dump(mode="json", exclude_defaults=True),
+        "op": models.OpType(step.op).value,
+    }
+
+
+def _steps_content_hash(steps: list) -> str:
+    """
+    a structural hash of a function's steps. keys are sorted and line
+    numbers dropped, so it is stable across builds and only changes when
+    the code itself does.
+    """
+    steps = [_step_content(step) for step in steps]
+    return _hash_byte_str(msgpack.packb(_normalize_for_content_hash(steps)))
+
+
+def _function_content_hash(function_data: dict) -> str:
+    return _steps_content_hash(function_data.get("steps") or [])
+
+
+def _function_summary_values(
+    function_data: dict, with_content_hash: bool = True
+) -> dict:
+    """
+    compute FunctionTbl summary columns from a raw (msgpack decoded)
+    function_data dict, without building any models. without
+    with_content_hash, content_hash (which validates every step) is None.
+    """
+    steps = function_data.get("steps") or []
+    variable_manager = function_data.get("variable_manager") or {}
+    callsite_manager = function_data.get("callsite_manager") or {}
+
+    linenos = [
+        step["lineno"]
+        for step in steps
+        if step.get("lineno") is not None and step["lineno"] >= 0
+    ]
+
+    return {
+        "num_of_steps": len(steps),
+        "num_of_callsites": len(callsite_manager.get("callsites") or {}),
+        "num_of_variables": len(variable_manager.get("variables") or {}),
+        "lineno_start": min(linenos) if linenos else None,
+        "lineno_end": max(linenos) if linenos else None,
+        "content_hash": (
+            _function_content_hash(function_data) if with_content_hash else None
+        ),
+    }
+
+
+def _function_component_row(fid: str, function_data: dict, content_hash: str) -> dict:
+    """
+    a FunctionComponentTbl row from a raw (msgpack decoded) function_data
+    dict, each component encoded on its own.
+    """
+    return {
+        "fid": fid,
+        "content_hash": content_hash,
+        **{
+            component: (
+                msgpack.packb(function_data[component])
+                if component in function_data
+                else None
+            )
+            for component in FUNCTION_COMPONENTS
+        },
+    }
+
+
+def _missing_function_summary():
+    return or_(FunctionTbl.num_of_steps.is_(None), FunctionTbl.content_hash.is_(None))
+
+
+def _unpack_function_data(function_data) -> dict:
+    if function_data is None:
+        return {}
+    return msgpack.unpackb(function_data, strict_map_key=False)
+
+
+def _step_index_rows(fid: str, function_data: dict) -> tuple[list, list]:
+    """
+    compute StepTbl and StepArgTbl rows from a raw (msgpack decoded)
+    function_data dict, without building any models.
+    """
+    step_rows = []
+    arg_rows = []
+
+    for position, step in enumerate(function_data.get("steps") or []):
+        step_index = step.get("step_index")
+        if step_index is None:
+            step_index = position
+
+        fargs = step.get("fargs") or []
+        is_call = step["op"] == models.OpType.CALL.value
+
+        step_rows.append(
+            {
+                "fid": fid,
+                "step_index": step_index,
+                "op": step["op"],
+                "lineno": step.get("lineno", -1),
+                "basicblock_index": step.get("basicblock_index"),
+                "fname": step.get("fname") if is_call else None,
+                "num_of_args": len(fargs) if is_call else None,
+            }
+        )
+
+        for arg_index, farg in enumerate(fargs):
+            tokens = farg.get("tokens") or []
+            arg_rows.append(
+                {
+                    "fid": fid,
+                    "step_index": step_index,
+                    "arg_index": arg_index,
+                    "ssa_name": farg.get("ssa_name"),
+                    "variable_name": farg.get("variable_name"),
+                    "token_types": " ".join(
+                        token.get("token_type") or models.TokenType.IS_UNDEF.value
+                        for token in tokens
+                    ),
+                    "value": "".join(token.get("value") or "" for token in tokens),
+                }
+            )
+
+    return step_rows, arg_rows
+
+
+def _variable_index_rows(fid: str, filepath: str, function_data: dict) -> list:
+    """
+    compute VariableTbl rows from a raw (msgpack decoded) function_data
+    dict, without building any models. rows are named by their key in
+    variables, which is how search_variables looks them up again.
+    """
+    variable_manager = function_data.get("variable_manager") or {}
+    variables = variable_manager.get("variables") or {}
+
+    return [
+        {
+            "fid": fid,
+            "name": name,
+            "filepath": filepath,
+            "vartype": variable.get("vartype") or models.VarType.UNDEF.value,
+            "type_declaration": variable.get("type_declaration"),
+            "full_declaration": variable.get("full_declaration"),
+            "num_of_ssa_versions": len(variable.get("unique_ssa_variables") or {}),
+        }
+        for name, variable in variables.items()
+    ]
+
+
+def _match_condition(
+    base_column, query: str, match_type: models.SearchMatchType | str = None
+):
+    """
+    exact match on base_column, or SearchMatchType matching if given.
+    """
+    if match_type is None:
+        return base_column == query
+
+    match_type = _search_match_type(match_type)
+    if match_type == models.SearchMatchType.SUBSTRING:
+        return base_column.like(f"%{query}%")
+    elif match_type == models.SearchMatchType.PREFIX:
+        return base_column.like(f"{query}%")
+    elif match_type == models.SearchMatchType.GLOB:
+        return base_column.op("GLOB")(query)
+    return base_column.regexp_match(query)
+
+
+def _search_match_type(
+    match_type: models.SearchMatchType | str = None,
+) -> models.SearchMatchType:
+    if match_type is None:
+        return models.SearchMatchType.SUBSTRING
+    return models.SearchMatchType(str(match_type).upper())
+
+
+def _fts_phrase(query: str) -> str:
+    return '"' + query.replace('"', '""') + '"'
+
+
+def _text_match_conditions(
+    search_tbl, filters, use_search_index: bool
+) -> tuple[str | None, list, list]:
+    """
+    translate (base_column, column_name, query, match_type) filters into:
+    - an FTS5 MATCH expression over search_tbl (ranked, substring lookups)
+    - conditions on search_tbl columns (prefix/glob, accelerated by trigrams)
+    - conditions on the base table (regex, short queries, no search index)
+    """
+    match_terms = []
+    search_conditions = []
+    base_conditions = []
+
+    for base_column, column_name, query, match_type in filters:
+        if not query:
+            continue
+
+        search_column = search_tbl.c[column_name]
+        indexable = use_search_index and len(query) >= SEARCH_INDEX_MIN_QUERY_LENGTH
+
+        if match_type == models.SearchMatchType.SUBSTRING:
+            if indexable:
+                match_terms.append(f"{column_name}:{_fts_phrase(query)}")
+            else:
+                base_conditions.append(base_column.like(f"%{query}%"))
+
+        elif match_type == models.SearchMatchType.PREFIX:
+            if indexable:
+                search_conditions.append(search_column.like(f"{query}%"))
+            else:
+                base_conditions.append(base_column.like(f"{query}%"))
+
+        elif match_type == models.SearchMatchType.GLOB:
+            if use_search_index:
+                search_conditions.append(search_column.op("GLOB")(query))
+            else:
+                base_conditions.append(base_column.op("GLOB")(query))
+
+        elif match_type == models.SearchMatchType.REGEX:
+            base_conditions.append(base_column.regexp_match(query))
+
+    match_expr = " AND ".join(match_terms) if match_terms else None
+    return match_expr, search_conditions, base_conditions
+
+
+def _sqlite_pragmas_listener(pragmas: dict):
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return set_sqlite_pragmas
+
+
+def _connect_pragmas(dbpath: str, pragmas: dict) -> dict:
+    """
+    journal_mode is persisted in the database file, so it is only set on
+    new (missing or empty) databases. existing ones, e.g a downloaded build
+    shared with immutable readers, keep their journal mode.
+    """
+    if os.path.exists(dbpath) and os.path.getsize(dbpath) > 0:
+        return {
+            name: value for name, value in pragmas.items() if name != "journal_mode"
+        }
+    return pragmas
+
+
+def _summarize_function_dataflow(
+    function: models.FunctionModel, content_hash: str, deadline: float = None
+) -> tuple[models.FunctionDataflowSummaryModel, bool]:
+    """
+    summarize_function_dataflow, and whether the summary is final for
+    content_hash and can be stored: once complete, or when it ran out of its
+    whole DATAFLOW_SUMMARY_TIMEOUT_SECS, as it would every time. one cut
+    short by deadline is computed again next time, maybe with more time left.
+    """
+    full_budget = deadline is None or (
+        deadline - time.monotonic() >= DATAFLOW_SUMMARY_TIMEOUT_SECS
+    )
+    summary = summarize_function_dataflow(function, content_hash, deadline=deadline)
+    return summary, summary.complete or full_budget
+
+
+class _UnstoredDataflowRun(NamedTuple):
+    """
+    a local dataflow run that wrote nothing to the database, e.g in a
+    dataflow_run_many worker, for the process owning the database to store.
+    only cached_action is set when a cached response was reused.
+    """
+
+    cached_action: Optional[models.DataflowActionModel] = None
+    request_b64: str = None
+    request_hash: str = None
+    content_hash: Optional[str] = None
+    response: Optional[models.DataflowResponseModel] = None
+    # (fid, content_hash, summary) of the final summaries it computed
+    summaries: tuple = ()
+
+
+def _dataflow_dbpath(dbpath: str) -> str:
+    root, ext = os.path.splitext(dbpath)
+    return f"{root}.dataflow{ext or '.db'}"
 
 
 class DatabaseAPI:
-    def __init__(self, dbpath: str = None):
+    def __init__(self, dbpath: str = None, **db_options):
         if dbpath is not None:
-            self.db_init(dbpath)
+            self.db_init(dbpath, **db_options)
+
+    def db_init(
+        self,
+        dbpath: str,
+        stream_batch_size: int = STREAM_BATCH_SIZE,
+        read_only: bool = False,
+        profile: str = "default",
+        function_cache_max_entries: int = FUNCTION_CACHE_MAX_ENTRIES,
+        function_cache_max_bytes: int = None,
+        trusted: bool = True,
+    ):
+        """
+        profile is one of DATABASE_PROFILES. read-only profiles (or
+        read_only=True) open dbpath as an immutable database: no DDL, no
+        locking, and dataflow actions are kept in a writable sidecar
+        database next to it (`<name>.dataflow.db`). the sidecar is only
+        created once dataflow results are stored, until then an empty
+        in-memory database stands in for it.
+
+        decoded functions are kept in an LRU cache bounded by entry count
+        and/or approximate size in bytes (of the encoded function data).
+        None means unbounded, 0 disables the cache.
+
+        trusted decodes function data with FunctionModel.model_validate_trusted,
+        since blobs in the database were produced by the build service.
+        """
+        if profile not in DATABASE_PROFILES:
+            raise ValueError(f"Unknown database profile {profile}")
+
+        db_profile = DATABASE_PROFILES[profile]
+
+        self.dbpath = dbpath
+        self.profile = profile
+        self.stream_batch_size = stream_batch_size
+        self.trusted = trusted
+        self._function_cache = LRUCache(
+            max_entries=function_cache_max_entries,
+            max_bytes=function_cache_max_bytes,
+        )
+        self.read_only = read_only or db_profile["read_only"]
+        self._callgraph = None
+        # (largest function and callsite rowids, result) of the last full
+        # search index check, see _has_search_index
+        self._search_index_check = None
+        self._dataflow_db_pragmas = db_profile["write_pragmas"]
+
+        if self.read_only:
+            # immutable=1 tells sqlite the file can't change under us, so it
+            # skips locking and change detection entirely.
+            self._db_engine = create_engine(
+                f"sqlite:///file:{os.path.abspath(dbpath)}"
+                "?mode=ro&immutable=1&uri=true"
+            )
+            event.listen(
+                self._db_engine,
+                "connect",
+                _sqlite_pragmas_listener(db_profile["read_pragmas"]),
+            )
+
+            if os.path.exists(_dataflow_dbpath(dbpath)):
+                self._dataflow_db_engine = self._create_dataflow_db_engine()
+            else:
+                self._dataflow_db_engine = create_engine(
+                    "sqlite://",
+                    connect_args={"check_same_thread": False},
+                    poolclass=StaticPool,
+                )
+        else:
+            pragmas = _connect_pragmas(
+                dbpath, {**db_profile["read_pragmas"], **db_profile["write_pragmas"]}
+            )
+            self._db_engine = create_engine(f"sqlite:///{dbpath}")
+            event.listen(self._db_engine, "connect", _sqlite_pragmas_listener(pragmas))
+            self._dataflow_db_engine = self._db_engine
 
-    def db_init(self, dbpath: str):
-        self._db_engine = create_engine(f"sqlite:///{dbpath}")
         # self._db_session = Session(self._db_engine)
-        self._db_session = sessionmaker(bind=self._db_engine)
+        self._db_session = sessionmaker(binds=self._session_binds())
+
+        if self.read_only:
+            self._create_dataflow_tables()
+            self._function_components_available = (
+                self._has_table(FunctionComponentTbl.__tablename__)
+                and self._has_columns(
+                    FunctionComponentTbl.__tablename__, "content_hash"
+                )
+                and self._has_function_summary_columns()
+            )
+            return
+
+        self._function_components_available = True
 
         try:
             Base.metadata.create_all(self._db_engine)
+            self._upgrade_schema()
+            self._create_dataflow_triggers()
         except Exception as e:
             print("Error occurred during Table creation!", e)
             print(e)
 
+    def _session_binds(self) -> dict:
+        return {
+            **{tbl: self._db_engine for tbl in Base.metadata.sorted_tables},
+            **{tbl.__table__: self._dataflow_db_engine for tbl in DATAFLOW_TABLES},
+        }
+
+    def _create_dataflow_db_engine(self):
+        dbpath = _dataflow_dbpath(self.dbpath)
+        pragmas = _connect_pragmas(dbpath, self._dataflow_db_pragmas)
+        engine = create_engine(f"sqlite:///{dbpath}")
+        event.listen(engine, "connect", _sqlite_pragmas_listener(pragmas))
+        return engine
+
+    def _create_dataflow_tables(self):
+        dataflow_tables = [tbl.__table__ for tbl in DATAFLOW_TABLES]
+        Base.metadata.create_all(self._dataflow_db_engine, tables=dataflow_tables)
+        self._upgrade_schema(self._dataflow_db_engine, dataflow_tables)
+        self._create_dataflow_triggers()
+
+    def _ensure_dataflow_db(self):
+        """
+        create the sidecar database of a read-only database before the
+        first dataflow write, in place of the in-memory stand-in.
+        """
+        if self._dataflow_db_engine.url.database:
+            return
+
+        self._dataflow_db_engine.dispose()
+        self._dataflow_db_engine = self._create_dataflow_db_engine()
+        self._create_dataflow_tables()
+        self._db_session.configure(binds=self._session_binds())
+
+    def _upgrade_schema(self, engine=None, tables=None):
+        """
+        add columns and indexes introduced after a database was built.
+        create_all only creates missing tables, so existing tables
+        (e.g from a downloaded build) are upgraded in place.
+        """
+        engine = engine or self._db_engine
+        tables = tables or Base.metadata.sorted_tables
+        inspector = inspect(engine)
+
+        with engine.begin() as conn:
+            for tbl in tables:
+                existing_columns = {c["name"] for c in inspector.get_columns(tbl.name)}
+                for col in tbl.columns:
+                    if col.name in existing_columns:
+                        continue
+                    column_type = col.type.compile(dialect=engine.dialect)
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE {tbl.name} "
+                            f"ADD COLUMN {col.name} {column_type}"
+                        )
+                    )
+
+            for tbl in tables:
+                for index in tbl.indexes:
+                    index.create(conn, checkfirst=True)
+
+    def _create_dataflow_triggers(self):
+        with self._dataflow_db_engine.begin() as conn:
+            for ddl in DATAFLOW_PATHS_DDL:
+                conn.execute(text(ddl))
+
+    def _has_table(self, name: str) -> bool:
+        return name in inspect(self._db_engine).get_table_names()
+
+    def _has_columns(self, name: str, *column_names: str) -> bool:
+        columns = {c["name"] for c in inspect(self._db_engine).get_columns(name)}
+        return columns.issuperset(column_names)
+
+    def _function_tables_state(self, conn) -> dict:
+        """
+        the row counts and largest rowids of the functions and callsites
+        tables, see SearchIndexStateTbl.
+        """
+        state = {}
+        for tbl, name in ((FunctionTbl, "function"), (CallsiteTbl, "callsite")):
+            num_of_rows, max_rowid = conn.execute(
+                select(func.count(), func.max(literal_column("rowid"))).select_from(tbl)
+            ).one()
+            state[f"num_of_{name}s"] = num_of_rows
+            state[f"max_{name}_rowid"] = max_rowid
+        return state
+
+    def _max_rowids(self, conn) -> tuple:
+        return tuple(
+            conn.execute(
+                select(func.max(literal_column("rowid"))).select_from(tbl)
+            ).scalar()
+            for tbl in (FunctionTbl, CallsiteTbl)
+        )
+
+    def _has_search_index(self) -> bool:
+        """
+        whether the search index was built and is up to date with the
+        functions and callsites tables. searches fall back to LIKE
+        otherwise, until build_search_index() is run again.
+
+        the check counts both tables, so its result is kept until the
+        largest rowid of either changes (any insert or replace raises it),
+        which only takes an index lookup per search.
+        """
+        with self._db_engine.connect() as conn:
+            max_rowids = self._max_rowids(conn)
+
+        if self._search_index_check is not None:
+            checked_max_rowids, has_search_index = self._search_index_check
+            if checked_max_rowids == max_rowids:
+                return has_search_index
+
+        has_search_index = self._check_search_index()
+        self._search_index_check = (max_rowids, has_search_index)
+        return has_search_index
+
+    def _check_search_index(self) -> bool:
+        if not all(
+            self._has_table(tbl.name)
+            for tbl in (
+                FunctionSearchTbl,
+                CallsiteSearchTbl,
+                SearchIndexStateTbl.__table__,
+            )
+        ):
+            return False
+
+        with self._db_engine.connect() as conn:
+            built_state = conn.execute(
+                select(
+                    SearchIndexStateTbl.num_of_functions,
+                    SearchIndexStateTbl.max_function_rowid,
+                    SearchIndexStateTbl.num_of_callsites,
+                    SearchIndexStateTbl.max_callsite_rowid,
+                ).where(SearchIndexStateTbl.id == 1)
+            ).one_or_none()
+            if built_state is None:
+                return False
+            return built_state._asdict() == self._function_tables_state(conn)
+
+    def build_search_index(self):
+        """
+        (re)build the FTS5 trigram index over function names, class names,
+        file paths and callsite names. run again after writing functions
+        other than with DatabaseWriter, which rebuilds it on close.
+        """
+        with self._db_engine.begin() as conn:
+            for ddl in SEARCH_INDEX_DDL:
+                conn.execute(text(ddl))
+
+            conn.execute(text("DELETE FROM functions_fts"))
+            conn.execute(
+                text(
+                    "INSERT INTO functions_fts (fid, name, classname, filepath) "
+                    "SELECT fid, name, classname, filepath FROM functions"
+                )
+            )
+            conn.execute(text("DELETE FROM callsites_fts"))
+            conn.execute(
+                text(
+                    "INSERT INTO callsites_fts (cid, name) "
+                    "SELECT cid, name FROM callsites"
+                )
+            )
+
+            SearchIndexStateTbl.__table__.create(conn, checkfirst=True)
+            conn.execute(
+                insert(SearchIndexStateTbl).prefix_with("OR REPLACE"),
+                {"id": 1, **self._function_tables_state(conn)},
+            )
+
+        self._search_index_check = None
+
+    def _filter_functions(
+        self,
+        stmt,
+        filter_by_name: str = None,
+        filter_by_filepath: str = None,
+        filter_by_classname: str = None,
+        match_type: models.SearchMatchType | str = None,
+    ):
+        """
+        without a match_type, name and filepath are substring matched and
+        classname is matched exactly, as before. with a match_type, it applies
+        to all three filters. substring matches are ranked by relevance.
+        """
+        filters = [
+            (
+                FunctionTbl.name,
+                "name",
+                filter_by_name,
+                _search_match_type(match_type),
+            ),
+            (
+                FunctionTbl.filepath,
+                "filepath",
+                filter_by_filepath,
+                _search_match_type(match_type),
+            ),
+        ]
+
+        if filter_by_classname:
+            if match_type is None:
+                stmt = stmt.where(FunctionTbl.classname == filter_by_classname)
+            else:
+                filters.append(
+                    (
+                        FunctionTbl.classname,
+                        "classname",
+                        filter_by_classname,
+                        _search_match_type(match_type),
+                    )
+                )
+
+        match_expr, search_conditions, base_conditions = _text_match_conditions(
+            FunctionSearchTbl, filters, self._has_search_index()
+        )
+
+        if match_expr is not None or search_conditions:
+            stmt = stmt.join(
+                FunctionSearchTbl, FunctionSearchTbl.c.fid == FunctionTbl.fid
+            )
+            if match_expr is not None:
+                stmt = stmt.where(
+                    literal_column(FunctionSearchTbl.name).op("MATCH")(match_expr)
+                ).order_by(FunctionSearchTbl.c.rank)
+            stmt = stmt.where(*search_conditions)
+
+        return stmt.where(*base_conditions)
+
+    def _filter_callsites_by_name(
+        self, stmt, filter_by_name: str, match_type: models.SearchMatchType | str
+    ):
+        """
+        substring matches are ranked by relevance: functions by their best
+        matching callsite, then callsites within a function.
+        """
+        filters = [
+            (
+                CallsiteTbl.name,
+                "name",
+                filter_by_name,
+                _search_match_type(match_type),
+            )
+        ]
+
+        match_expr, search_conditions, base_conditions = _text_match_conditions(
+            CallsiteSearchTbl, filters, self._has_search_index()
+        )
+
+        if match_expr is not None:
+            # callsites are grouped by function, so functions are kept
+            # together, ordered by their best match
+            stmt = (
+                stmt.join(CallsiteSearchTbl, CallsiteSearchTbl.c.cid == CallsiteTbl.cid)
+                .where(
+                    literal_column(CallsiteSearchTbl.name).op("MATCH")(match_expr),
+                    *search_conditions,
+                )
+                .order_by(
+                    func.min(CallsiteSearchTbl.c.rank).over(
+                        partition_by=CallsiteTbl.fid
+                    ),
+                    CallsiteTbl.fid,
+                    CallsiteSearchTbl.c.rank,
+                )
+            )
+        elif search_conditions:
+            cids = select(CallsiteSearchTbl.c.cid).where(*search_conditions)
+            stmt = stmt.where(CallsiteTbl.cid.in_(cids))
+
+        return stmt.where(*base_conditions)
+
+    def _stream(self, stmt, scalars: bool = False) -> Iterator:
+        """
+        execute stmt and yield its rows `stream_batch_size` at a time, keeping
+        only one batch in memory. the session stays open while the consumer
+        iterates, and is closed as soon as the generator finishes or is
+        closed, including when the consumer stops early.
+        """
+        stmt = stmt.execution_options(yield_per=self.stream_batch_size)
+
+        with self._db_session() as session:
+            if scalars:
+                result = session.scalars(stmt)
+            else:
+                result = session.execute(stmt)
+
+            try:
+                for partition in result.partitions():
+                    yield from partition
+            finally:
+                result.close()
+
     def _scalar_count(self, table) -> int:
         """
         Example:
@@ -140,32 +1141,39 @@ class DatabaseAPI:
             result = session.execute(stmt).scalar_one()
         return result
 
-    def get_function_by_id(self, fid: str) -> models.FunctionModel:
-        with self._db_session() as session:
-            result = session.execute(
-                select(FunctionTbl).where(FunctionTbl.fid == fid)
-            ).scalar_one_or_none()
-
-            if result is None:
-                raise ValueError(f"Function with id {fid} not found")
+    def function_cache_stats(self) -> dict:
+        return self._function_cache.stats()
 
-            data = msgpack.unpackb(result.function_data, strict_map_key=False)
+    def clear_function_cache(self):
+        self._function_cache.clear()
 
+    def _decode_function_data(self, function_data) -> models.FunctionModel:
+        data = msgpack.unpackb(function_data, strict_map_key=False)
+        if self.trusted:
+            return models.FunctionModel.model_validate_trusted(data)
         return models.FunctionModel(**data)
 
+    def get_function_by_id(self, fid: str) -> models.FunctionModel:
+        """
+        the model is shared with every other lookup of fid while it is
+        cached, so treat it as read-only and modify a model_copy(deep=True)
+        of it instead.
+        """
+        function_model = self.get_functions_by_ids([fid]).get(fid)
+        if function_model is None:
+            raise ValueError(f"Function with id {fid} not found")
+
+        return function_model
+
     def get_callsite_by_id(
         self, cid: str
     ) -> tuple[models.FunctionModel, models.CallsiteModel]:
 
-        stmt = (
-            select(
-                FunctionTbl.function_data.label("function_data"),
-                CallsiteTbl.name.label("call_name"),
-                CallsiteTbl.ssa_name.label("call_ssa_name"),
-            )
-            .join(CallsiteTbl, FunctionTbl.fid == CallsiteTbl.fid)
-            .where(CallsiteTbl.cid == cid)
-        )
+        stmt = select(
+            CallsiteTbl.fid.label("fid"),
+            CallsiteTbl.name.label("call_name"),
+            CallsiteTbl.ssa_name.label("call_ssa_name"),
+        ).where(CallsiteTbl.cid == cid)
 
         with self._db_session() as session:
             result = session.execute(stmt).one_or_none()
@@ -173,255 +1181,1702 @@ class DatabaseAPI:
             if result is None:
                 raise ValueError("Callsite not found")
 
-            analysis_data = msgpack.unpackb(result.function_data, strict_map_key=False)
-
-        function_model = models.FunctionModel(**analysis_data)
+        function_model = self.get_function_by_id(result.fid)
         callsite = function_model.callsite_manager.callsites.get(result.call_ssa_name)
         return function_model, callsite
 
+    def _lazy_function_from_row(self, row) -> LazyFunctionModel:
+        return LazyFunctionModel(
+            fid=row.fid,
+            name=row.name,
+            filepath=row.filepath,
+            class_name=row.classname,
+            loader=self.get_function_by_id,
+        )
+
+    def _iter_callsites_grouped_by_function(
+        self, stmt, group_by_function: bool = False, lazy: bool = False
+    ):
+        """
+        rows are grouped by fid (after any relevance ordering of stmt) so that
+        each function is loaded (or wrapped in a lazy handle) once and shared
+        by all of its callsites, instead of decoding function_data again for
+        every callsite row.
+        """
+        stmt = stmt.with_only_columns(
+            FunctionTbl.fid,
+            FunctionTbl.name,
+            FunctionTbl.classname,
+            FunctionTbl.filepath,
+            CallsiteTbl.cid.label("call_cid"),
+            CallsiteTbl.name.label("call_name"),
+            CallsiteTbl.ssa_name.label("call_ssa_name"),
+            CallsiteTbl.num_of_args.label("call_num_of_args"),
+        ).order_by(FunctionTbl.fid)
+
+        results = self._stream(stmt)
+
+        for fid, rows in itertools.groupby(results, key=lambda row: row.fid):
+            rows = list(rows)
+
+            if lazy:
+                function_model = self._lazy_function_from_row(rows[0])
+                callsites = [
+                    LazyCallsiteModel(
+                        cid=row.call_cid,
+                        name=row.call_name,
+                        ssa_name=row.call_ssa_name,
+                        num_of_args=row.call_num_of_args,
+                        function=function_model,
+                    )
+                    for row in rows
+                ]
+            else:
+                function_model = self.get_function_by_id(fid)
+                callsites = [
+                    function_model.callsite_manager.callsites.get(row.call_ssa_name)
+                    for row in rows
+                ]
+
+            if group_by_function:
+                yield function_model, callsites
+            else:
+                for callsite in callsites:
+                    yield function_model, callsite
+
     def get_functions_by_filepath(
-        self, filepath: str
-    ) -> Iterator[models.FunctionModel]:
+        self, filepath: str, lazy: bool = False
+    ) -> Iterator[models.FunctionModel | LazyFunctionModel]:
 
-        stmt = select(FunctionTbl).where(FunctionTbl.filepath == filepath)
+        if lazy:
+            stmt = select(
+                FunctionTbl.fid,
+                FunctionTbl.name,
+                FunctionTbl.classname,
+                FunctionTbl.filepath,
+            ).where(FunctionTbl.filepath == filepath)
 
-        with self._db_session() as session:
-            results = session.scalars(stmt).all()
+            for row in self._stream(stmt):
+                yield self._lazy_function_from_row(row)
+            return
 
-        for fn in results:
-            analysis_data = msgpack.unpackb(fn.function_data, strict_map_key=False)
-            yield models.FunctionModel(**analysis_data)
+        stmt = select(FunctionTbl).where(FunctionTbl.filepath == filepath)
+
+        for fn in self._stream(stmt, scalars=True):
+            yield self._decode_function_data(fn.function_data)
 
     def get_callsites_by_filepath(
-        self, filepath: str
-    ) -> Iterator[tuple[models.FunctionModel, models.CallsiteModel]]:
+        self,
+        filepath: str,
+        lazy: bool = False,
+        group_by_function: bool = False,
+    ) -> Iterator[
+        tuple[models.FunctionModel, models.CallsiteModel]
+        | tuple[models.FunctionModel, list[models.CallsiteModel]]
+    ]:
 
         stmt = (
-            select(
-                FunctionTbl.function_data.label("function_data"),
-                CallsiteTbl.name.label("cs_name"),
-                CallsiteTbl.ssa_name.label("call_ssa_name"),
-            )
+            select(FunctionTbl.fid)
             .join(CallsiteTbl, FunctionTbl.fid == CallsiteTbl.fid)
             .where(CallsiteTbl.filepath == filepath)
         )
 
-        with self._db_session() as session:
-            results = session.execute(stmt).all()
-
-        for result in results:
-            analysis_data = msgpack.unpackb(result.function_data, strict_map_key=False)
-
-            function_model = models.FunctionModel(**analysis_data)
-
-            callsite = function_model.callsite_manager.callsites.get(
-                result.call_ssa_name
-            )
-
-            yield function_model, callsite
+        yield from self._iter_callsites_grouped_by_function(
+            stmt, group_by_function=group_by_function, lazy=lazy
+        )
 
     def search_functions(
         self,
         filter_by_name: str = None,
         filter_by_filepath: str = None,
         filter_by_classname: str = None,
-    ) -> Iterator[models.FunctionModel]:
+        lazy: bool = False,
+        match_type: models.SearchMatchType | str = None,
+    ) -> Iterator[models.FunctionModel | LazyFunctionModel]:
+
+        stmt = self._filter_functions(
+            select(FunctionTbl),
+            filter_by_name=filter_by_name,
+            filter_by_filepath=filter_by_filepath,
+            filter_by_classname=filter_by_classname,
+            match_type=match_type,
+        )
 
-        stmt = select(FunctionTbl)
+        if lazy:
+            stmt = stmt.with_only_columns(
+                FunctionTbl.fid,
+                FunctionTbl.name,
+                FunctionTbl.classname,
+                FunctionTbl.filepath,
+            )
 
-        if filter_by_name:
-            stmt = stmt.where(FunctionTbl.name.like(f"%{filter_by_name}%"))
-        if filter_by_filepath:
-            stmt = stmt.where(FunctionTbl.filepath.like(f"%{filter_by_filepath}%"))
-        if filter_by_classname:
-            stmt = stmt.where(FunctionTbl.classname == filter_by_classname)
+            for row in self._stream(stmt):
+                yield self._lazy_function_from_row(row)
+            return
+
+        for fn in self._stream(stmt, scalars=True):
+            yield self._decode_function_data(fn.function_data)
+
+    def build_function_summaries(self, rebuild: bool = False) -> int:
+        """
+        fill the FunctionTbl summary columns from function_data.
+        only rows without a summary are processed unless rebuild is True.
+        returns the number of functions updated.
+        """
+        total_updated = 0
+        last_fid = ""
 
         with self._db_session() as session:
-            results = session.scalars(stmt).all()
+            while True:
+                stmt = (
+                    select(FunctionTbl.fid, FunctionTbl.function_data)
+                    .where(FunctionTbl.fid > last_fid)
+                    .order_by(FunctionTbl.fid)
+                    .limit(FUNCTION_SUMMARIES_BATCH_SIZE)
+                )
+                if not rebuild:
+                    stmt = stmt.where(_missing_function_summary())
 
-        for fn in results:
-            analysis_data = msgpack.unpackb(fn.function_data, strict_map_key=False)
-            yield models.FunctionModel(**analysis_data)
+                rows = session.execute(stmt).all()
+                if not rows:
+                    break
 
-    def search_file_metadata(
-        self,
-        filter_by_filepath: str = None,
-    ) -> Iterator[models.FileMetadataModel]:
+                values = []
+                for row in rows:
+                    data = _unpack_function_data(row.function_data)
+                    values.append({"fid": row.fid, **_function_summary_values(data)})
 
-        stmt = select(FileMetadataTbl)
+                session.execute(update(FunctionTbl), values)
+                session.commit()
 
-        if filter_by_filepath:
-            stmt = stmt.where(FileMetadataTbl.filepath.like(f"%{filter_by_filepath}%"))
+                total_updated += len(values)
+                last_fid = rows[-1].fid
 
-        with self._db_session() as session:
-            results = session.scalars(stmt).all()
+        return total_updated
 
-        for fp in results:
-            file_metadata_data_decoded = msgpack.unpackb(
-                fp.file_metadata_data, strict_map_key=False
-            )
-            yield models.FileMetadataModel(**file_metadata_data_decoded)
+    def _has_function_summary_columns(self) -> bool:
+        """
+        False on a read-only database built before the summary columns.
+        """
+        return not self.read_only or self._has_columns(
+            "functions", "num_of_steps", "content_hash"
+        )
 
-    def search_callsites(
+    def search_function_summaries(
         self,
         filter_by_name: str = None,
         filter_by_filepath: str = None,
-        filter_by_num_of_args: int = None,
-    ) -> Iterator[tuple[models.FunctionModel, models.CallsiteModel]]:
+        filter_by_classname: str = None,
+        filter_by_min_steps: int = None,
+        match_type: models.SearchMatchType | str = None,
+    ) -> Iterator[models.FunctionSummaryModel]:
+        """
+        summaries are read from the summary columns, which are filled when
+        functions are written, or by build_function_summaries(). searching
+        never writes: functions without them (e.g in a downloaded build not
+        indexed yet) have theirs computed from the msgpack data instead,
+        still without building any models, and are listed without a
+        content_hash, see get_function_content_hash.
+        """
+        has_summary_columns = self._has_function_summary_columns()
+
+        columns = [
+            FunctionTbl.fid,
+            FunctionTbl.name,
+            FunctionTbl.classname,
+            FunctionTbl.filepath,
+        ]
+        if has_summary_columns:
+            columns += [
+                FunctionTbl.num_of_steps,
+                FunctionTbl.num_of_callsites,
+                FunctionTbl.num_of_variables,
+                FunctionTbl.lineno_start,
+                FunctionTbl.lineno_end,
+                FunctionTbl.content_hash,
+                # sqlite only reads the blob of rows without a summary
+                case(
+                    (_missing_function_summary(), FunctionTbl.function_data),
+                    else_=None,
+                ).label("function_data"),
+            ]
+        else:
+            columns.append(FunctionTbl.function_data)
+
+        stmt = self._filter_functions(
+            select(*columns),
+            filter_by_name=filter_by_name,
+            filter_by_filepath=filter_by_filepath,
+            filter_by_classname=filter_by_classname,
+            match_type=match_type,
+        )
+        if filter_by_min_steps is not None and has_summary_columns:
+            stmt = stmt.where(
+                or_(
+                    FunctionTbl.num_of_steps >= filter_by_min_steps,
+                    _missing_function_summary(),
+                )
+            )
 
-        stmt = select(
-            FunctionTbl.function_data.label("function_data"),
-            CallsiteTbl.ssa_name.label("call_ssa_name"),
-        ).join(CallsiteTbl, FunctionTbl.fid == CallsiteTbl.fid)
+        for row in self._stream(stmt):
+            if (
+                has_summary_columns
+                and row.num_of_steps is not None
+                and row.content_hash is not None
+            ):
+                values = {
+                    "num_of_steps": row.num_of_steps,
+                    "num_of_callsites": row.num_of_callsites,
+                    "num_of_variables": row.num_of_variables,
+                    "lineno_start": row.lineno_start,
+                    "lineno_end": row.lineno_end,
+                    "content_hash": row.content_hash,
+                }
+            else:
+                values = _function_summary_values(
+                    _unpack_function_data(row.function_data),
+                    with_content_hash=False,
+                )
+                if (
+                    filter_by_min_steps is not None
+                    and values["num_of_steps"] < filter_by_min_steps
+                ):
+                    continue
+
+            yield models.FunctionSummaryModel(
+                fid=row.fid,
+                name=row.name,
+                filepath=row.filepath,
+                class_name=row.classname,
+                **values,
+            )
 
-        if filter_by_name:
-            stmt = stmt.where(CallsiteTbl.name.like(f"%{filter_by_name}%"))
-        if filter_by_filepath:
-            stmt = stmt.where(FunctionTbl.filepath.like(f"%{filter_by_filepath}%"))
-        if filter_by_num_of_args is not None:
-            stmt = stmt.where(CallsiteTbl.num_of_args == filter_by_num_of_args)
+    def build_function_components(self, rebuild: bool = False) -> int:
+        """
+        split function_data into FunctionComponentTbl, so get_function_cfg,
+        get_function_variables, etc only read and decode what they need.
+        only functions without components, or with components of another
+        content hash, are processed unless rebuild is True. returns the
+        number of functions split.
+        """
+        # components are matched to their function by content hash
+        self.build_function_summaries()
+
+        total_inserted = 0
+        last_fid = ""
 
         with self._db_session() as session:
-            results = session.execute(stmt).all()
+            if rebuild:
+                session.execute(delete(FunctionComponentTbl))
+                session.commit()
 
-        for result in results:
-            analysis_data = msgpack.unpackb(result.function_data, strict_map_key=False)
+            while True:
+                stmt = (
+                    select(
+                        FunctionTbl.fid,
+                        FunctionTbl.content_hash,
+                        FunctionTbl.function_data,
+                    )
+                    .outerjoin(
+                        FunctionComponentTbl,
+                        (FunctionComponentTbl.fid == FunctionTbl.fid)
+                        & (
+                            FunctionComponentTbl.content_hash
+                            == FunctionTbl.content_hash
+                        ),
+                    )
+                    .where(FunctionComponentTbl.fid.is_(None))
+                    .where(FunctionTbl.fid > last_fid)
+                    .order_by(FunctionTbl.fid)
+                    .limit(FUNCTION_COMPONENTS_BATCH_SIZE)
+                )
 
-            function_model = models.FunctionModel(**analysis_data)
+                rows = session.execute(stmt).all()
+                if not rows:
+                    break
 
-            callsite = function_model.callsite_manager.callsites.get(
-                result.call_ssa_name
-            )
+                values = []
+                for row in rows:
+                    values.append(
+                        _function_component_row(
+                            row.fid,
+                            _unpack_function_data(row.function_data),
+                            row.content_hash,
+                        )
+                    )
 
-            yield function_model, callsite
+                # replaces stale components
+                session.execute(
+                    insert(FunctionComponentTbl).prefix_with("OR REPLACE"), values
+                )
+                session.commit()
 
-    def get_file_metadata_by_filepath(self, filepath: str) -> models.FileMetadataModel:
+                total_inserted += len(values)
+                last_fid = rows[-1].fid
 
-        stmt = select(FileMetadataTbl).where(FileMetadataTbl.filepath == filepath)
+        return total_inserted
 
-        with self._db_session() as session:
-            result = session.execute(stmt).scalar_one_or_none()
+    def _get_function_component_data(self, fid: str, component: str) -> tuple:
+        """
+        returns (encoded, None) with the msgpack encoded component from
+        FunctionComponentTbl, or (None, decoded) with the component decoded
+        from function_data when its components were not built, or are stale.
+        when fid is in the function cache, decoded is the component of the
+        cached model.
+        """
+        function_model = self._function_cache.get(fid)
+        if function_model is not None:
+            return None, getattr(function_model, component)
+
+        if self._function_components_available:
+            stmt = (
+                select(getattr(FunctionComponentTbl, component))
+                .join(FunctionTbl, FunctionTbl.fid == FunctionComponentTbl.fid)
+                .where(
+                    FunctionComponentTbl.fid == fid,
+                    FunctionComponentTbl.content_hash == FunctionTbl.content_hash,
+                )
+            )
+            with self._db_session() as session:
+                result = session.execute(stmt).one_or_none()
 
-            if result is None:
-                raise ValueError("FileMetadata not found")
+            if result is not None:
+                return result[0], None
 
-            file_metadata_data_decoded = msgpack.unpackb(
-                result.file_metadata_data, strict_map_key=False
-            )
+        stmt = select(FunctionTbl.function_data).where(FunctionTbl.fid == fid)
+        with self._db_session() as session:
+            function_data = session.execute(stmt).scalar_one_or_none()
+
+        if function_data is None:
+            raise ValueError(f"Function with id {fid} not found")
+
+        data = msgpack.unpackb(function_data, strict_map_key=False)
+        return None, data.get(component)
+
+    def _get_function_component(self, fid: str, component: str):
+        encoded, data = self._get_function_component_data(fid, component)
+        if encoded is not None:
+            data = msgpack.unpackb(encoded, strict_map_key=False)
+        return data
+
+    def get_function_cfg(self, fid: str) -> models.ControlFlowGraphModel:
+        data = self._get_function_component(fid, "cfg")
+        if data is None:
+            return models.ControlFlowGraphModel()
+        return models.ControlFlowGraphModel.model_validate(data)
+
+    def get_function_variables(self, fid: str) -> models.VariableManagerModel:
+        data = self._get_function_component(fid, "variable_manager")
+        if data is None:
+            return models.VariableManagerModel()
+        return models.VariableManagerModel.model_validate(data)
+
+    def get_function_callsites(self, fid: str) -> models.CallsiteManagerModel:
+        data = self._get_function_component(fid, "callsite_manager")
+        if data is None:
+            return models.CallsiteManagerModel()
+        return models.CallsiteManagerModel.model_validate(data)
+
+    def get_function_class_props(
+        self, fid: str
+    ) -> dict[str, models.TokenizedOperandModel]:
+        data = self._get_function_component(fid, "class_props") or {}
+        return {
+            name: models.TokenizedOperandModel.model_validate(operand)
+            for name, operand in data.items()
+        }
+
+    def get_function_steps(self, fid: str, start: int = 0, stop: int = None) -> list:
+        """
+        returns steps[start:stop] of a function. steps before start are
+        skipped without being decoded, and steps from stop onwards are never
+        read from the blob.
+        """
+        encoded, data = self._get_function_component_data(fid, "steps")
 
-        return models.FileMetadataModel(**file_metadata_data_decoded)
+        if encoded is None:
+            steps_data = (data or [])[start:stop]
+        else:
+            unpacker = msgpack.Unpacker(strict_map_key=False)
+            unpacker.feed(encoded)
+            try:
+                num_of_steps = unpacker.read_array_header()
+            except msgpack.UnpackValueError:
+                # steps were encoded as nil
+                num_of_steps = 0
+
+            start, stop, _ = slice(start, stop).indices(num_of_steps)
+            for _ in range(start):
+                unpacker.skip()
+            steps_data = [unpacker.unpack() for _ in range(max(stop - start, 0))]
+
+        return [
+            (
+                get_step_model(step["op"]).model_validate(step)
+                if isinstance(step, dict)
+                else step
+            )
+            for step in steps_data
+        ]
 
-    def get_functions_by_ids(self, fids: list[str]) -> dict[str, models.FunctionModel]:
-        stmt = select(FunctionTbl).where(FunctionTbl.fid.in_(fids))
+    def build_steps_index(self, rebuild: bool = False) -> int:
+        """
+        fill StepTbl/StepArgTbl from function_data, so search_steps can
+        filter steps in sqlite. only functions without rows are processed
+        unless rebuild is True. returns the number of functions indexed.
+        """
+        total_indexed = 0
+        last_fid = ""
 
         with self._db_session() as session:
-            results = session.scalars(stmt).all()
+            if rebuild:
+                session.execute(delete(StepArgTbl))
+                session.execute(delete(StepTbl))
+                session.commit()
 
-        out = {}
-        for fn in results:
-            data = msgpack.unpackb(fn.function_data, strict_map_key=False)
-            model = models.FunctionModel(**data)
-            out[fn.fid] = model
+            while True:
+                stmt = (
+                    select(FunctionTbl.fid, FunctionTbl.function_data)
+                    .where(~exists().where(StepTbl.fid == FunctionTbl.fid))
+                    .where(FunctionTbl.fid > last_fid)
+                    .order_by(FunctionTbl.fid)
+                    .limit(FUNCTION_SUMMARIES_BATCH_SIZE)
+                )
 
-        return out
+                rows = session.execute(stmt).all()
+                if not rows:
+                    break
 
-    def get_file_data_by_metadata(
-        self, file_metadata: models.FileMetadataModel
-    ) -> models.FileDataModel:
+                step_rows = []
+                arg_rows = []
+                for row in rows:
+                    data = msgpack.unpackb(row.function_data, strict_map_key=False)
+                    function_step_rows, function_arg_rows = _step_index_rows(
+                        row.fid, data
+                    )
+                    step_rows.extend(function_step_rows)
+                    arg_rows.extend(function_arg_rows)
 
-        if not isinstance(file_metadata, models.FileMetadataModel):
-            raise ValueError("file_metadata must be models.FileMetadataModel")
+                if step_rows:
+                    session.execute(insert(StepTbl), step_rows)
+                if arg_rows:
+                    session.execute(insert(StepArgTbl), arg_rows)
+                session.commit()
 
-        file_data = models.FileDataModel(filepath=file_metadata.filepath)
+                total_indexed += len(rows)
+                last_fid = rows[-1].fid
 
-        # collect ALL function IDs first
+        return total_indexed
+
+    def _has_index_rows(self, index_tbl) -> bool:
+        """
+        whether a derived index table (StepTbl, VariableTbl, ...) was built.
+        """
+        if self.read_only and not self._has_table(index_tbl.__tablename__):
+            return False
+
+        with self._db_session() as session:
+            return session.execute(select(index_tbl.fid).limit(1)).first() is not None
+
+    def search_steps(
+        self,
+        filter_by_fid: str = None,
+        filter_by_op: models.OpType | str = None,
+        filter_by_fname: str = None,
+        filter_by_num_of_args: int = None,
+        filter_by_arg_index: int = None,
+        filter_by_arg_token_type: models.TokenType | str = None,
+        filter_by_arg_value: str = None,
+        filter_by_arg_variable_name: str = None,
+        match_type: models.SearchMatchType | str = None,
+    ) -> Iterator[models.StepSummaryModel]:
+        """
+        filters run in sqlite over the steps index, see build_steps_index.
+        filter_by_fname and filter_by_arg_value are exact unless match_type
+        is given. arg filters must all hold for the same argument, which is
+        filter_by_arg_index (0-based) if given, else any argument.
+        """
+        if not self._has_index_rows(StepTbl):
+            raise ValueError("Steps index not built, run build_steps_index()")
+
+        stmt = select(
+            StepTbl.fid,
+            StepTbl.step_index,
+            StepTbl.op,
+            StepTbl.lineno,
+            StepTbl.basicblock_index,
+            StepTbl.fname,
+            StepTbl.num_of_args,
+        )
+
+        if filter_by_fid is not None:
+            stmt = stmt.where(StepTbl.fid == filter_by_fid)
+        if filter_by_op is not None:
+            stmt = stmt.where(StepTbl.op == str(filter_by_op).upper())
+        if filter_by_fname is not None:
+            stmt = stmt.where(
+                _match_condition(StepTbl.fname, filter_by_fname, match_type)
+            )
+        if filter_by_num_of_args is not None:
+            stmt = stmt.where(StepTbl.num_of_args == filter_by_num_of_args)
+
+        arg_conditions = []
+        if filter_by_arg_index is not None:
+            arg_conditions.append(StepArgTbl.arg_index == filter_by_arg_index)
+        if filter_by_arg_token_type is not None:
+            arg_conditions.append(
+                (" " + StepArgTbl.token_types + " ").like(
+                    f"% {str(filter_by_arg_token_type).upper()} %"
+                )
+            )
+        if filter_by_arg_value is not None:
+            arg_conditions.append(
+                _match_condition(StepArgTbl.value, filter_by_arg_value, match_type)
+            )
+        if filter_by_arg_variable_name is not None:
+            arg_conditions.append(
+                StepArgTbl.variable_name == filter_by_arg_variable_name
+            )
+
+        if arg_conditions:
+            stmt = stmt.where(
+                exists().where(
+                    StepArgTbl.fid == StepTbl.fid,
+                    StepArgTbl.step_index == StepTbl.step_index,
+                    *arg_conditions,
+                )
+            )
+
+        steps = self._stream(stmt.order_by(StepTbl.fid, StepTbl.step_index))
+
+        # fetch the arguments of each batch of steps in one query
+        while batch := list(itertools.islice(steps, self.stream_batch_size)):
+            yield from self._step_summaries_with_args(batch)
+
+    def _step_summaries_with_args(self, step_rows) -> Iterator[models.StepSummaryModel]:
+        args_by_step = {}
+
+        call_keys = [(row.fid, row.step_index) for row in step_rows if row.num_of_args]
+        if call_keys:
+            stmt = (
+                select(StepArgTbl)
+                .where(tuple_(StepArgTbl.fid, StepArgTbl.step_index).in_(call_keys))
+                .order_by(StepArgTbl.fid, StepArgTbl.step_index, StepArgTbl.arg_index)
+            )
+            with self._db_session() as session:
+                for arg in session.execute(stmt).scalars():
+                    args_by_step.setdefault((arg.fid, arg.step_index), []).append(
+                        models.StepArgSummaryModel(
+                            arg_index=arg.arg_index,
+                            ssa_name=arg.ssa_name,
+                            variable_name=arg.variable_name,
+                            token_types=(
+                                arg.token_types.split() if arg.token_types else []
+                            ),
+                            value=arg.value,
+                        )
+                    )
+
+        for row in step_rows:
+            yield models.StepSummaryModel(
+                fid=row.fid,
+                step_index=row.step_index,
+                op=row.op,
+                lineno=row.lineno if row.lineno is not None else -1,
+                basicblock_index=row.basicblock_index,
+                fname=row.fname,
+                num_of_args=row.num_of_args,
+                args=args_by_step.get((row.fid, row.step_index), []),
+            )
+
+    def build_variables_index(self, rebuild: bool = False) -> int:
+        """
+        fill VariableTbl from function_data, so variables can be searched
+        by name and type without decoding functions. only functions without
+        rows are processed unless rebuild is True. returns the number of
+        functions indexed.
+        """
+        total_indexed = 0
+        last_fid = ""
+
+        with self._db_session() as session:
+            if rebuild:
+                session.execute(delete(VariableTbl))
+                session.commit()
+
+            while True:
+                stmt = (
+                    select(
+                        FunctionTbl.fid, FunctionTbl.filepath, FunctionTbl.function_data
+                    )
+                    .where(~exists().where(VariableTbl.fid == FunctionTbl.fid))
+                    .where(FunctionTbl.fid > last_fid)
+                    .order_by(FunctionTbl.fid)
+                    .limit(FUNCTION_SUMMARIES_BATCH_SIZE)
+                )
+
+                rows = session.execute(stmt).all()
+                if not rows:
+                    break
+
+                values = []
+                for row in rows:
+                    data = msgpack.unpackb(row.function_data, strict_map_key=False)
+                    values.extend(_variable_index_rows(row.fid, row.filepath, data))
+
+                if values:
+                    session.execute(insert(VariableTbl), values)
+                session.commit()
+
+                total_indexed += len(rows)
+                last_fid = rows[-1].fid
+
+        return total_indexed
+
+    def _filter_variables(
+        self,
+        stmt,
+        filter_by_name: str = None,
+        filter_by_filepath: str = None,
+        filter_by_type_decl: str = None,
+        filter_by_full_decl: str = None,
+        is_local_var: bool = False,
+        is_tmp: bool = False,
+        is_farg: bool = False,
+        match_type: models.SearchMatchType | str = None,
+    ):
+        if not self._has_index_rows(VariableTbl):
+            raise ValueError("Variables index not built, run build_variables_index()")
+
+        if filter_by_name is not None:
+            stmt = stmt.where(
+                _match_condition(VariableTbl.name, filter_by_name, match_type)
+            )
+        if filter_by_filepath is not None:
+            stmt = stmt.where(VariableTbl.filepath.like(f"%{filter_by_filepath}%"))
+        if filter_by_type_decl is not None:
+            stmt = stmt.where(
+                _match_condition(
+                    VariableTbl.type_declaration, filter_by_type_decl, match_type
+                )
+            )
+        if filter_by_full_decl is not None:
+            stmt = stmt.where(
+                _match_condition(
+                    VariableTbl.full_declaration, filter_by_full_decl, match_type
+                )
+            )
+
+        vartypes = [
+            vartype.value
+            for vartype, selected in (
+                (models.VarType.LOCAL_VARIABLE, is_local_var),
+                (models.VarType.TMP_VARIABLE, is_tmp),
+                (models.VarType.FUNCTION_ARGUMENT, is_farg),
+            )
+            if selected
+        ]
+        if vartypes:
+            stmt = stmt.where(VariableTbl.vartype.in_(vartypes))
+
+        return stmt
+
+    def search_variable_summaries(
+        self,
+        filter_by_name: str = None,
+        filter_by_filepath: str = None,
+        filter_by_type_decl: str = None,
+        filter_by_full_decl: str = None,
+        is_local_var: bool = False,
+        is_tmp: bool = False,
+        is_farg: bool = False,
+        match_type: models.SearchMatchType | str = None,
+    ) -> Iterator[models.VariableSummaryModel]:
+        """
+        name and declaration filters are exact unless match_type is given,
+        the filepath filter is a substring match. is_local_var, is_tmp and
+        is_farg select variables of any of the chosen kinds.
+        """
+        stmt = self._filter_variables(
+            select(VariableTbl),
+            filter_by_name=filter_by_name,
+            filter_by_filepath=filter_by_filepath,
+            filter_by_type_decl=filter_by_type_decl,
+            filter_by_full_decl=filter_by_full_decl,
+            is_local_var=is_local_var,
+            is_tmp=is_tmp,
+            is_farg=is_farg,
+            match_type=match_type,
+        )
+
+        for var in self._stream(stmt, scalars=True):
+            yield models.VariableSummaryModel(
+                fid=var.fid,
+                name=var.name,
+                filepath=var.filepath,
+                vartype=var.vartype or models.VarType.UNDEF,
+                type_declaration=var.type_declaration,
+                full_declaration=var.full_declaration,
+                num_of_ssa_versions=var.num_of_ssa_versions or 0,
+            )
+
+    def search_variables(
+        self,
+        filter_by_name: str = None,
+        filter_by_filepath: str = None,
+        filter_by_type_decl: str = None,
+        filter_by_full_decl: str = None,
+        is_local_var: bool = False,
+        is_tmp: bool = False,
+        is_farg: bool = False,
+        match_type: models.SearchMatchType | str = None,
+    ) -> Iterator[tuple[models.FunctionModel, models.VariableModel]]:
+        """
+        same filters as search_variable_summaries, matched in sqlite. only
+        functions with a matching variable are decoded, once each.
+        """
+        stmt = self._filter_variables(
+            select(VariableTbl.fid, VariableTbl.name),
+            filter_by_name=filter_by_name,
+            filter_by_filepath=filter_by_filepath,
+            filter_by_type_decl=filter_by_type_decl,
+            filter_by_full_decl=filter_by_full_decl,
+            is_local_var=is_local_var,
+            is_tmp=is_tmp,
+            is_farg=is_farg,
+            match_type=match_type,
+        ).order_by(VariableTbl.fid)
+
+        for fid, rows in itertools.groupby(self._stream(stmt), key=lambda row: row.fid):
+            function_model = self.get_function_by_id(fid)
+            for row in rows:
+                yield function_model, function_model.variable_manager.variables.get(
+                    row.name
+                )
+
+    def get_total_variables(self) -> int:
+        """
+        counted from the variables index, or from the function summaries
+        when it is not built.
+        """
+        if not self._has_index_rows(VariableTbl):
+            return sum(
+                summary.num_of_variables for summary in self.search_function_summaries()
+            )
+        return self._scalar_count(VariableTbl)
+
+    def build_callgraph(self) -> CallGraph:
+        """
+        (re)build the call graph from FunctionTbl and CallsiteTbl, and
+        persist it unless the database is read-only.
+        """
+        with self._db_engine.connect() as conn:
+            state = self._function_tables_state(conn)
+
+        function_stmt = select(FunctionTbl.fid, FunctionTbl.name, FunctionTbl.filepath)
+        callsite_stmt = select(CallsiteTbl.fid, CallsiteTbl.name)
+
+        callgraph = CallGraph.build(
+            functions=(tuple(row) for row in self._stream(function_stmt)),
+            callsites=(tuple(row) for row in self._stream(callsite_stmt)),
+        )
+
+        if not self.read_only:
+            with self._db_session() as session:
+                session.execute(delete(CallGraphTbl))
+                session.add(
+                    CallGraphTbl(
+                        id=1,
+                        callgraph_data=msgpack.packb(callgraph.to_dict()),
+                        **state,
+                    )
+                )
+                session.commit()
+
+        self._callgraph = callgraph
+        return callgraph
+
+    def _load_callgraph(self) -> CallGraph | None:
+        if self.read_only and not (
+            self._has_table(CallGraphTbl.__tablename__)
+            and self._has_columns(
+                CallGraphTbl.__tablename__, "max_function_rowid", "max_callsite_rowid"
+            )
+        ):
+            return None
+
+        with self._db_engine.connect() as conn:
+            state = self._function_tables_state(conn)
+
+        with self._db_session() as session:
+            result = session.execute(select(CallGraphTbl)).scalar_one_or_none()
+            if result is None:
+                return None
+
+            built_state = {
+                name: getattr(result, name)
+                for name in (
+                    "num_of_functions",
+                    "max_function_rowid",
+                    "num_of_callsites",
+                    "max_callsite_rowid",
+                )
+            }
+            if built_state != state:
+                return None
+
+            data = msgpack.unpackb(result.callgraph_data, strict_map_key=False)
+
+        return CallGraph.from_dict(data)
+
+    def get_callgraph(self, rebuild: bool = False) -> CallGraph:
+        """
+        the whole-program call graph, loaded from the database if it was
+        built before (and is not stale), else built and persisted.
+        """
+        if rebuild:
+            return self.build_callgraph()
+
+        if self._callgraph is None:
+            self._callgraph = self._load_callgraph() or self.build_callgraph()
+        return self._callgraph
+
+    def iter_function_content_hashes(self) -> Iterator[tuple[str, str]]:
+        """
+        yields (fid, content_hash) for every function, ordered by fid.
+        hashes not stored yet are computed on the fly.
+        """
+        if self._has_function_summary_columns():
+            stmt = select(
+                FunctionTbl.fid,
+                FunctionTbl.content_hash,
+                case(
+                    (FunctionTbl.content_hash.is_(None), FunctionTbl.function_data),
+                    else_=None,
+                ).label("function_data"),
+            )
+        else:
+            stmt = select(
+                FunctionTbl.fid,
+                literal(None, String).label("content_hash"),
+                FunctionTbl.function_data,
+            )
+
+        for row in self._stream(stmt.order_by(FunctionTbl.fid)):
+            if row.content_hash is not None:
+                yield row.fid, row.content_hash
+            else:
+                yield row.fid, _function_content_hash(
+                    _unpack_function_data(row.function_data)
+                )
+
+    def get_function_content_hash(self, fid: str) -> str:
+        """
+        the stored content hash of fid, computed from its function data if
+        the database has none yet.
+        """
+        if not self.read_only or self._has_columns("functions", "content_hash"):
+            with self._db_session() as session:
+                content_hash = session.execute(
+                    select(FunctionTbl.content_hash).where(FunctionTbl.fid == fid)
+                ).scalar_one_or_none()
+            if content_hash is not None:
+                return content_hash
+
+        with self._db_session() as session:
+            function_data = session.execute(
+                select(FunctionTbl.function_data).where(FunctionTbl.fid == fid)
+            ).scalar_one_or_none()
+
+        if function_data is None:
+            raise ValueError(f"Function with id {fid} not found")
+
+        return _function_content_hash(_unpack_function_data(function_data))
+
+    def search_file_metadata(
+        self,
+        filter_by_filepath: str = None,
+    ) -> Iterator[models.FileMetadataModel]:
+
+        stmt = select(FileMetadataTbl)
+
+        if filter_by_filepath:
+            stmt = stmt.where(FileMetadataTbl.filepath.like(f"%{filter_by_filepath}%"))
+
+        for fp in self._stream(stmt, scalars=True):
+            file_metadata_data_decoded = msgpack.unpackb(
+                fp.file_metadata_data, strict_map_key=False
+            )
+            yield models.FileMetadataModel(**file_metadata_data_decoded)
+
+    def search_callsites(
+        self,
+        filter_by_name: str = None,
+        filter_by_filepath: str = None,
+        filter_by_num_of_args: int = None,
+        lazy: bool = False,
+        group_by_function: bool = False,
+        match_type: models.SearchMatchType | str = None,
+    ) -> Iterator[
+        tuple[models.FunctionModel, models.CallsiteModel]
+        | tuple[models.FunctionModel, list[models.CallsiteModel]]
+    ]:
+
+        stmt = select(FunctionTbl.fid).join(
+            CallsiteTbl, FunctionTbl.fid == CallsiteTbl.fid
+        )
+
+        if filter_by_name:
+            stmt = self._filter_callsites_by_name(stmt, filter_by_name, match_type)
+        if filter_by_filepath:
+            stmt = stmt.where(FunctionTbl.filepath.like(f"%{filter_by_filepath}%"))
+        if filter_by_num_of_args is not None:
+            stmt = stmt.where(CallsiteTbl.num_of_args == filter_by_num_of_args)
+
+        yield from self._iter_callsites_grouped_by_function(
+            stmt, group_by_function=group_by_function, lazy=lazy
+        )
+
+    def get_file_metadata_by_filepath(self, filepath: str) -> models.FileMetadataModel:
+
+        stmt = select(FileMetadataTbl).where(FileMetadataTbl.filepath == filepath)
+
+        with self._db_session() as session:
+            result = session.execute(stmt).scalar_one_or_none()
+
+            if result is None:
+                raise ValueError("FileMetadata not found")
+
+            file_metadata_data_decoded = msgpack.unpackb(
+                result.file_metadata_data, strict_map_key=False
+            )
+
+        return models.FileMetadataModel(**file_metadata_data_decoded)
+
+    def get_functions_by_ids(self, fids: list[str]) -> dict[str, models.FunctionModel]:
+        """
+        models of fids from the function cache, reading and decoding the
+        missing ones in one query. fids not in the database are left out.
+        as for get_function_by_id, the models are shared while cached.
+        """
+        out = {}
+        missing_fids = []
+
+        for fid in fids:
+            function_model = self._function_cache.get(fid)
+            if function_model is not None:
+                out[fid] = function_model
+            else:
+                missing_fids.append(fid)
+
+        if not missing_fids:
+            return out
+
+        stmt = select(FunctionTbl.fid, FunctionTbl.function_data).where(
+            FunctionTbl.fid.in_(missing_fids)
+        )
+
+        for row in self._stream(stmt):
+            function_model = self._decode_function_data(row.function_data)
+            self._function_cache.put(
+                row.fid, function_model, size=len(row.function_data)
+            )
+            out[row.fid] = function_model
+
+        return out
+
+    def get_file_data_by_metadata(
+        self, file_metadata: models.FileMetadataModel
+    ) -> models.FileDataModel:
+
+        if not isinstance(file_metadata, models.FileMetadataModel):
+            raise ValueError("file_metadata must be models.FileMetadataModel")
+
+        file_data = models.FileDataModel(filepath=file_metadata.filepath)
+
+        # collect ALL function IDs first
         all_fids = set(file_metadata.functions.keys())
 
         for class_meta in file_metadata.classes.values():
             all_fids.update(class_meta.class_methods.keys())
 
-        # batch load once
-        functions_map = self.get_functions_by_ids(list(all_fids))
+        # batch load once
+        functions_map = self.get_functions_by_ids(list(all_fids))
+
+        # assign functions
+        for fid in file_metadata.functions.keys():
+            file_data.functions[fid] = functions_map.get(fid)
+
+        # assign classes
+        for classname, class_meta in file_metadata.classes.items():
+            class_data = models.ClassDataModel()
+            class_data.class_props = class_meta.class_props
+
+            for class_fid in class_meta.class_methods.keys():
+                class_data.class_methods[class_fid] = functions_map.get(class_fid)
+
+            file_data.classes[classname] = class_data
+
+        return file_data
+
+    def get_file_data_by_filepath(self, filepath: str) -> models.FileDataModel:
+        file_metadata: models.FileMetadataModel = self.get_file_metadata_by_filepath(
+            filepath
+        )
+        file_data: models.FileDataModel = self.get_file_data_by_metadata(file_metadata)
+        return file_data
+
+    def _encode_dataflow_action_request_to_b64(self, df_reqeust):
+        request_bytes = dill.dumps(df_reqeust)
+        request_b64 = base64.b64encode(request_bytes).decode("utf-8")
+        return request_b64
+
+    def _decode_dataflow_action_request_from_b64(self, df_reqeust_64):
+        df_reqeust_b64 = base64.b64decode(df_reqeust_64)
+        df_reqeust = dill.loads(df_reqeust_b64)
+        if isinstance(df_reqeust, dict) and DATAFLOW_REQUEST_REF_KEY in df_reqeust:
+            df_reqeust = self._resolve_dataflow_request_ref(df_reqeust)
+        return df_reqeust
+
+    def _stored_function_content_hash(
+        self, function: models.FunctionModel
+    ) -> Optional[str]:
+        """
+        the content hash of function if it is the one stored under its fid,
+        hashed from the model as the stored blob is (see _steps_content_hash),
+        without loading the stored function. None otherwise.
+        """
+        try:
+            stored_content_hash = self.get_function_content_hash(function.fid)
+        except ValueError:
+            return None
+
+        if _steps_content_hash(function.steps) != stored_content_hash:
+            return None
+        return stored_content_hash
+
+    def _dataflow_request_ref(self, df_reqeust: models.DataflowRequestModel):
+        """
+        a compact form of df_reqeust referencing its function by fid and
+        content hash, or None if the function isn't the one stored under its
+        fid (e.g a modified copy) and has to be encoded as a whole.
+        """
+        function = df_reqeust.function
+        content_hash = self._stored_function_content_hash(function)
+        if content_hash is None:
+            return None
+
+        return {
+            DATAFLOW_REQUEST_REF_KEY: {
+                "fid": function.fid,
+                "content_hash": content_hash,
+            },
+            # plain values (e.g sink_specs as dicts), as pickled models carry
+            # a set of their fields whose order varies between processes
+            "request": df_reqeust.model_dump(exclude={"function"}),
+        }
+
+    def _resolve_dataflow_request_ref(
+        self, df_reqeust_ref: dict
+    ) -> Optional[models.DataflowRequestModel]:
+        """
+        None if the function changed or was removed since the request was
+        made, so that one stale action doesn't fail listing the others.
+        """
+        function_ref = df_reqeust_ref[DATAFLOW_REQUEST_REF_KEY]
+        fid = function_ref["fid"]
+
+        try:
+            if self.get_function_content_hash(fid) != function_ref["content_hash"]:
+                return None
+        except ValueError:
+            return None
+
+        return models.DataflowRequestModel(
+            function=self.get_function_by_id(fid), **df_reqeust_ref["request"]
+        )
+
+    def _encode_dataflow_request(
+        self, df_reqeust: models.DataflowRequestModel
+    ) -> tuple[str, str, Optional[str]]:
+        """
+        returns (request_b64, request_hash, function content hash). requests
+        on stored functions are encoded by reference, see
+        _dataflow_request_ref, and the hash is taken over the encoded bytes,
+        so it changes along with the function. the content hash is None for
+        requests encoded whole.
+        """
+        df_reqeust_ref = self._dataflow_request_ref(df_reqeust)
+        request_bytes = dill.dumps(
+            df_reqeust if df_reqeust_ref is None else df_reqeust_ref
+        )
+        request_b64 = base64.b64encode(request_bytes).decode("utf-8")
+
+        content_hash = None
+        if df_reqeust_ref is not None:
+            content_hash = df_reqeust_ref[DATAFLOW_REQUEST_REF_KEY]["content_hash"]
+
+        return request_b64, _hash_byte_str(request_bytes), content_hash
+
+    def get_cached_dataflow_action(
+        self,
+        request_hash: str,
+        max_age: timedelta | float = None,
+        engine: str = "remote",
+    ) -> Optional[models.DataflowActionModel]:
+        """
+        the latest DONE action with request_hash and a successful response
+        from engine, or None. actions created more than max_age (a timedelta
+        or seconds) ago, or deleted after read, are not used.
+        """
+        stmt = (
+            select(DataflowActionTbl.action_id)
+            .where(
+                DataflowActionTbl.dataflow_request_hash == request_hash,
+                DataflowActionTbl.status == models.DataflowActionStatusType.DONE.value,
+                DataflowActionTbl.engine == engine,
+                DataflowActionTbl.response_status.is_(True),
+                or_(
+                    DataflowActionTbl.delete_after_read.is_(None),
+                    DataflowActionTbl.delete_after_read.is_(False),
+                ),
+            )
+            .order_by(
+                DataflowActionTbl.data_created.desc(),
+                DataflowActionTbl.action_id.desc(),
+            )
+            .limit(1)
+        )
+
+        if max_age is not None:
+            if not isinstance(max_age, timedelta):
+                max_age = timedelta(seconds=max_age)
+            created_after = datetime.now(timezone.utc) - max_age
+            stmt = stmt.where(
+                type_coerce(DataflowActionTbl.data_created, String)
+                >= created_after.strftime("%Y-%m-%d %H:%M:%S")
+            )
+
+        with self._db_session() as session:
+            action_id = session.execute(stmt).scalar_one_or_none()
+
+        if action_id is None:
+            return None
+
+        return self.get_dataflow_action(action_id)
+
+    def invalidate_dataflow_cache(self, fids: Iterable[str] = None) -> int:
+        """
+        delete the DONE actions (of fids, or of all functions) whose function
+        content hash no longer matches the function in the database, or whose
+        function is gone, e.g after loading a new build. returns how many
+        were deleted.
+        """
+        stmt = (
+            select(DataflowActionTbl.fid, DataflowActionTbl.function_content_hash)
+            .where(
+                DataflowActionTbl.status == models.DataflowActionStatusType.DONE.value,
+                DataflowActionTbl.function_content_hash.is_not(None),
+            )
+            .distinct()
+        )
+        if fids is not None:
+            stmt = stmt.where(DataflowActionTbl.fid.in_(list(fids)))
+
+        with self._db_session() as session:
+            cached = session.execute(stmt).all()
+
+        stale = []
+        for fid, content_hash in cached:
+            try:
+                if self.get_function_content_hash(fid) == content_hash:
+                    continue
+            except ValueError:
+                pass
+            stale.append((fid, content_hash))
+
+        if not stale:
+            return 0
+
+        with self._db_session() as session:
+            try:
+                result = session.execute(
+                    delete(DataflowActionTbl.__table__).where(
+                        DataflowActionTbl.status
+                        == models.DataflowActionStatusType.DONE.value,
+                        tuple_(
+                            DataflowActionTbl.fid,
+                            DataflowActionTbl.function_content_hash,
+                        ).in_(stale),
+                    )
+                )
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+        return result.rowcount
+
+    def create_dataflow_action(
+        self,
+        df_reqeust: models.DataflowRequestModel,
+        delete_after_read: bool = False,
+        use_cached_response: bool = False,
+        cache_max_age: timedelta | float = None,
+        engine: str = "remote",
+    ) -> models.DataflowActionModel:
+        """
+        with use_cached_response, the latest successful DONE action of engine
+        for the same request (within cache_max_age, see
+        get_cached_dataflow_action) is returned instead of creating a new one.
+        """
+        df_request_b64, request_hash, content_hash = self._encode_dataflow_request(
+            df_reqeust
+        )
+
+        if use_cached_response:
+            df_action = self.get_cached_dataflow_action(
+                request_hash, max_age=cache_max_age, engine=engine
+            )
+            if df_action is not None:
+                return df_action
+
+        df_response = models.DataflowResponseModel(status=True, paths=[])
+        df_response_b64 = self._encode_dataflow_action_request_to_b64(df_response)
+
+        self._ensure_dataflow_db()
+        with self._db_session() as session:
+            try:
+                df = DataflowActionTbl(
+                    status=models.DataflowActionStatusType.LOCAL_PENDING.value,
+                    dataflow_request_hash=request_hash,
+                    dataflow_request_b64=df_request_b64,
+                    dataflow_response_b64=df_response_b64,
+                    delete_after_read=bool(delete_after_read),
+                    fid=df_reqeust.function.fid,
+                    function_content_hash=content_hash,
+                    engine=engine,
+                )
+
+                session.add(df)
+                session.commit()
+
+                # ensure values are loaded after commit
+                session.refresh(df)
+
+                return models.DataflowActionModel(
+                    action_id=df.action_id,
+                    status=models.DataflowActionStatusType.LOCAL_PENDING,
+                    request_hash=request_hash,
+                    request=df_reqeust,
+                    response=df_response,
+                    remote_action_id=df.remote_action_id,
+                    data_created=df.data_created_as_ts(),
+                )
+
+            except IntegrityError:
+                session.rollback()
+                raise
+
+            except Exception:
+                session.rollback()
+                raise
+
+    def _dataflow_callees(
+        self, function: models.FunctionModel, fname: str
+    ) -> list[models.FunctionModel]:
+        """
+        functions named fname, preferring those in function's own file (e.g
+        static functions), as in the call graph.
+        """
+        stmt = select(FunctionTbl.fid).where(FunctionTbl.name == fname)
+
+        with self._db_session() as session:
+            fids = session.scalars(
+                stmt.where(FunctionTbl.filepath == function.filepath).limit(
+                    DATAFLOW_MAX_RESOLVED_FUNCTIONS
+                )
+            ).all()
+            if not fids:
+                fids = session.scalars(
+                    stmt.limit(DATAFLOW_MAX_RESOLVED_FUNCTIONS)
+                ).all()
+
+        return list(self.get_functions_by_ids(fids).values())
+
+    def _dataflow_callers(
+        self, function: models.FunctionModel
+    ) -> list[tuple[models.FunctionModel, int]]:
+        """
+        (caller, call step index) of the callsites resolving to function.
+        """
+        # calls from a file defining its own function with that name stay there
+        shadowing_filepaths = select(FunctionTbl.filepath).where(
+            FunctionTbl.name == function.name,
+            FunctionTbl.filepath != function.filepath,
+        )
+        stmt = (
+            select(CallsiteTbl.fid, CallsiteTbl.ssa_name)
+            .join(FunctionTbl, FunctionTbl.fid == CallsiteTbl.fid)
+            .where(
+                CallsiteTbl.name == function.name,
+                FunctionTbl.filepath.not_in(shadowing_filepaths),
+            )
+            .limit(DATAFLOW_MAX_RESOLVED_FUNCTIONS)
+        )
+
+        with self._db_session() as session:
+            rows = session.execute(stmt).all()
+
+        callers = self.get_functions_by_ids(list({fid for fid, _ in rows}))
+
+        out = []
+        for fid, ssa_name in rows:
+            caller = callers.get(fid)
+            callsite = caller.callsite_manager.by_ssa_name(ssa_name) if caller else None
+            if callsite is not None:
+                out.append((caller, callsite.step_index))
+        return out
+
+    def get_function_dataflow_summary(
+        self,
+        fid: str,
+        function: models.FunctionModel = None,
+        deadline: float = None,
+    ) -> models.FunctionDataflowSummaryModel:
+        """
+        where the parameters of fid flow to (see summarize_function_dataflow),
+        computed on first use by deadline at the latest, and stored for its
+        current content hash once final (see _summarize_function_dataflow),
+        including incomplete ones that used their whole time budget.
+        function, if given, is the already loaded fid.
+        """
+        content_hash = self.get_function_content_hash(fid)
+
+        summary = self._load_function_dataflow_summary(fid, content_hash)
+        if summary is not None:
+            return summary
+
+        summary, is_final = _summarize_function_dataflow(
+            function or self.get_function_by_id(fid), content_hash, deadline=deadline
+        )
+        if not is_final:
+            return summary
+
+        self._ensure_dataflow_db()
+        with self._db_session() as session:
+            self._store_function_dataflow_summaries(
+                session, [(fid, content_hash, summary)]
+            )
+            session.commit()
+
+        return summary
+
+    def _load_function_dataflow_summary(
+        self, fid: str, content_hash: str
+    ) -> Optional[models.FunctionDataflowSummaryModel]:
+        with self._db_session() as session:
+            summary_data = session.execute(
+                select(FunctionDataflowSummaryTbl.summary_data).where(
+                    FunctionDataflowSummaryTbl.fid == fid,
+                    FunctionDataflowSummaryTbl.content_hash == content_hash,
+                )
+            ).scalar_one_or_none()
+
+        if summary_data is None:
+            return None
+
+        return models.FunctionDataflowSummaryModel(
+            **msgpack.unpackb(summary_data, strict_map_key=False)
+        )
+
+    def _store_function_dataflow_summaries(self, session, summaries: list[tuple]):
+        """
+        store (fid, content_hash, summary) tuples in session's transaction,
+        dropping the summaries of previous versions of those functions.
+        """
+        summary_by_fid = {
+            fid: (fid, hash_, summary) for fid, hash_, summary in summaries
+        }
+
+        session.execute(
+            delete(FunctionDataflowSummaryTbl).where(
+                FunctionDataflowSummaryTbl.fid.in_(list(summary_by_fid))
+            )
+        )
+        session.execute(
+            insert(FunctionDataflowSummaryTbl),
+            [
+                {
+                    "fid": fid,
+                    "content_hash": content_hash,
+                    "summary_data": msgpack.packb(summary.model_dump()),
+                }
+                for fid, content_hash, summary in summary_by_fid.values()
+            ],
+        )
+
+    def _run_local_dataflow_engine(
+        self, df_reqeust: models.DataflowRequestModel, resolve_summary
+    ) -> models.DataflowResponseModel:
+        return LocalDataflowEngine(
+            resolve_callees=self._dataflow_callees,
+            resolve_callers=self._dataflow_callers,
+            resolve_summary=resolve_summary,
+        ).run(df_reqeust)
 
-        # assign functions
-        for fid in file_metadata.functions.keys():
-            file_data.functions[fid] = functions_map.get(fid)
+    def _dataflow_run_unstored(
+        self,
+        df_reqeust: models.DataflowRequestModel,
+        use_cached_response: bool = True,
+        cache_max_age: timedelta | float = None,
+        summaries: dict = None,
+    ) -> _UnstoredDataflowRun:
+        """
+        dataflow_run_local, reading the database but not writing to it.
+        summaries maps (fid, content_hash) to final summaries computed by
+        earlier runs and not stored yet, and receives the ones this run
+        computes. store the run with _store_dataflow_runs.
+        """
+        request_b64, request_hash, content_hash = self._encode_dataflow_request(
+            df_reqeust
+        )
 
-        # assign classes
-        for classname, class_meta in file_metadata.classes.items():
-            class_data = models.ClassDataModel()
-            class_data.class_props = class_meta.class_props
+        if use_cached_response:
+            df_action = self.get_cached_dataflow_action(
+                request_hash, max_age=cache_max_age, engine="local"
+            )
+            if df_action is not None:
+                return _UnstoredDataflowRun(cached_action=df_action)
+
+        summaries = {} if summaries is None else summaries
+        computed_summaries = []
+
+        def resolve_summary(function, deadline):
+            key = (function.fid, self.get_function_content_hash(function.fid))
+            summary = summaries.get(key) or self._load_function_dataflow_summary(*key)
+            if summary is None:
+                summary, is_final = _summarize_function_dataflow(
+                    function, key[1], deadline=deadline
+                )
+                if is_final:
+                    summaries[key] = summary
+                    computed_summaries.append((*key, summary))
+            return summary
+
+        return _UnstoredDataflowRun(
+            request_b64=request_b64,
+            request_hash=request_hash,
+            content_hash=content_hash,
+            response=self._run_local_dataflow_engine(df_reqeust, resolve_summary),
+            summaries=tuple(computed_summaries),
+        )
 
-            for class_fid in class_meta.class_methods.keys():
-                class_data.class_methods[class_fid] = functions_map.get(class_fid)
+    def _store_dataflow_runs(
+        self,
+        runs: list[tuple[models.DataflowRequestModel, _UnstoredDataflowRun]],
+        delete_after_read: bool = False,
+    ) -> list[models.DataflowActionModel]:
+        """
+        store (request, run) pairs from _dataflow_run_unstored as DONE local
+        actions, with their indexed paths and computed summaries, in one
+        transaction, and return their actions in order. runs reusing a
+        cached response store nothing, and with delete_after_read the
+        actions themselves are not stored.
+        """
+        out = []
+        stored_actions = []
+        action_rows = []
+        summaries = []
+        # as the server default would have set it
+        data_created = datetime.now(timezone.utc).replace(microsecond=0)
 
-            file_data.classes[classname] = class_data
+        for df_reqeust, run in runs:
+            summaries.extend(run.summaries)
 
-        return file_data
+            if run.cached_action is not None:
+                out.append(run.cached_action.model_copy(update={"request": df_reqeust}))
+                continue
 
-    def get_file_data_by_filepath(self, filepath: str) -> models.FileDataModel:
-        file_metadata: models.FileMetadataModel = self.get_file_metadata_by_filepath(
-            filepath
-        )
-        file_data: models.FileDataModel = self.get_file_data_by_metadata(file_metadata)
-        return file_data
+            df_action = models.DataflowActionModel(
+                action_id=generate_uuid(),
+                status=models.DataflowActionStatusType.DONE,
+                request_hash=run.request_hash,
+                request=df_reqeust,
+                response=run.response,
+                data_created=_datetime_as_ts(data_created),
+            )
+            out.append(df_action)
+
+            if not delete_after_read:
+                stored_actions.append(df_action)
+                action_rows.append(
+                    {
+                        "action_id": str(df_action.action_id),
+                        "status": models.DataflowActionStatusType.DONE.value,
+                        "dataflow_request_hash": run.request_hash,
+                        "dataflow_request_b64": run.request_b64,
+                        "dataflow_response_b64": (
+                            self._encode_dataflow_action_request_to_b64(run.response)
+                        ),
+                        "delete_after_read": False,
+                        "fid": df_reqeust.function.fid,
+                        "function_content_hash": run.content_hash,
+                        "engine": "local",
+                        "response_status": run.response.status,
+                        "data_created": data_created,
+                    }
+                )
 
-    def _encode_dataflow_action_request_to_b64(self, df_reqeust):
-        request_bytes = dill.dumps(df_reqeust)
-        request_b64 = base64.b64encode(request_bytes).decode("utf-8")
-        return request_b64
+        if not action_rows and not summaries:
+            return out
 
-    def _decode_dataflow_action_request_from_b64(self, df_reqeust_64):
-        df_reqeust_b64 = base64.b64decode(df_reqeust_64)
-        df_reqeust = dill.loads(df_reqeust_b64)
-        return df_reqeust
+        self._ensure_dataflow_db()
+        with self._db_session() as session:
+            if action_rows:
+                session.execute(insert(DataflowActionTbl), action_rows)
+                self._index_dataflow_paths(
+                    session,
+                    [
+                        (
+                            df_action.action_id,
+                            df_action.request.function.fid,
+                            df_action.response,
+                        )
+                        for df_action in stored_actions
+                    ],
+                )
+            if summaries:
+                self._store_function_dataflow_summaries(session, summaries)
+            session.commit()
 
-    def create_dataflow_action(
+        return out
+
+    def dataflow_run_local(
         self,
         df_reqeust: models.DataflowRequestModel,
         delete_after_read: bool = False,
+        use_cached_response: bool = True,
+        cache_max_age: timedelta | float = None,
     ) -> models.DataflowActionModel:
+        """
+        run df_reqeust with the LocalDataflowEngine, without the remote
+        service, and store it as a DONE action. only successful responses
+        are reused by later local runs, see get_cached_dataflow_action. up
+        to df_reqeust.max_call_depth calls are followed, loading the
+        functions involved from the database, and calls past it use the
+        dataflow summaries of the called functions.
+
+        the action is only stored once the run is done, so a run that fails
+        or is interrupted leaves no LOCAL_PENDING action behind for
+        dataflow_update to send to the remote service.
+        """
+        run = self._dataflow_run_unstored(
+            df_reqeust,
+            use_cached_response=use_cached_response,
+            cache_max_age=cache_max_age,
+        )
+        (df_action,) = self._store_dataflow_runs(
+            [(df_reqeust, run)], delete_after_read=delete_after_read
+        )
+        return df_action
 
-        df_request_b64 = self._encode_dataflow_action_request_to_b64(df_reqeust)
-        request_bytes = base64.b64decode(df_request_b64)
-        request_hash = _hash_byte_str(request_bytes)
+    def dataflow_run_many(
+        self,
+        df_requests: Iterable[models.DataflowRequestModel],
+        workers: int = None,
+        ordered: bool = True,
+        delete_after_read: bool = False,
+        use_cached_response: bool = True,
+        cache_max_age: timedelta | float = None,
+    ) -> Iterator[models.DataflowActionModel]:
+        """
+        run df_requests with the LocalDataflowEngine in `workers` processes
+        (default: one per CPU), yielding their actions in request order, or
+        with ordered=False, as they complete. workers only read the
+        database: their responses and the summaries they compute are sent
+        back and stored here, a batch of completed requests per transaction.
 
-        df_response = models.DataflowResponseModel(status=True, paths=[])
-        df_response_b64 = self._encode_dataflow_action_request_to_b64(df_response)
+        the requests must share one sink_callback_fn, which is sent once to
+        every worker. functions stored in the database are sent by fid and
+        loaded by the workers. requests are consumed lazily, a few per
+        worker ahead of the results.
 
-        with self._db_session() as session:
-            try:
-                df = DataflowActionTbl(
-                    status=models.DataflowActionStatusType.LOCAL_PENDING.value,
-                    dataflow_request_hash=request_hash,
-                    dataflow_request_b64=df_request_b64,
-                    dataflow_response_b64=df_response_b64,
-                    delete_after_read=bool(delete_after_read),
+        Example:
+            df_requests = (
+                models.DataflowRequestModel(
+                    function=fn, source_variable_name="len", sink_callback_fn=sink
                 )
+                for fn in api.search_functions(filter_by_filepath="net/")
+            )
+            for df_action in api.dataflow_run_many(df_requests, workers=8):
+                print(df_action.request.function.fid, len(df_action.response.paths))
+        """
+        df_requests = iter(df_requests)
+        first_df_request = next(df_requests, None)
+        if first_df_request is None:
+            return
+
+        sink_callback_fn = first_df_request.sink_callback_fn
+        workers = workers or os.cpu_count() or 1
+        in_flight = {}
+
+        def tasks():
+            for index, df_request in enumerate(
+                itertools.chain([first_df_request], df_requests)
+            ):
+                if df_request.sink_callback_fn is not sink_callback_fn:
+                    raise ValueError(
+                        "dataflow_run_many requests must share one sink_callback_fn"
+                    )
 
-                session.add(df)
-                session.commit()
-
-                # ensure values are loaded after commit
-                session.refresh(df)
-
-                return models.DataflowActionModel(
-                    action_id=df.action_id,
-                    status=models.DataflowActionStatusType.LOCAL_PENDING,
-                    request_hash=request_hash,
-                    request=df_reqeust,
-                    response=df_response,
-                    remote_action_id=df.remote_action_id,
-                    data_created=df.data_created_as_ts(),
+                in_flight[index] = df_request
+                function = df_request.function
+                is_stored = self._stored_function_content_hash(function) is not None
+                yield (
+                    index,
+                    function.fid if is_stored else function,
+                    {
+                        name: getattr(df_request, name)
+                        for name in models.DataflowRequestModel.model_fields
+                        if name not in ("function", "sink_callback_fn")
+                    },
                 )
 
-            except IntegrityError:
-                session.rollback()
-                raise
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                DatabaseAPI,
+                {
+                    "dbpath": self.dbpath,
+                    "stream_batch_size": self.stream_batch_size,
+                    "read_only": self.read_only,
+                    "profile": self.profile,
+                    "trusted": self.trusted,
+                },
+                dill.dumps(sink_callback_fn),
+                {
+                    "use_cached_response": use_cached_response,
+                    "cache_max_age": cache_max_age,
+                },
+            ),
+        )
 
-            except Exception:
-                session.rollback()
-                raise
+        try:
+            for results in _iter_task_results(
+                executor,
+                tasks(),
+                max_pending=workers * DATAFLOW_POOL_TASKS_PER_WORKER,
+                ordered=ordered,
+            ):
+                yield from self._store_dataflow_runs(
+                    [(in_flight.pop(index), run) for index, run in results],
+                    delete_after_read=delete_after_read,
+                )
+        finally:
+            # also when the consumer stops early
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def delete_dataflow_action(self, action_id: UUID4 | str):
         stmt = select(DataflowActionTbl).where(
@@ -441,8 +2896,40 @@ class DatabaseAPI:
                 session.rollback()
                 raise
 
-    def get_dataflow_action(self, action_id: UUID4 | str) -> models.DataflowActionModel:
+    def _dataflow_action_from_row(self, row, lazy: bool = False):
+        if lazy:
+            return LazyDataflowActionModel(
+                action_id=row.action_id,
+                request_hash=row.dataflow_request_hash,
+                status=models.DataflowActionStatusType(row.status),
+                remote_action_id=row.remote_action_id,
+                data_created=_datetime_as_ts(row.data_created),
+                request_b64=row.dataflow_request_b64,
+                response_b64=row.dataflow_response_b64,
+                decoder=self._decode_dataflow_action_request_from_b64,
+            )
+
+        return models.DataflowActionModel(
+            action_id=row.action_id,
+            request_hash=row.dataflow_request_hash,
+            status=models.DataflowActionStatusType(row.status),
+            request=self._decode_dataflow_action_request_from_b64(
+                row.dataflow_request_b64
+            ),
+            response=self._decode_dataflow_action_request_from_b64(
+                row.dataflow_response_b64
+            ),
+            remote_action_id=row.remote_action_id,
+            data_created=_datetime_as_ts(row.data_created),
+        )
 
+    def get_dataflow_action(
+        self, action_id: UUID4 | str, lazy: bool = False
+    ) -> models.DataflowActionModel | LazyDataflowActionModel:
+        """
+        with lazy=True, the request and response are only deserialized on
+        first access, see LazyDataflowActionModel.
+        """
         with self._db_session() as session:
             stmt = select(DataflowActionTbl).where(
                 DataflowActionTbl.action_id == str(action_id)
@@ -452,19 +2939,7 @@ class DatabaseAPI:
             if result is None:
                 raise ValueError("Dataflow Action not found")
 
-            df_action = models.DataflowActionModel(
-                action_id=result.action_id,
-                request_hash=result.dataflow_request_hash,
-                status=models.DataflowActionStatusType(result.status),
-                request=self._decode_dataflow_action_request_from_b64(
-                    result.dataflow_request_b64
-                ),
-                response=self._decode_dataflow_action_request_from_b64(
-                    result.dataflow_response_b64
-                ),
-                remote_action_id=result.remote_action_id,
-                data_created=result.data_created_as_ts(),
-            )
+            df_action = self._dataflow_action_from_row(result, lazy=lazy)
 
         # Delete after read outside the session context to avoid nested session issues
         if (
@@ -475,87 +2950,272 @@ class DatabaseAPI:
 
         return df_action
 
-    def iter_dataflow_actions(self, status: models.DataflowActionStatusType = None):
-        PAGE_SIZE = 25
+    def _iter_dataflow_action_rows(
+        self,
+        columns,
+        status: models.DataflowActionStatusType = None,
+        page_size: int = ITER_DATAFLOW_ACTIONS_PAGE_SIZE,
+    ):
+        """
+        rows of columns ordered by creation date, fetched page_size rows at a
+        time. pages continue after the last (data_created, action_id) seen
+        rather than at an offset, so each page is an index seek and actions
+        updated (or deleted) while iterating are neither skipped nor repeated.
+        """
+        # the raw stored value, since DateTime round trips don't compare equal
+        # to server_default timestamps (no microseconds) in sqlite
+        data_created_raw = type_coerce(DataflowActionTbl.data_created, String).label(
+            "data_created_raw"
+        )
+
+        # columns must include action_id and data_created
+        stmt = select(*columns, data_created_raw).order_by(
+            DataflowActionTbl.data_created, DataflowActionTbl.action_id
+        )
+        if status is not None:
+            stmt = stmt.where(DataflowActionTbl.status == status.value)
 
-        def yield_actions(session):
-            offset = 0
+        with self._db_session() as session:
+            last_key = None
             while True:
-                stmt = (
-                    select(DataflowActionTbl)
-                    .order_by(
-                        DataflowActionTbl.data_created, DataflowActionTbl.action_id
+                page_stmt = stmt
+                if last_key is not None:
+                    page_stmt = page_stmt.where(
+                        tuple_(
+                            DataflowActionTbl.data_created, DataflowActionTbl.action_id
+                        )
+                        > tuple_(
+                            literal(last_key[0], String), literal(last_key[1], String)
+                        )
                     )
-                    .limit(PAGE_SIZE)
-                    .offset(offset)
-                )
 
-                if status is not None:
-                    stmt = stmt.where(DataflowActionTbl.status == status.value)
-
-                rows = session.scalars(stmt).all()
+                rows = session.execute(page_stmt.limit(page_size)).all()
                 if not rows:
                     break
 
-                for action in rows:
-                    yield models.DataflowActionModel(
-                        action_id=action.action_id,
-                        request_hash=action.dataflow_request_hash,
-                        status=models.DataflowActionStatusType(action.status),
-                        request=self._decode_dataflow_action_request_from_b64(
-                            action.dataflow_request_b64
-                        ),
-                        response=self._decode_dataflow_action_request_from_b64(
-                            action.dataflow_response_b64
-                        ),
-                        remote_action_id=action.remote_action_id,
-                        data_created=action.data_created_as_ts(),
-                    )
-
-                offset += PAGE_SIZE
+                yield from rows
 
-        # Proper session scope
-        with self._db_session() as session:
-            yield from yield_actions(session)
+                last_key = (rows[-1].data_created_raw, rows[-1].action_id)
 
-    def update_dataflow_action_by_local_id(
+    def iter_dataflow_actions(
         self,
-        action_id: UUID4 | str,
         status: models.DataflowActionStatusType = None,
-        response_b64: str = None,
-        remote_action_id: str = None,
-        delete_after_read: bool = None,
+        page_size: int = ITER_DATAFLOW_ACTIONS_PAGE_SIZE,
+        lazy: bool = False,
     ):
-        with self._db_session() as session:
-            stmt = select(DataflowActionTbl).where(
-                DataflowActionTbl.action_id == str(action_id)
+        """
+        actions ordered by creation date. with lazy=True, the request and
+        response are only deserialized on first access.
+        """
+        for row in self._iter_dataflow_action_rows(
+            DataflowActionTbl.__table__.columns, status=status, page_size=page_size
+        ):
+            yield self._dataflow_action_from_row(row, lazy=lazy)
+
+    def iter_dataflow_action_summaries(
+        self,
+        status: models.DataflowActionStatusType = None,
+        page_size: int = STREAM_BATCH_SIZE,
+    ) -> Iterator[models.DataflowActionSummaryModel]:
+        """
+        action headers ordered by creation date. the request and response
+        columns are never read.
+        """
+        for row in self._iter_dataflow_action_rows(
+            DATAFLOW_ACTION_HEADER_COLUMNS, status=status, page_size=page_size
+        ):
+            yield models.DataflowActionSummaryModel(
+                action_id=row.action_id,
+                request_hash=row.dataflow_request_hash,
+                status=models.DataflowActionStatusType(row.status),
+                remote_action_id=row.remote_action_id,
+                delete_after_read=bool(row.delete_after_read),
+                data_created=_datetime_as_ts(row.data_created),
             )
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return  # nothing to update
 
-            # Update fields safely
-            if remote_action_id is not None:
-                result.remote_action_id = remote_action_id
+    def delete_dataflow_actions(
+        self,
+        status: models.DataflowActionStatusType = None,
+        older_than: datetime | timedelta = None,
+        ids: Iterable[UUID4 | str] = None,
+    ) -> int:
+        """
+        delete every action matching all given filters in one transaction,
+        and return how many were deleted. with no filters, all actions are
+        deleted.
+
+        older_than is a datetime (naive means UTC, as stored) or a timedelta
+        back from now. ids restricts the deletion to these action ids.
+        """
+        conditions = []
+        if status is not None:
+            status = models.DataflowActionStatusType(status)
+            conditions.append(DataflowActionTbl.status == status.value)
+
+        if older_than is not None:
+            if isinstance(older_than, timedelta):
+                older_than = datetime.now(timezone.utc) - older_than
+            if older_than.tzinfo is not None:
+                older_than = older_than.astimezone(timezone.utc)
+            # compare against the stored text, CURRENT_TIMESTAMP format
+            conditions.append(
+                type_coerce(DataflowActionTbl.data_created, String)
+                < older_than.strftime("%Y-%m-%d %H:%M:%S")
+            )
 
-            if status is not None and isinstance(
-                status, models.DataflowActionStatusType
-            ):
-                if result.status != models.DataflowActionStatusType.DONE.value:
-                    result.status = status.value
+        tbl = DataflowActionTbl.__table__
+        num_of_deleted = 0
+
+        with self._db_session() as session:
+            try:
+                if ids is None:
+                    result = session.execute(delete(tbl).where(*conditions))
+                    num_of_deleted += result.rowcount
+                else:
+                    ids = (str(action_id) for action_id in ids)
+                    while batch := list(
+                        itertools.islice(ids, DELETE_DATAFLOW_ACTIONS_BATCH_SIZE)
+                    ):
+                        result = session.execute(
+                            delete(tbl).where(
+                                *conditions, DataflowActionTbl.action_id.in_(batch)
+                            )
+                        )
+                        num_of_deleted += result.rowcount
+
+                session.commit()
+
+            except Exception:
+                session.rollback()
+                raise
+
+        return num_of_deleted
 
+    def update_dataflow_actions_bulk(self, updates: Iterable[dict]) -> int:
+        """
+        apply many updates in one transaction and return the number of rows
+        updated.
+
+        each update is a dict with an "action_id" or a "remote_action_id" to
+        select the action, and any of "status", "response_b64",
+        "delete_after_read" and (with "action_id") "remote_action_id" to set.
+        as with the single updates, the status of a DONE action is kept, and
+        a response that doesn't decode to a DataflowResponseModel is ignored.
+        """
+        tbl = DataflowActionTbl.__table__
+
+        # updates setting the same fields run as one executemany
+        params_by_statement = {}
+        # actions that may be DONE with a new response, indexed below
+        keys_to_index = {tbl.c.action_id: [], tbl.c.remote_action_id: []}
+        for df_update in updates:
+            if df_update.get("action_id") is not None:
+                key_column = tbl.c.action_id
+                params = {"b_key": str(df_update["action_id"])}
+                if df_update.get("remote_action_id") is not None:
+                    params["b_remote_action_id"] = str(df_update["remote_action_id"])
+            elif df_update.get("remote_action_id") is not None:
+                key_column = tbl.c.remote_action_id
+                params = {"b_key": str(df_update["remote_action_id"])}
+            else:
+                raise ValueError("update needs an action_id or a remote_action_id")
+
+            if df_update.get("status") is not None:
+                status = models.DataflowActionStatusType(df_update["status"])
+                params["b_status"] = status.value
+
+            response_b64 = df_update.get("response_b64")
             if response_b64 is not None:
                 df_response = self._decode_dataflow_action_request_from_b64(
                     response_b64
                 )
                 if isinstance(df_response, models.DataflowResponseModel):
-                    result.dataflow_response_b64 = response_b64
+                    params["b_response_b64"] = response_b64
+                    params["b_response_status"] = df_response.status
+
+            if isinstance(df_update.get("delete_after_read"), bool):
+                params["b_delete_after_read"] = df_update["delete_after_read"]
+
+            fields = tuple(sorted(params.keys() - {"b_key"}))
+            if fields:
+                params_by_statement.setdefault((key_column, fields), []).append(params)
+            if {"b_status", "b_response_b64"} & params.keys():
+                keys_to_index[key_column].append(params["b_key"])
+
+        values_by_field = {
+            "b_remote_action_id": {"remote_action_id": bindparam("b_remote_action_id")},
+            "b_status": {
+                "status": case(
+                    (
+                        tbl.c.status == models.DataflowActionStatusType.DONE.value,
+                        tbl.c.status,
+                    ),
+                    else_=bindparam("b_status"),
+                )
+            },
+            # a new response is indexed again, see build_dataflow_paths_index
+            "b_response_b64": {
+                "dataflow_response_b64": bindparam("b_response_b64"),
+                "num_of_paths": None,
+            },
+            "b_response_status": {"response_status": bindparam("b_response_status")},
+            "b_delete_after_read": {
+                "delete_after_read": bindparam("b_delete_after_read")
+            },
+        }
+
+        num_of_updated = 0
+        with self._db_session() as session:
+            try:
+                for (key_column, fields), params in params_by_statement.items():
+                    values = {}
+                    for field in fields:
+                        values.update(values_by_field[field])
+
+                    stmt = (
+                        update(tbl)
+                        .where(key_column == bindparam("b_key"))
+                        .values(**values)
+                    )
+                    num_of_updated += session.execute(stmt, params).rowcount
+
+                # the writer of a response indexes its paths, so searches
+                # don't have to
+                for key_column, keys in keys_to_index.items():
+                    for i in range(0, len(keys), DATAFLOW_PATHS_INDEX_BATCH_SIZE):
+                        chunk = keys[i : i + DATAFLOW_PATHS_INDEX_BATCH_SIZE]
+                        while self._index_dataflow_paths_batch(
+                            session, key_column.in_(chunk)
+                        ):
+                            pass
 
-            if delete_after_read is not None and isinstance(delete_after_read, bool):
-                result.delete_after_read = delete_after_read
+                session.commit()
 
-            # Commit safely
-            session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+        return num_of_updated
+
+    def update_dataflow_action_by_local_id(
+        self,
+        action_id: UUID4 | str,
+        status: models.DataflowActionStatusType = None,
+        response_b64: str = None,
+        remote_action_id: str = None,
+        delete_after_read: bool = None,
+    ):
+        self.update_dataflow_actions_bulk(
+            [
+                {
+                    "action_id": action_id,
+                    "status": status,
+                    "response_b64": response_b64,
+                    "remote_action_id": remote_action_id,
+                    "delete_after_read": delete_after_read,
+                }
+            ]
+        )
 
     def update_dataflow_action_by_remote_id(
         self,
@@ -564,32 +3224,308 @@ class DatabaseAPI:
         response_b64: str = None,
         delete_after_read: bool = None,
     ):
+        self.update_dataflow_actions_bulk(
+            [
+                {
+                    "remote_action_id": remote_action_id,
+                    "status": status,
+                    "response_b64": response_b64,
+                    "delete_after_read": delete_after_read,
+                }
+            ]
+        )
+
+    def _dataflow_path_rows(self, responses: list[tuple]) -> tuple[list, list, list]:
+        """
+        the dataflow_paths, dataflow_events and dataflow_path_callsites rows
+        of (action_id, fid, response) tuples. fid is used for events without
+        one, e.g in responses of the remote service.
+        """
+        path_rows, event_rows, callsite_rows = [], [], []
+        for action_id, fid, df_response in responses:
+            for path_idx, path in enumerate(df_response.paths):
+                for event_idx, df_event in enumerate(path.events):
+                    event_rows.append(
+                        {
+                            "action_id": action_id,
+                            "path_idx": path_idx,
+                            "event_idx": event_idx,
+                            "fid": df_event.fid or fid,
+                            "step_index": df_event.step_index,
+                            "op": df_event.op.value,
+                            "lineno": df_event.lineno,
+                            "variable_name": df_event.variable_name,
+                            "ssa_variable_name": df_event.ssa_variable_name,
+                            "data_direction": df_event.data_direction,
+                        }
+                    )
+
+                sink = event_rows[-1] if path.events else {}
+                path_rows.append(
+                    {
+                        "action_id": action_id,
+                        "path_idx": path_idx,
+                        "num_of_events": len(path.events),
+                        "data_mutation_count": path.data_mutation_count,
+                        "sink_fid": sink.get("fid"),
+                        "sink_filepath": None,
+                        "sink_step_index": sink.get("step_index"),
+                        "sink_op": sink.get("op"),
+                        "sink_variable_name": sink.get("variable_name"),
+                    }
+                )
+
+                for cid in dict.fromkeys(path.passthru_callsites):
+                    callsite_rows.append(
+                        {
+                            "action_id": action_id,
+                            "path_idx": path_idx,
+                            "cid": cid,
+                            "name": None,
+                        }
+                    )
+
+        # filepaths and callee names come from the functions database, which
+        # may not be the one holding the dataflow tables
+        sink_fids = {row["sink_fid"] for row in path_rows} - {None}
+        cids = {row["cid"] for row in callsite_rows}
         with self._db_session() as session:
-            stmt = select(DataflowActionTbl).where(
-                DataflowActionTbl.remote_action_id == str(remote_action_id)
+            filepaths = dict(
+                session.execute(
+                    select(FunctionTbl.fid, FunctionTbl.filepath).where(
+                        FunctionTbl.fid.in_(sink_fids)
+                    )
+                ).all()
+                if sink_fids
+                else ()
+            )
+            names = dict(
+                session.execute(
+                    select(CallsiteTbl.cid, CallsiteTbl.name).where(
+                        CallsiteTbl.cid.in_(cids)
+                    )
+                ).all()
+                if cids
+                else ()
             )
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return  # nothing to update
 
-            # Update status safely
-            if status is not None and isinstance(
-                status, models.DataflowActionStatusType
-            ):
-                if result.status != models.DataflowActionStatusType.DONE.value:
-                    result.status = status.value
+        for row in path_rows:
+            row["sink_filepath"] = filepaths.get(row["sink_fid"])
+        for row in callsite_rows:
+            row["name"] = names.get(row["cid"])
 
-            # Update response if valid
-            if response_b64 is not None:
+        return path_rows, event_rows, callsite_rows
+
+    def _index_dataflow_paths(self, session, responses: list[tuple]):
+        """
+        replace the indexed paths of (action_id, fid, response) tuples and
+        set their num_of_paths, in session's transaction. response is None
+        for responses that don't decode.
+        """
+        action_ids = [action_id for action_id, _, _ in responses]
+        for tbl in (DataflowPathTbl, DataflowEventTbl, DataflowPathCallsiteTbl):
+            session.execute(delete(tbl).where(tbl.action_id.in_(action_ids)))
+
+        path_rows, event_rows, callsite_rows = self._dataflow_path_rows(
+            [response for response in responses if response[2] is not None]
+        )
+        for tbl, rows in (
+            (DataflowPathTbl, path_rows),
+            (DataflowEventTbl, event_rows),
+            (DataflowPathCallsiteTbl, callsite_rows),
+        ):
+            if rows:
+                session.execute(insert(tbl), rows)
+
+        session.execute(
+            update(DataflowActionTbl.__table__)
+            .where(DataflowActionTbl.action_id == bindparam("b_action_id"))
+            .values(num_of_paths=bindparam("b_num_of_paths")),
+            [
+                {
+                    "b_action_id": action_id,
+                    "b_num_of_paths": (
+                        len(df_response.paths) if df_response is not None else 0
+                    ),
+                }
+                for action_id, _, df_response in responses
+            ],
+        )
+
+    def _index_dataflow_paths_batch(self, session, *conditions) -> int:
+        """
+        index up to DATAFLOW_PATHS_INDEX_BATCH_SIZE DONE actions matching
+        conditions that aren't indexed yet, in session's transaction. returns
+        the number of actions indexed, 0 once none are left.
+        """
+        stmt = (
+            select(
+                DataflowActionTbl.action_id,
+                DataflowActionTbl.fid,
+                DataflowActionTbl.dataflow_response_b64,
+            )
+            .where(
+                DataflowActionTbl.num_of_paths.is_(None),
+                DataflowActionTbl.status == models.DataflowActionStatusType.DONE.value,
+                *conditions,
+            )
+            .limit(DATAFLOW_PATHS_INDEX_BATCH_SIZE)
+        )
+
+        responses = []
+        for row in session.execute(stmt).all():
+            try:
                 df_response = self._decode_dataflow_action_request_from_b64(
-                    response_b64
+                    row.dataflow_response_b64
                 )
-                if isinstance(df_response, models.DataflowResponseModel):
-                    result.dataflow_response_b64 = response_b64
+            except Exception:
+                df_response = None
+            if not isinstance(df_response, models.DataflowResponseModel):
+                df_response = None
+            responses.append((row.action_id, row.fid, df_response))
 
-            # Update delete_after_read flag safely
-            if delete_after_read is not None and isinstance(delete_after_read, bool):
-                result.delete_after_read = delete_after_read
+        if responses:
+            self._index_dataflow_paths(session, responses)
+        return len(responses)
 
-            # Commit all changes
-            session.commit()
+    def build_dataflow_paths_index(self, rebuild: bool = False) -> int:
+        """
+        fill the dataflow paths index from the responses of DONE actions, so
+        search_dataflow_paths can filter them in sqlite. responses stored by
+        the local engine or by dataflow updates are indexed as they are
+        written, so this is only needed for actions stored before the index
+        existed, or to rebuild it. returns the number of actions indexed.
+        """
+        total_indexed = 0
+
+        with self._db_session() as session:
+            if rebuild:
+                session.execute(
+                    update(DataflowActionTbl.__table__).values(num_of_paths=None)
+                )
+                session.commit()
+
+            while num_of_indexed := self._index_dataflow_paths_batch(session):
+                session.commit()
+                total_indexed += num_of_indexed
+
+        return total_indexed
+
+    def search_dataflow_paths(
+        self,
+        action_id: UUID4 | str = None,
+        filter_by_sink_fid: str = None,
+        filter_by_sink_filepath: str = None,
+        filter_by_sink_op: models.OpType | str = None,
+        filter_by_fid: str = None,
+        filter_by_step_index: int = None,
+        filter_by_variable_name: str = None,
+        filter_by_callsite: str = None,
+        filter_by_callsite_name: str = None,
+    ) -> Iterator[models.DataflowPathSummaryModel]:
+        """
+        paths of DONE actions, ordered by action and path, filtered in sqlite
+        over the dataflow paths index. only reads the index: actions stored
+        before it existed are left out until build_dataflow_paths_index()
+        is run.
+
+        sink filters match the last event of a path, and the filepath filter
+        is a substring match. filter_by_fid, filter_by_step_index and
+        filter_by_variable_name select paths with an event matching all
+        given, and the callsite filters paths passing through a callsite
+        (by cid, or by called function name).
+
+        Example:
+            # actions reaching a sink in a file
+            action_ids = {
+                path.action_id
+                for path in api.search_dataflow_paths(
+                    filter_by_sink_filepath="net/socket.c"
+                )
+            }
+        """
+        stmt = select(DataflowPathTbl).order_by(
+            DataflowPathTbl.action_id, DataflowPathTbl.path_idx
+        )
+
+        if action_id is not None:
+            stmt = stmt.where(DataflowPathTbl.action_id == str(action_id))
+        if filter_by_sink_fid is not None:
+            stmt = stmt.where(DataflowPathTbl.sink_fid == filter_by_sink_fid)
+        if filter_by_sink_filepath is not None:
+            stmt = stmt.where(
+                DataflowPathTbl.sink_filepath.like(f"%{filter_by_sink_filepath}%")
+            )
+        if filter_by_sink_op is not None:
+            stmt = stmt.where(
+                DataflowPathTbl.sink_op == models.OpType(filter_by_sink_op).value
+            )
+
+        event_conditions = [
+            condition
+            for value, condition in (
+                (filter_by_fid, DataflowEventTbl.fid == filter_by_fid),
+                (
+                    filter_by_step_index,
+                    DataflowEventTbl.step_index == filter_by_step_index,
+                ),
+                (
+                    filter_by_variable_name,
+                    DataflowEventTbl.variable_name == filter_by_variable_name,
+                ),
+            )
+            if value is not None
+        ]
+        if event_conditions:
+            stmt = stmt.where(
+                exists().where(
+                    DataflowEventTbl.action_id == DataflowPathTbl.action_id,
+                    DataflowEventTbl.path_idx == DataflowPathTbl.path_idx,
+                    *event_conditions,
+                )
+            )
+
+        callsite_conditions = [
+            condition
+            for value, condition in (
+                (filter_by_callsite, DataflowPathCallsiteTbl.cid == filter_by_callsite),
+                (
+                    filter_by_callsite_name,
+                    DataflowPathCallsiteTbl.name == filter_by_callsite_name,
+                ),
+            )
+            if value is not None
+        ]
+        if callsite_conditions:
+            stmt = stmt.where(
+                exists().where(
+                    DataflowPathCallsiteTbl.action_id == DataflowPathTbl.action_id,
+                    DataflowPathCallsiteTbl.path_idx == DataflowPathTbl.path_idx,
+                    *callsite_conditions,
+                )
+            )
+
+        for path in self._stream(stmt, scalars=True):
+            yield models.DataflowPathSummaryModel(
+                action_id=path.action_id,
+                path_idx=path.path_idx,
+                num_of_events=path.num_of_events,
+                data_mutation_count=path.data_mutation_count,
+                sink_fid=path.sink_fid,
+                sink_filepath=path.sink_filepath,
+                sink_step_index=path.sink_step_index,
+                sink_op=path.sink_op,
+                sink_variable_name=path.sink_variable_name,
+            )
+
+    def get_dataflow_path(
+        self, action_id: UUID4 | str, path_idx: int
+    ) -> models.DataflowPathModel:
+        """
+        the full path of a DataflowPathSummaryModel, with its events.
+        """
+        df_action = self.get_dataflow_action(action_id, lazy=True)
+        paths = df_action.response.paths if df_action.response is not None else []
+        if not 0 <= path_idx < len(paths):
+            raise ValueError("Dataflow path not found")
+        return paths[path_idx]
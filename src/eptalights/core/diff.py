@@ -0,0 +1,71 @@
+from typing import Iterator
+
+from eptalights import models
+from eptalights.core.db import DatabaseAPI
+
+
+def _database_api(db: DatabaseAPI | str) -> DatabaseAPI:
+    if isinstance(db, DatabaseAPI):
+        return db
+    return DatabaseAPI(db, read_only=True)
+
+
+def diff_databases(
+    old_db: DatabaseAPI | str,
+    new_db: DatabaseAPI | str,
+    include_unchanged: bool = False,
+) -> Iterator[models.FunctionDiffModel]:
+    """
+    Stream the functions added, removed or changed between two databases,
+    ordered by fid.
+
+    Both databases are walked once, in fid order, and merged by comparing
+    content hashes, so no function data is decoded when both have them.
+    Paths are opened read-only.
+
+    Example:
+        for diff in diff_databases("build-1/eptalights.db", "build-2/eptalights.db"):
+            print(diff.diff_type, diff.fid)
+    """
+    old_hashes = _database_api(old_db).iter_function_content_hashes()
+    new_hashes = _database_api(new_db).iter_function_content_hashes()
+
+    old_item = next(old_hashes, None)
+    new_item = next(new_hashes, None)
+
+    while old_item is not None or new_item is not None:
+        if new_item is None or (old_item is not None and old_item[0] < new_item[0]):
+            yield models.FunctionDiffModel(
+                fid=old_item[0],
+                diff_type=models.FunctionDiffType.REMOVED,
+                old_content_hash=old_item[1],
+            )
+            old_item = next(old_hashes, None)
+
+        elif old_item is None or new_item[0] < old_item[0]:
+            yield models.FunctionDiffModel(
+                fid=new_item[0],
+                diff_type=models.FunctionDiffType.ADDED,
+                new_content_hash=new_item[1],
+            )
+            new_item = next(new_hashes, None)
+
+        else:
+            fid, old_content_hash = old_item
+            new_content_hash = new_item[1]
+
+            if old_content_hash != new_content_hash:
+                diff_type = models.FunctionDiffType.CHANGED
+            else:
+                diff_type = models.FunctionDiffType.UNCHANGED
+
+            if diff_type != models.FunctionDiffType.UNCHANGED or include_unchanged:
+                yield models.FunctionDiffModel(
+                    fid=fid,
+                    diff_type=diff_type,
+                    old_content_hash=old_content_hash,
+                    new_content_hash=new_content_hash,
+                )
+
+            old_item = next(old_hashes, None)
+            new_item = next(new_hashes, None)
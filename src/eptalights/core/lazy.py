@@ -0,0 +1,184 @@
+from typing import Callable, Optional
+
+from eptalights import models
+
+
+class LazyFunctionModel:
+    """
+    A handle to a function row that exposes fid, name, filepath and
+    class_name straight from the database, and only loads (decodes and
+    validates) the full FunctionModel on first access to anything else,
+    e.g steps, variable_manager, callsite_manager or cfg.
+
+    Every other attribute or method is delegated to the loaded
+    FunctionModel, so a handle can be used wherever a FunctionModel is
+    read. Use `.model` to get the underlying FunctionModel itself.
+    """
+
+    __slots__ = ("fid", "name", "filepath", "class_name", "_loader", "_model")
+
+    def __init__(
+        self,
+        fid: str,
+        name: str,
+        filepath: str,
+        class_name: Optional[str],
+        loader: Callable[[str], models.FunctionModel],
+    ):
+        self.fid = fid
+        self.name = name
+        self.filepath = filepath
+        self.class_name = class_name
+        self._loader = loader
+        self._model = None
+
+    @property
+    def classname(self) -> Optional[str]:
+        return self.class_name
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def model(self) -> models.FunctionModel:
+        if self._model is None:
+            self._model = self._loader(self.fid)
+        return self._model
+
+    def __getattr__(self, name):
+        # private/dunder lookups (copy, pickle, ...) must not trigger a load
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __repr__(self) -> str:
+        return (
+            f"LazyFunctionModel(fid={self.fid!r}, name={self.name!r}, "
+            f"filepath={self.filepath!r}, loaded={self.is_loaded})"
+        )
+
+
+class LazyCallsiteModel:
+    """
+    A handle to a callsite row that exposes cid, name, ssa_name and
+    num_of_args straight from the database. The CallsiteModel is resolved
+    from its (lazy) function on first access to anything else.
+    """
+
+    __slots__ = ("cid", "name", "ssa_name", "num_of_args", "function", "_model")
+
+    def __init__(
+        self,
+        cid: str,
+        name: str,
+        ssa_name: str,
+        num_of_args: int,
+        function: LazyFunctionModel,
+    ):
+        self.cid = cid
+        self.name = name
+        self.ssa_name = ssa_name
+        self.num_of_args = num_of_args
+        self.function = function
+        self._model = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def model(self) -> Optional[models.CallsiteModel]:
+        if self._model is None:
+            self._model = self.function.callsite_manager.callsites.get(self.ssa_name)
+        return self._model
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __repr__(self) -> str:
+        return (
+            f"LazyCallsiteModel(cid={self.cid!r}, name={self.name!r}, "
+            f"ssa_name={self.ssa_name!r}, loaded={self.is_loaded})"
+        )
+
+
+class LazyDataflowActionModel:
+    """
+    A handle to a dataflow action row that exposes its header (action_id,
+    request_hash, status, remote_action_id and data_created) straight from
+    the database. The request and response are each deserialized on first
+    access, and their encoded form stays available as `request_b64` and
+    `response_b64`.
+    """
+
+    __slots__ = (
+        "action_id",
+        "request_hash",
+        "status",
+        "remote_action_id",
+        "data_created",
+        "request_b64",
+        "response_b64",
+        "_decoder",
+        "_request",
+        "_response",
+    )
+
+    def __init__(
+        self,
+        action_id: str,
+        request_hash: str,
+        status: models.DataflowActionStatusType,
+        remote_action_id: Optional[str],
+        data_created: str,
+        request_b64: str,
+        response_b64: Optional[str],
+        decoder: Callable[[str], object],
+    ):
+        self.action_id = action_id
+        self.request_hash = request_hash
+        self.status = status
+        self.remote_action_id = remote_action_id
+        self.data_created = data_created
+        self.request_b64 = request_b64
+        self.response_b64 = response_b64
+        self._decoder = decoder
+        self._request = None
+        self._response = None
+
+    @property
+    def request(self) -> Optional[models.DataflowRequestModel]:
+        if self._request is None:
+            self._request = self._decoder(self.request_b64)
+        return self._request
+
+    @property
+    def response(self) -> Optional[models.DataflowResponseModel]:
+        if self._response is None and self.response_b64 is not None:
+            self._response = self._decoder(self.response_b64)
+        return self._response
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._request is not None
+
+    @property
+    def model(self) -> models.DataflowActionModel:
+        return models.DataflowActionModel(
+            action_id=self.action_id,
+            request_hash=self.request_hash,
+            status=self.status,
+            request=self.request,
+            response=self.response,
+            remote_action_id=self.remote_action_id,
+            data_created=self.data_created,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"LazyDataflowActionModel(action_id={self.action_id!r}, "
+            f"status={self.status!s}, loaded={self.is_loaded})"
+        )
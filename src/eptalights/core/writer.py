@@ -0,0 +1,370 @@
+import time
+from typing import Iterable
+
+import msgpack
+from sqlalchemy import Index, delete, insert, select
+from sqlalchemy.exc import OperationalError
+
+from eptalights import models
+from eptalights.core.db import (
+    DatabaseAPI,
+    FunctionTbl,
+    CallsiteTbl,
+    CallGraphTbl,
+    FileMetadataTbl,
+    FunctionComponentTbl,
+    StepTbl,
+    StepArgTbl,
+    VariableTbl,
+    _function_component_row,
+    _function_summary_values,
+    _step_index_rows,
+    _variable_index_rows,
+)
+
+WRITER_BATCH_SIZE = 1000
+WRITER_COMMIT_EVERY = 100_000
+
+WRITER_TABLES = (
+    FunctionTbl,
+    CallsiteTbl,
+    FileMetadataTbl,
+    FunctionComponentTbl,
+    StepTbl,
+    StepArgTbl,
+    VariableTbl,
+)
+
+# rows derived from a function, replaced along with it
+FUNCTION_DERIVED_TABLES = (
+    CallsiteTbl,
+    FunctionComponentTbl,
+    StepTbl,
+    StepArgTbl,
+    VariableTbl,
+)
+
+# kept while loading with defer_indexes, to delete the callsites of
+# replaced functions. the other derived tables are keyed by fid.
+WRITER_KEPT_INDEXES = frozenset(["ix_callsites_fid"])
+
+# fids per IN (...) list when deleting the rows of replaced functions
+WRITER_DELETE_CHUNK_SIZE = 500
+
+
+def _model_data(model_or_data) -> dict:
+    if isinstance(model_or_data, dict):
+        return model_or_data
+    return model_or_data.model_dump()
+
+
+class DatabaseWriter:
+    """
+    Bulk-insert functions, callsites and file metadata into a local
+    database, e.g to merge builds, write a filtered sub-database or
+    generate synthetic databases.
+
+    Rows are queued and written with executemany in batches of
+    `batch_size`, inside transactions committed every `commit_every` rows.
+    With `defer_indexes`, secondary indexes of the written tables are
+    dropped while loading and created once on close(), which also rebuilds
+    the search index. Summary columns are always filled, and components,
+    steps and variables indexes are filled when enabled.
+
+    Adding a row with an existing primary key replaces it. Adding a
+    function again also deletes the callsites, components, steps and
+    variables written for it before, and the stored call graph.
+
+    Example:
+        with DatabaseWriter("sub.db") as writer:
+            for fn in api.search_functions(filter_by_filepath="net/"):
+                writer.add_function(fn)
+        print(writer.stats())
+    """
+
+    def __init__(
+        self,
+        dbpath: str,
+        batch_size: int = WRITER_BATCH_SIZE,
+        commit_every: int = WRITER_COMMIT_EVERY,
+        defer_indexes: bool = True,
+        with_components: bool = False,
+        with_steps_index: bool = False,
+        with_variables_index: bool = False,
+    ):
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.defer_indexes = defer_indexes
+        self.with_components = with_components
+        self.with_steps_index = with_steps_index
+        self.with_variables_index = with_variables_index
+
+        # creates and upgrades the schema
+        self._api = DatabaseAPI(dbpath, function_cache_max_entries=0)
+
+        self._conn = self._api._db_engine.connect()
+        # WAL (set by DatabaseAPI on new databases) keeps the database
+        # consistent on a crash with synchronous=NORMAL, at a fraction of the
+        # fsyncs. other journal modes keep the default synchronous=FULL.
+        journal_mode = self._conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        if journal_mode == "wal":
+            self._conn.exec_driver_sql("PRAGMA synchronous=NORMAL")
+
+        self._pending = {tbl: [] for tbl in WRITER_TABLES}
+        # every fid added, and those added since the last flush whose rows
+        # may already be in the database
+        self._added_fids = set()
+        self._unchecked_fids = set()
+        self._replaced_fids = set()
+        self._callgraph_deleted = False
+        self._counts = {tbl.__tablename__: 0 for tbl in WRITER_TABLES}
+        self._rows_since_commit = 0
+        self._closed = False
+
+        if self.defer_indexes:
+            for index in self._deferred_indexes():
+                index.drop(self._conn, checkfirst=True)
+            self._conn.commit()
+
+        self._started_at = time.perf_counter()
+        self._finished_at = None
+
+    def __enter__(self) -> "DatabaseWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(commit=exc_type is None)
+
+    def _deferred_indexes(self) -> list[Index]:
+        return [
+            index
+            for tbl in WRITER_TABLES
+            for index in tbl.__table__.indexes
+            if index.name not in WRITER_KEPT_INDEXES
+        ]
+
+    def _queue(self, tbl, row: dict):
+        pending = self._pending[tbl]
+        pending.append(row)
+        if len(pending) >= self.batch_size:
+            self._flush_table(tbl)
+
+    def _flush_table(self, tbl):
+        pending = self._pending[tbl]
+        if not pending:
+            return
+
+        # rows of replaced functions go before any row replacing them
+        self._delete_replaced_rows()
+
+        self._conn.execute(insert(tbl).prefix_with("OR REPLACE"), pending)
+        self._counts[tbl.__tablename__] += len(pending)
+        self._rows_since_commit += len(pending)
+        self._pending[tbl] = []
+
+        if self._rows_since_commit >= self.commit_every:
+            self._conn.commit()
+            self._rows_since_commit = 0
+
+    def _flush_tables(self):
+        for tbl in WRITER_TABLES:
+            self._flush_table(tbl)
+
+    def _delete_replaced_rows(self):
+        """
+        delete the derived rows of the functions replaced since the last
+        flush, a few statements per WRITER_DELETE_CHUNK_SIZE fids, and the
+        stored call graph once. none of their new rows are written yet.
+        """
+        unchecked_fids = sorted(self._unchecked_fids)
+        self._unchecked_fids.clear()
+        for start in range(0, len(unchecked_fids), WRITER_DELETE_CHUNK_SIZE):
+            chunk = unchecked_fids[start : start + WRITER_DELETE_CHUNK_SIZE]
+            self._replaced_fids.update(
+                self._conn.execute(
+                    select(FunctionTbl.fid).where(FunctionTbl.fid.in_(chunk))
+                ).scalars()
+            )
+
+        if not self._replaced_fids:
+            return
+
+        replaced_fids = sorted(self._replaced_fids)
+        self._replaced_fids.clear()
+        for start in range(0, len(replaced_fids), WRITER_DELETE_CHUNK_SIZE):
+            chunk = replaced_fids[start : start + WRITER_DELETE_CHUNK_SIZE]
+            for tbl in FUNCTION_DERIVED_TABLES:
+                self._conn.execute(delete(tbl).where(tbl.fid.in_(chunk)))
+
+        if not self._callgraph_deleted:
+            self._conn.execute(delete(CallGraphTbl))
+            self._callgraph_deleted = True
+
+    def _replace_function(self, fid: str):
+        """
+        make room for fid: rows of an earlier add still queued are dropped,
+        and rows already in the database are deleted by the next flush.
+        """
+        if fid not in self._added_fids:
+            self._added_fids.add(fid)
+            self._unchecked_fids.add(fid)
+            return
+
+        for tbl in (FunctionTbl, *FUNCTION_DERIVED_TABLES):
+            self._pending[tbl] = [
+                row for row in self._pending[tbl] if row["fid"] != fid
+            ]
+        self._replaced_fids.add(fid)
+
+    def add_function(
+        self,
+        function: models.FunctionModel | dict,
+        with_callsites: bool = True,
+    ):
+        """
+        function is a FunctionModel or its model_dump(). with_callsites also
+        adds a callsite row for every callsite in its callsite_manager.
+        """
+        data = _model_data(function)
+        fid = data["fid"]
+
+        self._replace_function(fid)
+        summary_values = _function_summary_values(data)
+        self._queue(
+            FunctionTbl,
+            {
+                "fid": fid,
+                "name": data["name"],
+                "classname": data.get("class_name"),
+                "filepath": data["filepath"],
+                "function_data": msgpack.packb(data),
+                **summary_values,
+            },
+        )
+
+        if self.with_components:
+            self._queue(
+                FunctionComponentTbl,
+                _function_component_row(fid, data, summary_values["content_hash"]),
+            )
+
+        if self.with_steps_index:
+            step_rows, arg_rows = _step_index_rows(fid, data)
+            for row in step_rows:
+                self._queue(StepTbl, row)
+            for row in arg_rows:
+                self._queue(StepArgTbl, row)
+
+        if self.with_variables_index:
+            for row in _variable_index_rows(fid, data["filepath"], data):
+                self._queue(VariableTbl, row)
+
+        if with_callsites:
+            callsite_manager = data.get("callsite_manager") or {}
+            for ssa_name, callsite in (callsite_manager.get("callsites") or {}).items():
+                self.add_callsite(fid, ssa_name, callsite, filepath=data["filepath"])
+
+    def add_functions(
+        self,
+        functions: Iterable[models.FunctionModel | dict],
+        with_callsites: bool = True,
+    ):
+        for function in functions:
+            self.add_function(function, with_callsites=with_callsites)
+
+    def add_callsite(
+        self,
+        fid: str,
+        ssa_name: str,
+        callsite: models.CallsiteModel | dict,
+        filepath: str = None,
+    ):
+        """
+        ssa_name is the callsite's key in its function's
+        callsite_manager.callsites. cid defaults to `<fid>:<ssa_name>`.
+        """
+        data = _model_data(callsite)
+
+        self._queue(
+            CallsiteTbl,
+            {
+                "cid": data.get("cid") or f"{fid}:{ssa_name}",
+                "name": "".join(data.get("fn_name") or []),
+                "ssa_name": ssa_name,
+                "num_of_args": data.get("num_of_args") or 0,
+                "fid": fid,
+                "filepath": filepath,
+            },
+        )
+
+    def add_file_metadata(self, file_metadata: models.FileMetadataModel | dict):
+        data = _model_data(file_metadata)
+
+        self._queue(
+            FileMetadataTbl,
+            {
+                "filepath": data["filepath"],
+                "file_metadata_data": msgpack.packb(data),
+            },
+        )
+
+    def flush(self):
+        """
+        write and commit everything queued so far.
+        """
+        self._flush_tables()
+        self._conn.commit()
+        self._rows_since_commit = 0
+
+    def close(self, commit: bool = True) -> dict:
+        """
+        flush (or with commit=False, discard uncommitted rows), create the
+        deferred indexes and rebuild the search index. returns stats().
+        """
+        if self._closed:
+            return self.stats()
+
+        try:
+            if commit:
+                self.flush()
+            else:
+                self._conn.rollback()
+
+            if self.defer_indexes:
+                for index in self._deferred_indexes():
+                    index.create(self._conn, checkfirst=True)
+                self._conn.commit()
+        finally:
+            self._conn.close()
+            self._closed = True
+
+        try:
+            self._api.build_search_index()
+        except OperationalError:
+            # sqlite built without FTS5/trigram
+            pass
+
+        # closing the last connection checkpoints the WAL into the database
+        # file, which read-only (immutable) readers rely on
+        self._api._db_engine.dispose()
+
+        self._finished_at = time.perf_counter()
+        return self.stats()
+
+    def stats(self) -> dict:
+        """
+        rows written per table, elapsed seconds and throughput.
+        """
+        elapsed_secs = (self._finished_at or time.perf_counter()) - self._started_at
+        total_rows = sum(self._counts.values())
+        num_of_functions = self._counts[FunctionTbl.__tablename__]
+
+        return {
+            "rows": dict(self._counts),
+            "total_rows": total_rows,
+            "elapsed_secs": elapsed_secs,
+            "rows_per_sec": total_rows / elapsed_secs if elapsed_secs else 0.0,
+            "functions_per_sec": (
+                num_of_functions / elapsed_secs if elapsed_secs else 0.0
+            ),
+        }
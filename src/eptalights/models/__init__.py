@@ -24,6 +24,8 @@ from eptalights.models.sophia_ir.enum_types import (
     OpType,
     ExprType,
     DataflowActionStatusType,
+    SearchMatchType,
+    FunctionDiffType,
 )
 
 from eptalights.models.sophia_ir.function import (
@@ -39,6 +41,17 @@ from eptalights.models.sophia_ir.function import (
     FunctionModel,
 )
 
+from eptalights.models.sophia_ir.function_summary import FunctionSummaryModel
+
+from eptalights.models.sophia_ir.function_diff import FunctionDiffModel
+
+from eptalights.models.sophia_ir.variable_summary import VariableSummaryModel
+
+from eptalights.models.sophia_ir.step_summary import (
+    StepArgSummaryModel,
+    StepSummaryModel,
+)
+
 from eptalights.models.sophia_ir.file_metadata import (
     ClassMetadataModel,
     FileMetadataModel,
@@ -55,12 +68,16 @@ from eptalights.models.basic.jvm_jimple import JVMClassModel
 
 from eptalights.models.sophia_ir.dataflow import (
     SinkResultType,
+    SinkSpecModel,
     DataflowEventModel,
     DataflowStateModel,
     DataflowPathModel,
+    DataflowPathSummaryModel,
     DataflowRequestModel,
     DataflowResponseModel,
     DataflowActionModel,
+    DataflowActionSummaryModel,
+    FunctionDataflowSummaryModel,
 )
 
 __all__ = [
@@ -81,6 +98,8 @@ __all__ = [
     "OpType",
     "ExprType",
     "DataflowActionStatusType",
+    "SearchMatchType",
+    "FunctionDiffType",
     "ExprModel",
     "SophiaIRNopModel",
     "SophiaIRAssignModel",
@@ -91,15 +110,24 @@ __all__ = [
     "SophiaIRSwitchModel",
     "SophiaIRLabelModel",
     "FunctionModel",
+    "FunctionSummaryModel",
+    "FunctionDiffModel",
+    "VariableSummaryModel",
+    "StepArgSummaryModel",
+    "StepSummaryModel",
     "ClassMetadataModel",
     "FileMetadataModel",
     "ClassDataModel",
     "FileDataModel",
     "SinkResultType",
+    "SinkSpecModel",
     "DataflowEventModel",
     "DataflowStateModel",
     "DataflowPathModel",
+    "DataflowPathSummaryModel",
     "DataflowRequestModel",
     "DataflowResponseModel",
     "DataflowActionModel",
+    "DataflowActionSummaryModel",
+    "FunctionDataflowSummaryModel",
 ]
@@ -19,9 +19,15 @@ class ConfigModel(BaseModel):
         with support for additional file-based databases planned.
     local_database_path : str, optional
         The path to the database storing extracted information. Defaults to None.
+    local_database_profile : str, optional
+        The connection profile used to open the local database, "default" or
+        the read-only "analysis" profile. Defaults to "default".
     output_decompiled_path : str, optional
         The destination path for storing decompiled code. Defaults to
         "./__eptalights_decompiled_code/".
+    dataflow_cache_ttl_secs : int, optional
+        The maximum age, in seconds, of a completed dataflow action reused
+        for an identical request. Defaults to None, no limit.
     """
 
     project_id: Optional[str] = None
@@ -29,4 +35,6 @@ class ConfigModel(BaseModel):
     code_type: str  # Example values: gcc_gimple, php_opcode, jvm_jimple
     storage_backend: Optional[str] = "sqlite3"  # Default: sqLite3; extensible later
     local_database_path: Optional[str] = None
+    local_database_profile: Optional[str] = "default"
     output_decompiled_path: Optional[str] = "./__eptalights_decompiled_code/"
+    dataflow_cache_ttl_secs: Optional[int] = None
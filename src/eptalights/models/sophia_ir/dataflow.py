@@ -1,5 +1,11 @@
-from typing import List, Optional, Union, Callable
-from pydantic import BaseModel
+from typing import Dict, List, Optional, Tuple, Union, Callable
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    field_serializer,
+    field_validator,
+    model_validator,
+)
 from enum import auto
 from eptalights.models.sophia_ir.enum_types import (
     AutoStrEnum,
@@ -69,6 +75,9 @@ class DataflowEventModel(BaseModel):
         Defaults to False.
     current_record_attibute_tracked : str, optional
         Current record attribute being tracked. Defaults to None.
+    fid : str, optional
+        The unique identifier of the function where this event occurs, set
+        when the dataflow crosses function calls. Defaults to None.
     """
 
     op: OpType
@@ -83,6 +92,7 @@ class DataflowEventModel(BaseModel):
     record_attributes_used_here: Optional[List[str]] = []
     used_inside_other_tokenized_operand_tokens_here: bool = False
     current_record_attibute_tracked: Optional[str] = None
+    fid: Optional[str] = None
 
 
 class DataflowStateModel(BaseModel):
@@ -143,6 +153,116 @@ class DataflowPathModel(BaseModel):
     data_mutation_count: int = 0
 
 
+class SinkSpecModel(BaseModel):
+    """Represents a declarative sink, matched against dataflow events
+    without calling back into Python.
+
+    A spec matches an event whose step has operation `op` and, for calls,
+    whose called function and argument positions of the tracked variable
+    satisfy `fnames` and `arg_indexes`. Specs are immutable and hashable,
+    and `fnames` and `arg_indexes` are kept sorted, so equal specs always
+    encode (and hash, as part of a request) the same.
+
+    Example::
+
+        # the tracked data reaches the size of a malloc or memcpy call
+        SinkSpecModel(op=OpType.CALL, fnames={"malloc"}, arg_indexes={0})
+        SinkSpecModel(op=OpType.CALL, fnames={"memcpy"}, arg_indexes={2})
+
+        # the tracked data is returned, or decides a branch
+        SinkSpecModel(op=OpType.RETURN)
+        SinkSpecModel(op=OpType.COND)
+
+        # the data is sanitized, stop following it
+        SinkSpecModel(
+            op=OpType.CALL, fnames={"validate_len"}, result=SinkResultType.STOP
+        )
+
+    Attributes
+    ----------
+    op : OpType
+        The operation type of the step.
+    fnames : Tuple[str, ...], optional
+        For CALL steps, the called function names to match, given as any
+        collection. Defaults to empty, matching any function.
+    arg_indexes : Tuple[int, ...], optional
+        For CALL steps, the 0-based argument positions the tracked variable
+        must be passed at, given as any collection. Defaults to empty,
+        matching any use.
+    data_direction : str, optional
+        The data direction of the event, "read" for uses of the tracked
+        variable or "write" for the variables defined from it (e.g a call
+        result). None matches both. Defaults to "read".
+    result : SinkResultType
+        The result of a match. Defaults to `SinkResultType.OK`.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    op: OpType
+    fnames: Tuple[str, ...] = ()
+    arg_indexes: Tuple[int, ...] = ()
+    data_direction: Optional[str] = "read"
+    result: SinkResultType = SinkResultType.OK
+
+    @field_validator("fnames", "arg_indexes", mode="before")
+    @classmethod
+    def sort_values(cls, values):
+        return tuple(sorted(set(values)))
+
+    @field_serializer("op", when_used="always")
+    def serialize_op(self, op: OpType):
+        return op.value
+
+    @field_serializer("result", when_used="always")
+    def serialize_result(self, result: SinkResultType):
+        return result.value
+
+
+class DataflowPathSummaryModel(BaseModel):
+    """Represents a path of a completed dataflow action, as stored in the
+    dataflow paths index.
+
+    Unlike :class:`DataflowPathModel`, a summary is read from indexed
+    database rows, so searching paths never deserializes responses.
+
+    Attributes
+    ----------
+    action_id : str
+        The dataflow action whose response contains the path.
+    path_idx : int
+        The position of the path in the response's `paths`.
+    num_of_events : int
+        The number of events in the path. Defaults to 0.
+    data_mutation_count : int
+        The number of times data was mutated. Defaults to 0.
+    sink_fid : str, optional
+        The function of the last event of the path. Defaults to `None`.
+    sink_filepath : str, optional
+        The file path of `sink_fid`. Defaults to `None`.
+    sink_step_index : int, optional
+        The step index of the last event of the path. Defaults to `None`.
+    sink_op : OpType, optional
+        The operation type of the last event of the path. Defaults to `None`.
+    sink_variable_name : str, optional
+        The variable of the last event of the path. Defaults to `None`.
+    """
+
+    action_id: str
+    path_idx: int
+    num_of_events: int = 0
+    data_mutation_count: int = 0
+    sink_fid: Optional[str] = None
+    sink_filepath: Optional[str] = None
+    sink_step_index: Optional[int] = None
+    sink_op: Optional[OpType] = None
+    sink_variable_name: Optional[str] = None
+
+    @field_serializer("sink_op", when_used="always")
+    def serialize_sink_op(self, sink_op: Optional[OpType]):
+        return sink_op.value if sink_op is not None else None
+
+
 class DataflowRequestModel(BaseModel):
     """Represents a request for data flow analysis.
 
@@ -153,9 +273,11 @@ class DataflowRequestModel(BaseModel):
     start_from_step_index : int, optional
         The index of the step from which the data flow source starts.
         If not provided, it defaults to None.
-    sink_callback_fn : Callable[[DataflowStateModel], SinkResultType]
+    sink_callback_fn : Callable[[DataflowStateModel], SinkResultType], optional
         A function that processes a `DataflowStateModel` and returns a `SinkResultType`.
-        This function represents the sink in the data flow analysis.
+        This function represents the sink in the data flow analysis. With
+        `sink_specs`, it is only called for events no spec matches.
+        Defaults to None.
 
         Example::
 
@@ -204,14 +326,33 @@ class DataflowRequestModel(BaseModel):
 
             # Using strict attribute tracking is encouraged for accuracy, unless
             # attributes cause side effects or a different behavior is required.
+
+    max_call_depth : int
+        The number of calls the local engine may follow the data across,
+        into the functions called with it and out to the callers of the
+        functions returning it. Defaults to 0, i.e only within `function`.
+    sink_specs : List[SinkSpecModel], optional
+        Declarative sinks, tried in order for every event by the local
+        engine, the first match deciding the result. Events no spec matches
+        go to `sink_callback_fn`, or continue without one. At least one of
+        `sink_specs` and `sink_callback_fn` is required.
+        Defaults to an empty list.
     """
 
     function: function_model.FunctionModel
     source_variable_name: str
-    sink_callback_fn: Callable[[DataflowStateModel], SinkResultType]
+    sink_callback_fn: Optional[Callable[[DataflowStateModel], SinkResultType]] = None
     start_from_step_index: Optional[int] = None
     timeout_secs: int = 180  # Default: 180 secs (3 min), Max: 600 secs (10 min)
     strict_record_attributes_tracking: bool = True
+    max_call_depth: int = 0
+    sink_specs: List[SinkSpecModel] = []
+
+    @model_validator(mode="after")
+    def check_sinks(self):
+        if self.sink_callback_fn is None and not self.sink_specs:
+            raise ValueError("sink_callback_fn or sink_specs is required")
+        return self
 
 
 class DataflowResponseModel(BaseModel):
@@ -244,8 +385,10 @@ class DataflowActionModel(BaseModel):
         Unique identifier for the dataflow action.
     request_hash : str
         Hash value of the request payload, used for deduplication or caching.
-    request : DataflowRequestModel
+    request : Optional[DataflowRequestModel], optional
         The original request model containing parameters for the dataflow action.
+        None if the request references a function that changed or was removed
+        since it was made.
     response : Optional[DataflowResponseModel], optional
         The response model containing the results of the dataflow action.
         Defaults to None if no response is available yet.
@@ -256,7 +399,86 @@ class DataflowActionModel(BaseModel):
     action_id: str
     request_hash: str
     status: DataflowActionStatusType
-    request: DataflowRequestModel
+    request: Optional[DataflowRequestModel] = None
     response: Optional[DataflowResponseModel] = None
     remote_action_id: Optional[str] = None
     data_created: str
+
+
+class DataflowActionSummaryModel(BaseModel):
+    """
+    Represents the header of a dataflow action, without its request and
+    response.
+
+    Unlike :class:`DataflowActionModel`, a summary is read from plain
+    database columns, so listing actions never deserializes their payloads.
+
+    Attributes
+    ----------
+    action_id : str
+        Unique identifier for the dataflow action.
+    request_hash : str, optional
+        Hash value of the request payload. Defaults to `None`.
+    status : DataflowActionStatusType
+        The current status of the dataflow action.
+    remote_action_id : str, optional
+        The identifier of the action on the remote service, once sent.
+        Defaults to `None`.
+    delete_after_read : bool
+        Whether the action is deleted once its response is read.
+        Defaults to False.
+    data_created : str
+        Timestamp indicating when the dataflow action was created.
+    """
+
+    action_id: str
+    request_hash: Optional[str] = None
+    status: DataflowActionStatusType
+    remote_action_id: Optional[str] = None
+    delete_after_read: bool = False
+    data_created: str
+
+    @field_serializer("status", when_used="always")
+    def serialize_status(self, status: DataflowActionStatusType):
+        return status.value
+
+
+class FunctionDataflowSummaryModel(BaseModel):
+    """
+    Represents where the data of each parameter of a function flows to
+    within that function, used by the local dataflow engine at calls it
+    does not descend into.
+
+    Parameters are identified by their 0-based position in
+    `VariableManagerModel.function_args`.
+
+    Attributes
+    ----------
+    fid : str
+        The unique identifier of the summarized function.
+    content_hash : str
+        The content hash of the function the summary was computed from.
+    params_to_return : List[int], optional
+        Parameters whose data may be returned. Defaults to an empty list.
+    params_to_params : Dict[int, List[int]], optional
+        For each parameter, the other parameters its data may be written
+        into (e.g through a pointer). Defaults to an empty dictionary.
+    params_to_globals : Dict[int, List[str]], optional
+        For each parameter, the global variables its data may be written
+        into. Defaults to an empty dictionary.
+    params_to_calls : Dict[int, List[str]], optional
+        For each parameter, the names of the functions its data may be
+        passed to, e.g sinks such as `memcpy`. Defaults to an empty
+        dictionary.
+    complete : bool
+        False if the analysis of the function timed out, in which case
+        flows may be missing. Defaults to True.
+    """
+
+    fid: str
+    content_hash: str
+    params_to_return: List[int] = []
+    params_to_params: Dict[int, List[int]] = {}
+    params_to_globals: Dict[int, List[str]] = {}
+    params_to_calls: Dict[int, List[str]] = {}
+    complete: bool = True
@@ -353,3 +353,56 @@ class DataflowActionStatusType(AutoStrEnum):
     def __str__(self) -> str:
         """Returns the string representation of the enumeration value."""
         return self.name
+
+
+class SearchMatchType(AutoStrEnum):
+    """
+    Represents how a search query is matched against names and file paths.
+
+    Attributes
+    ----------
+    SUBSTRING
+        Matches if the query appears anywhere in the value, e.g `cpy`
+        matches `memcpy` and `strcpy_chk`. Case-insensitive.
+    PREFIX
+        Matches if the value starts with the query. Case-insensitive.
+    GLOB
+        Matches a case-sensitive Unix glob pattern, e.g `*_alloc*`.
+    REGEX
+        Matches a Python regular expression, e.g `^(mem|str)n?cpy$`.
+    """
+
+    SUBSTRING = auto()
+    PREFIX = auto()
+    GLOB = auto()
+    REGEX = auto()
+
+    def __str__(self) -> str:
+        """Returns the string representation of the enumeration value."""
+        return self.name
+
+
+class FunctionDiffType(AutoStrEnum):
+    """
+    Represents how a function differs between two databases.
+
+    Attributes
+    ----------
+    ADDED
+        The function only exists in the new database.
+    REMOVED
+        The function only exists in the old database.
+    CHANGED
+        The function exists in both databases with different content hashes.
+    UNCHANGED
+        The function exists in both databases with the same content hash.
+    """
+
+    ADDED = auto()
+    REMOVED = auto()
+    CHANGED = auto()
+    UNCHANGED = auto()
+
+    def __str__(self) -> str:
+        """Returns the string representation of the enumeration value."""
+        return self.name
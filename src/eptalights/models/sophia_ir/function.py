@@ -743,6 +743,42 @@ class SophiaIRSwitchModel(SophiaIRBaseModel):
         return PrettyPrinter.decompile(self)
 
 
+STEP_MODELS_BY_OP = {
+    OpType.NOP.value: SophiaIRNopModel,
+    OpType.LABEL.value: SophiaIRLabelModel,
+    OpType.ASSIGN.value: SophiaIRAssignModel,
+    OpType.CALL.value: SophiaIRCallModel,
+    OpType.RETURN.value: SophiaIRReturnModel,
+    OpType.COND.value: SophiaIRCondModel,
+    OpType.GOTO.value: SophiaIRGotoModel,
+    OpType.SWITCH.value: SophiaIRSwitchModel,
+}
+
+
+def get_step_model(op: str):
+    """Return the IR step model for an operation type.
+
+    Parameters
+    ----------
+    op : str
+        The operation type, e.g `"CALL"` or `OpType.CALL`.
+
+    Returns
+    -------
+    type
+        The step model class handling `op`.
+
+    Raises
+    ------
+    Exception
+        If an unknown operation type is encountered.
+    """
+    step_model = STEP_MODELS_BY_OP.get(op)
+    if step_model is None:
+        raise Exception("Unknown operation type encountered in steps.")
+    return step_model
+
+
 class FunctionModel(BaseModel):
     """
     Represents a function within a program analysis context.
@@ -828,26 +864,47 @@ class FunctionModel(BaseModel):
         for step in v:
             if not isinstance(step, dict):
                 step = step.model_dump()
-            if step["op"] == OpType.NOP.value:
-                update_steps.append(SophiaIRNopModel(**step))
-            elif step["op"] == OpType.LABEL.value:
-                update_steps.append(SophiaIRLabelModel(**step))
-            elif step["op"] == OpType.ASSIGN.value:
-                update_steps.append(SophiaIRAssignModel(**step))
-            elif step["op"] == OpType.CALL.value:
-                update_steps.append(SophiaIRCallModel(**step))
-            elif step["op"] == OpType.RETURN.value:
-                update_steps.append(SophiaIRReturnModel(**step))
-            elif step["op"] == OpType.COND.value:
-                update_steps.append(SophiaIRCondModel(**step))
-            elif step["op"] == OpType.GOTO.value:
-                update_steps.append(SophiaIRGotoModel(**step))
-            elif step["op"] == OpType.SWITCH.value:
-                update_steps.append(SophiaIRSwitchModel(**step))
-            else:
-                raise Exception("Unknown operation type encountered in steps.")
+            update_steps.append(get_step_model(step["op"])(**step))
         return update_steps
 
+    @classmethod
+    def model_validate_trusted(cls, data: dict) -> "FunctionModel":
+        """Build a function from data known to be well-formed, e.g a function
+        blob produced by the build service and read back from the database.
+
+        Each step is validated exactly once, by the IR model its `op` selects,
+        instead of going through the `set_steps` validator and then being
+        re-checked against every member of the `steps` union.
+
+        Parameters
+        ----------
+        data : dict
+            The function data, as produced by `model_dump()`.
+
+        Returns
+        -------
+        FunctionModel
+            The function model.
+
+        Raises
+        ------
+        Exception
+            If an unknown operation type is encountered in steps.
+        """
+        data = dict(data)
+        has_steps = "steps" in data
+        steps = data.pop("steps", None) or []
+
+        function = cls.model_validate(data)
+        # set without assignment, then mark "steps" as set exactly when
+        # validating data as a whole would have, e.g for exclude_unset
+        function.__dict__["steps"] = [
+            get_step_model(step["op"]).model_validate(step) for step in steps
+        ]
+        if has_steps:
+            function.__pydantic_fields_set__.add("steps")
+        return function
+
     def decompile(self):
         """Generate a human-readable or high-level representation.
 
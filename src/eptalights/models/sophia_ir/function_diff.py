@@ -0,0 +1,30 @@
+from pydantic import BaseModel, field_serializer
+from typing import Optional
+from eptalights.models.sophia_ir.enum_types import FunctionDiffType
+
+
+class FunctionDiffModel(BaseModel):
+    """Represents how a single function differs between two databases.
+
+    Attributes
+    ----------
+    fid : str
+        The unique identifier of the function.
+    diff_type : FunctionDiffType
+        Whether the function was added, removed, changed or is unchanged.
+    old_content_hash : str, optional
+        The content hash of the function in the old database, `None` if it
+        was added.
+    new_content_hash : str, optional
+        The content hash of the function in the new database, `None` if it
+        was removed.
+    """
+
+    fid: str
+    diff_type: FunctionDiffType
+    old_content_hash: Optional[str] = None
+    new_content_hash: Optional[str] = None
+
+    @field_serializer("diff_type", when_used="always")
+    def serialize_diff_type(self, diff_type: FunctionDiffType):
+        return diff_type.value
@@ -0,0 +1,50 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class FunctionSummaryModel(BaseModel):
+    """Represents a lightweight, metadata-only view of a function.
+
+    Unlike :class:`~eptalights.models.sophia_ir.function.FunctionModel`, a
+    summary is built entirely from indexed database columns, so producing one
+    never requires decoding the function's steps, variables or callsites.
+
+    Attributes
+    ----------
+    fid : str
+        A unique identifier for the function.
+    name : str
+        The name of the function.
+    filepath : str
+        The file path where the function is defined.
+    class_name : str, optional
+        The name of the class containing this function (if applicable).
+        Defaults to `None`.
+    num_of_steps : int
+        The number of steps (IR instructions) in the function. Defaults to 0.
+    num_of_callsites : int
+        The number of call sites in the function. Defaults to 0.
+    num_of_variables : int
+        The number of variables managed by the function. Defaults to 0.
+    lineno_start : int, optional
+        The lowest known source line number of the function. Defaults to `None`.
+    lineno_end : int, optional
+        The highest known source line number of the function. Defaults to `None`.
+    content_hash : str, optional
+        A structural hash of the function's steps that ignores line numbers,
+        so it only changes when the code itself does. Defaults to `None`.
+    """
+
+    fid: str
+    name: str
+    filepath: str
+    class_name: Optional[str] = None
+
+    num_of_steps: int = 0
+    num_of_callsites: int = 0
+    num_of_variables: int = 0
+
+    lineno_start: Optional[int] = None
+    lineno_end: Optional[int] = None
+
+    content_hash: Optional[str] = None
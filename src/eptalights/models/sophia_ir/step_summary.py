@@ -0,0 +1,73 @@
+from pydantic import BaseModel, field_serializer
+from typing import List, Optional
+from eptalights.models.sophia_ir.enum_types import OpType, TokenType
+
+
+class StepArgSummaryModel(BaseModel):
+    """Represents one argument of a CALL step, as stored in the steps index.
+
+    Attributes
+    ----------
+    arg_index : int
+        The 0-based position of the argument in the call.
+    ssa_name : str, optional
+        The SSA name of the argument, if it is a variable. Defaults to `None`.
+    variable_name : str, optional
+        The variable name of the argument, if it is a variable.
+        Defaults to `None`.
+    token_types : List[TokenType]
+        The type of every token of the argument, in order.
+        Defaults to an empty list.
+    value : str, optional
+        The values of all tokens of the argument joined together, e.g
+        `"%s\\n"`, `buf[10]` or `st->data`. Defaults to `None`.
+    """
+
+    arg_index: int
+    ssa_name: Optional[str] = None
+    variable_name: Optional[str] = None
+    token_types: List[TokenType] = []
+    value: Optional[str] = None
+
+
+class StepSummaryModel(BaseModel):
+    """Represents a step (IR instruction) as stored in the steps index.
+
+    Unlike the step models of
+    :class:`~eptalights.models.sophia_ir.function.FunctionModel`, a summary is
+    read from indexed database rows, so producing one never requires decoding
+    the function it belongs to.
+
+    Attributes
+    ----------
+    fid : str
+        The unique identifier of the function containing the step.
+    step_index : int
+        The index of the step within its function.
+    op : OpType
+        The operation type of the step.
+    lineno : int
+        The source line number of the step. Defaults to -1.
+    basicblock_index : int, optional
+        The basic block containing the step. Defaults to `None`.
+    fname : str, optional
+        The called function name, for CALL steps. Defaults to `None`.
+    num_of_args : int, optional
+        The number of arguments, for CALL steps. Defaults to `None`.
+    args : List[StepArgSummaryModel]
+        The arguments of a CALL step, ordered by `arg_index`.
+        Defaults to an empty list.
+    """
+
+    fid: str
+    step_index: int
+    op: OpType
+    lineno: int = -1
+    basicblock_index: Optional[int] = None
+    fname: Optional[str] = None
+    num_of_args: Optional[int] = None
+    args: List[StepArgSummaryModel] = []
+
+    @field_serializer("op", when_used="always")
+    def serialize_op(self, op: OpType):
+        return op.value
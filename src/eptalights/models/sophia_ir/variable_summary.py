@@ -0,0 +1,42 @@
+from pydantic import BaseModel, field_serializer
+from typing import Optional
+from eptalights.models.sophia_ir.enum_types import VarType
+
+
+class VariableSummaryModel(BaseModel):
+    """Represents a variable declaration as stored in the variables index.
+
+    Unlike :class:`~eptalights.models.sophia_ir.variable.VariableModel`, a
+    summary is read from indexed database rows, so producing one never
+    requires decoding the function that declares it.
+
+    Attributes
+    ----------
+    fid : str
+        The unique identifier of the function declaring the variable.
+    name : str
+        The name of the variable.
+    filepath : str, optional
+        The file path of the function declaring the variable.
+        Defaults to `None`.
+    vartype : VarType
+        The type of the variable. Defaults to `VarType.UNDEF`.
+    type_declaration : str, optional
+        The declared type, e.g `char [256]`. Defaults to `None`.
+    full_declaration : str, optional
+        The full declaration, e.g `char buf[256]`. Defaults to `None`.
+    num_of_ssa_versions : int
+        The number of SSA versions of the variable. Defaults to 0.
+    """
+
+    fid: str
+    name: str
+    filepath: Optional[str] = None
+    vartype: VarType = VarType.UNDEF
+    type_declaration: Optional[str] = None
+    full_declaration: Optional[str] = None
+    num_of_ssa_versions: int = 0
+
+    @field_serializer("vartype", when_used="always")
+    def serialize_vartype(self, vartype: VarType):
+        return vartype.value
@@ -0,0 +1,203 @@
+"""
+A small synthetic database for the dataflow tests, holding the functions of
+
+    int leaf(int l) { return l; }
+    int mid(int p, int q) { int t = leaf(q); return t; }
+    int top(int n, int a) { int y = mid(n, a); memcpy(buf, y, 4); return y; }
+"""
+
+import pytest
+
+from eptalights import DatabaseAPI, models
+from eptalights.core.writer import DatabaseWriter
+
+FILEPATH = "/src/chain.c"
+
+
+def fid_of(name: str) -> str:
+    return f"{FILEPATH}:{name}#1"
+
+
+def _variable_name(ssa_name: str) -> str:
+    return ssa_name.rsplit("_", 1)[0]
+
+
+def _operand(ssa_name: str, step_index: int, position: int = 0) -> dict:
+    return {
+        "ssa_name": ssa_name,
+        "ssa_version": int(ssa_name.rsplit("_", 1)[1]),
+        "variable_name": _variable_name(ssa_name),
+        "step_index": step_index,
+        "position": position,
+        "tokens": [
+            {
+                "token_type": "IS_VARIABLE",
+                "is_base_variable": True,
+                "code_name": "ssa_name",
+                "value": ssa_name,
+                "value_extended": _variable_name(ssa_name),
+                "discovery_depth": 0,
+            }
+        ],
+    }
+
+
+def call_step(step_index: int, fname: str, args: list, dst: str = None) -> dict:
+    step = {
+        "op": "CALL",
+        "step_index": step_index,
+        "lineno": step_index + 1,
+        "basicblock_index": 0,
+        "fname": fname,
+        "fargs": [
+            _operand(arg, step_index, position + 1) for position, arg in enumerate(args)
+        ],
+        "ssa_variables_used_here": list(args),
+        "variables_used_here": [_variable_name(arg) for arg in args],
+    }
+    if dst is not None:
+        step["dst"] = _operand(dst, step_index)
+        step["ssa_variables_defined_here"] = [dst]
+        step["variables_defined_here"] = [_variable_name(dst)]
+    return step
+
+
+def return_step(step_index: int, ssa_name: str) -> dict:
+    return {
+        "op": "RETURN",
+        "step_index": step_index,
+        "lineno": step_index + 1,
+        "basicblock_index": 0,
+        "dst": _operand(ssa_name, step_index),
+        "ssa_variables_used_here": [ssa_name],
+        "variables_used_here": [_variable_name(ssa_name)],
+    }
+
+
+def make_function(name: str, params: list, steps: list) -> models.FunctionModel:
+    """
+    a single basic block function. its variables and callsites are derived
+    from the SSA names defined and used by steps.
+    """
+    fid = fid_of(name)
+
+    callsites = {}
+    for step in steps:
+        if step["op"] == "CALL":
+            callsites[f"{step['fname']}_{step['step_index']}"] = {
+                "cid": f"{fid}:{step['fname']}_{step['step_index']}",
+                "step_index": step["step_index"],
+                "fn_name": [step["fname"]],
+                "num_of_args": len(step["fargs"]),
+                "ssa_variables_used_as_callsite_arg": step["ssa_variables_used_here"],
+                "variables_used_as_callsite_arg": step["variables_used_here"],
+                "ssa_variables_defined_here": step.get(
+                    "ssa_variables_defined_here", []
+                ),
+                "variables_defined_here": step.get("variables_defined_here", []),
+            }
+
+    ssa_variables = {
+        f"{param}_0": {"defs": [], "uses": [], "calls": []} for param in params
+    }
+    for step in steps:
+        callsite = f"{step.get('fname')}_{step['step_index']}"
+        for ssa_name in step.get("ssa_variables_defined_here", []):
+            ssa_variables.setdefault(ssa_name, {"defs": [], "uses": [], "calls": []})
+            ssa_variables[ssa_name]["defs"].append(step["step_index"])
+        for ssa_name in step["ssa_variables_used_here"]:
+            ssa_variables.setdefault(ssa_name, {"defs": [], "uses": [], "calls": []})
+            ssa_variables[ssa_name]["uses"].append(step["step_index"])
+            if callsite in callsites:
+                ssa_variables[ssa_name]["calls"].append(callsite)
+
+    variables = {}
+    for ssa_name, ssa_variable in ssa_variables.items():
+        variable_name = _variable_name(ssa_name)
+        variable = variables.setdefault(
+            variable_name,
+            {
+                "vid": f"{fid}:{variable_name}",
+                "name": variable_name,
+                "vartype": (
+                    "FUNCTION_ARGUMENT" if variable_name in params else "LOCAL_VARIABLE"
+                ),
+                "unique_ssa_variables": {},
+                "full_declaration": f"int {variable_name}",
+                "type_declaration": "int",
+            },
+        )
+        variable["unique_ssa_variables"][ssa_name] = {
+            "ssa_name": ssa_name,
+            "ssa_version": int(ssa_name.rsplit("_", 1)[1]),
+            "variable_name": variable_name,
+            "variable_defined_at_steps": ssa_variable["defs"],
+            "variable_used_at_steps": ssa_variable["uses"],
+            "variable_used_in_callsites": ssa_variable["calls"],
+        }
+
+    return models.FunctionModel(
+        fid=fid,
+        name=name,
+        filepath=FILEPATH,
+        variable_manager={
+            "function_args": params,
+            "local_variables": [name for name in variables if name not in params],
+            "variables": variables,
+        },
+        callsite_manager={
+            "step_callsites": {
+                callsite["step_index"]: ssa_name
+                for ssa_name, callsite in callsites.items()
+            },
+            "unique_callsites": {
+                callsite["fn_name"][0]: [ssa_name]
+                for ssa_name, callsite in callsites.items()
+            },
+            "callsites": callsites,
+        },
+        cfg={
+            "basicblock_exit_nodes": [0],
+            "basicblock_steps": {0: [step["step_index"] for step in steps]},
+            "basicblock_edges": {},
+        },
+        steps=steps,
+    )
+
+
+def chain_functions() -> list[models.FunctionModel]:
+    return [
+        make_function("leaf", ["l"], [return_step(0, "l_0")]),
+        make_function(
+            "mid",
+            ["p", "q"],
+            [call_step(0, "leaf", ["q_0"], dst="t_1"), return_step(1, "t_1")],
+        ),
+        make_function(
+            "top",
+            ["n", "a"],
+            [
+                call_step(0, "mid", ["n_0", "a_0"], dst="y_1"),
+                call_step(1, "memcpy", ["buf_0", "y_1"]),
+                return_step(2, "y_1"),
+            ],
+        ),
+    ]
+
+
+def write_functions(dbpath: str, functions: list[models.FunctionModel]):
+    writer = DatabaseWriter(dbpath)
+    writer.add_functions(functions)
+    writer.close()
+
+
+@pytest.fixture
+def dbpath(tmp_path) -> str:
+    dbpath = str(tmp_path / "chain.db")
+    write_functions(dbpath, chain_functions())
+    return dbpath
+
+
+@pytest.fixture
+def database(dbpath) -> DatabaseAPI:
+    return DatabaseAPI(dbpath)
@@ -0,0 +1,93 @@
+import sys
+
+import pytest
+
+from eptalights import DatabaseAPI
+from eptalights.core import db as eptalights_db
+from eptalights.core.callgraph import CallGraph
+
+from tests.conftest import call_step, fid_of, make_function, return_step
+from tests.conftest import write_functions
+
+
+def test_callers_and_callees(database):
+    callgraph = database.get_callgraph()
+
+    assert callgraph.num_of_functions == 3
+    assert callgraph.callees(fid_of("top")) == (fid_of("mid"),)
+    assert callgraph.callers(fid_of("mid")) == (fid_of("top"),)
+    assert callgraph.callers(fid_of("top")) == ()
+    assert callgraph.external_callees(fid_of("top")) == ("memcpy",)
+    assert callgraph.external_callees(fid_of("mid")) == ()
+
+
+def test_reachable_from_and_paths_between(database):
+    callgraph = database.get_callgraph()
+
+    assert callgraph.reachable_from(fid_of("top")) == {
+        fid_of("mid"): 1,
+        fid_of("leaf"): 2,
+    }
+    assert callgraph.reachable_from(fid_of("top"), depth=1) == {fid_of("mid"): 1}
+    assert callgraph.paths_between(fid_of("top"), fid_of("leaf")) == (
+        (fid_of("top"), fid_of("mid"), fid_of("leaf")),
+    )
+    assert callgraph.paths_between(fid_of("top"), fid_of("leaf"), max_depth=1) == ()
+    assert callgraph.paths_between(fid_of("leaf"), fid_of("top")) == ()
+
+
+def test_stored_callgraph_is_reused(dbpath, monkeypatch):
+    DatabaseAPI(dbpath).get_callgraph()
+
+    def build(*args, **kwargs):
+        raise AssertionError("call graph built again")
+
+    monkeypatch.setattr(eptalights_db.CallGraph, "build", build)
+    callgraph = DatabaseAPI(dbpath).get_callgraph()
+    assert callgraph.callees(fid_of("top")) == (fid_of("mid"),)
+
+
+def test_stored_callgraph_is_rebuilt_after_writes(dbpath):
+    DatabaseAPI(dbpath).get_callgraph()
+
+    write_functions(
+        dbpath, [make_function("bottom", ["b"], [call_step(0, "leaf", ["b_0"])])]
+    )
+    assert DatabaseAPI(dbpath).get_callgraph().callers(fid_of("leaf")) == (
+        fid_of("bottom"),
+        fid_of("mid"),
+    )
+
+    # mid now calls nothing, with as many functions and callsites as before
+    write_functions(
+        dbpath,
+        [
+            make_function("mid", ["p", "q"], [return_step(0, "p_0")]),
+            make_function(
+                "bottom",
+                ["b"],
+                [call_step(0, "leaf", ["b_0"]), call_step(1, "free", ["b_0"])],
+            ),
+        ],
+    )
+    callgraph = DatabaseAPI(dbpath).get_callgraph()
+    assert callgraph.callees(fid_of("mid")) == ()
+    assert callgraph.external_callees(fid_of("bottom")) == ("free",)
+
+
+def test_callgraph_round_trips_in_either_byte_order(database):
+    callgraph = database.get_callgraph()
+    data = callgraph.to_dict()
+    assert data["byteorder"] == "little"
+
+    loaded = CallGraph.from_dict(data)
+    assert loaded.reachable_from(fid_of("top")) == callgraph.reachable_from(
+        fid_of("top")
+    )
+
+    # graphs stored before the byte order was recorded use the host's
+    del data["byteorder"]
+    if sys.byteorder == "little":
+        assert CallGraph.from_dict(data).callees(fid_of("top")) == (fid_of("mid"),)
+    else:
+        pytest.skip("arrays stored little-endian")
@@ -0,0 +1,57 @@
+from eptalights import DatabaseAPI
+
+from tests.conftest import FILEPATH, fid_of
+
+
+def counting_decodes(dbpath, monkeypatch) -> tuple[DatabaseAPI, list]:
+    # without the function cache, every load decodes
+    database = DatabaseAPI(dbpath, function_cache_max_entries=0)
+    decoded = []
+    decode_function_data = database._decode_function_data
+
+    def decode(function_data):
+        function = decode_function_data(function_data)
+        decoded.append(function.fid)
+        return function
+
+    monkeypatch.setattr(database, "_decode_function_data", decode)
+    return database, decoded
+
+
+def test_callsites_of_a_function_share_one_decode(dbpath, monkeypatch):
+    database, decoded = counting_decodes(dbpath, monkeypatch)
+
+    results = list(database.search_callsites())
+    assert sorted(callsite.fn_name[0] for _, callsite in results) == [
+        "leaf",
+        "memcpy",
+        "mid",
+    ]
+    assert sorted(decoded) == [fid_of("mid"), fid_of("top")]
+
+    top_functions = {
+        id(function) for function, _ in results if function.fid == fid_of("top")
+    }
+    assert len(top_functions) == 1
+
+
+def test_callsites_grouped_by_function(dbpath, monkeypatch):
+    database, decoded = counting_decodes(dbpath, monkeypatch)
+
+    groups = {
+        function.name: sorted(callsite.fn_name[0] for callsite in callsites)
+        for function, callsites in database.get_callsites_by_filepath(
+            FILEPATH, group_by_function=True
+        )
+    }
+    assert groups == {"mid": ["leaf"], "top": ["memcpy", "mid"]}
+    assert len(decoded) == 2
+
+    groups = {
+        function.name: sorted(callsite.name for callsite in callsites)
+        for function, callsites in database.search_callsites(
+            "m", lazy=True, group_by_function=True
+        )
+    }
+    assert groups == {"top": ["memcpy", "mid"]}
+    assert len(decoded) == 2
@@ -0,0 +1,61 @@
+from eptalights import DatabaseAPI, diff_databases, models
+
+from tests.conftest import chain_functions, fid_of, make_function, return_step
+from tests.conftest import write_functions
+
+
+def sparse_dump(function: models.FunctionModel) -> dict:
+    # as the build service writes them, leaving defaults out
+    return function.model_dump(mode="json", exclude_defaults=True)
+
+
+def test_sparse_blob_hashes_as_full_dump(tmp_path):
+    full_dbpath = str(tmp_path / "full.db")
+    sparse_dbpath = str(tmp_path / "sparse.db")
+    write_functions(full_dbpath, chain_functions())
+    write_functions(sparse_dbpath, [sparse_dump(f) for f in chain_functions()])
+
+    full_hashes = list(DatabaseAPI(full_dbpath).iter_function_content_hashes())
+    sparse_hashes = list(DatabaseAPI(sparse_dbpath).iter_function_content_hashes())
+
+    assert [fid for fid, _ in full_hashes] == sorted(
+        fid_of(name) for name in ("leaf", "mid", "top")
+    )
+    assert full_hashes == sparse_hashes
+    assert list(diff_databases(full_dbpath, sparse_dbpath)) == []
+
+
+def test_content_hash_ignores_line_numbers(tmp_path):
+    leaf = make_function("leaf", ["l"], [return_step(0, "l_0")])
+    moved_leaf = leaf.model_copy(deep=True)
+    moved_leaf.steps[0].lineno = 42
+
+    old_dbpath = str(tmp_path / "old.db")
+    new_dbpath = str(tmp_path / "new.db")
+    write_functions(old_dbpath, [leaf])
+    write_functions(new_dbpath, [moved_leaf])
+
+    assert list(diff_databases(old_dbpath, new_dbpath)) == []
+
+
+def test_diff_databases(tmp_path, dbpath):
+    new_dbpath = str(tmp_path / "new.db")
+    write_functions(
+        new_dbpath,
+        [
+            make_function("leaf", ["l"], [return_step(0, "l_0")]),
+            make_function("mid", ["p", "q"], [return_step(0, "p_0")]),
+            make_function("bottom", ["b"], [return_step(0, "b_0")]),
+        ],
+    )
+
+    diffs = {diff.fid: diff for diff in diff_databases(dbpath, new_dbpath)}
+
+    assert {fid: diff.diff_type for fid, diff in diffs.items()} == {
+        fid_of("bottom"): models.FunctionDiffType.ADDED,
+        fid_of("mid"): models.FunctionDiffType.CHANGED,
+        fid_of("top"): models.FunctionDiffType.REMOVED,
+    }
+    assert diffs[fid_of("mid")].old_content_hash == DatabaseAPI(
+        dbpath
+    ).get_function_content_hash(fid_of("mid"))
@@ -0,0 +1,76 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from eptalights import DatabaseAPI, models
+
+from tests.conftest import fid_of
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+
+
+def journal_mode(dbpath: str) -> str:
+    conn = sqlite3.connect(dbpath)
+    try:
+        return conn.execute("PRAGMA journal_mode").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def create_action(database) -> models.DataflowActionModel:
+    return database.create_dataflow_action(
+        models.DataflowRequestModel(
+            function=database.get_function_by_id(fid_of("top")),
+            source_variable_name="a",
+            sink_specs=[MEMCPY_SINK],
+        )
+    )
+
+
+def test_only_new_databases_are_switched_to_wal(dbpath, tmp_path):
+    assert journal_mode(dbpath) == "wal"
+
+    # e.g a downloaded build
+    downloaded_dbpath = str(tmp_path / "downloaded.db")
+    shutil.copy(dbpath, downloaded_dbpath)
+    conn = sqlite3.connect(downloaded_dbpath)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+
+    create_action(DatabaseAPI(downloaded_dbpath))
+    assert journal_mode(downloaded_dbpath) == "delete"
+
+
+def test_read_only_databases_are_never_written(dbpath):
+    sidecar_path = os.path.join(os.path.dirname(dbpath), "chain.dataflow.db")
+    digest = file_digest(dbpath)
+
+    database = DatabaseAPI(dbpath, profile="analysis")
+    assert database.read_only
+    assert [function.name for function in database.search_functions("top")] == ["top"]
+    assert len(list(database.search_function_summaries())) == 3
+    assert list(database.iter_dataflow_actions()) == []
+    # the sidecar is only created by the first dataflow write
+    assert not os.path.exists(sidecar_path)
+
+    df_action = create_action(database)
+    assert os.path.exists(sidecar_path)
+    assert file_digest(dbpath) == digest
+
+    database = DatabaseAPI(dbpath, read_only=True)
+    assert [action.action_id for action in database.iter_dataflow_actions()] == [
+        df_action.action_id
+    ]
+
+
+def test_unknown_profile_is_rejected(dbpath):
+    with pytest.raises(ValueError):
+        DatabaseAPI(dbpath, profile="fast")
@@ -0,0 +1,130 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from eptalights import models
+from eptalights.core import db
+
+from tests.conftest import fid_of
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+DONE = models.DataflowActionStatusType.DONE
+PENDING = models.DataflowActionStatusType.LOCAL_PENDING
+
+
+def create_actions(database, num_of_actions: int) -> list[str]:
+    df_request = models.DataflowRequestModel(
+        function=database.get_function_by_id(fid_of("top")),
+        source_variable_name="a",
+        sink_specs=[MEMCPY_SINK],
+    )
+    return [
+        str(database.create_dataflow_action(df_request).action_id)
+        for _ in range(num_of_actions)
+    ]
+
+
+def make_old(dbpath: str, action_ids: list[str], days: int):
+    data_created = datetime.now(timezone.utc) - timedelta(days=days)
+    conn = sqlite3.connect(dbpath)
+    try:
+        conn.executemany(
+            "UPDATE dataflow_actions SET data_created = ? WHERE action_id = ?",
+            [
+                (data_created.strftime("%Y-%m-%d %H:%M:%S"), action_id)
+                for action_id in action_ids
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def statuses(database) -> dict[str, models.DataflowActionStatusType]:
+    return {
+        str(summary.action_id): summary.status
+        for summary in database.iter_dataflow_action_summaries()
+    }
+
+
+def test_delete_by_status_and_age(dbpath, database):
+    ids = create_actions(database, 6)
+    database.update_dataflow_actions_bulk(
+        [{"action_id": action_id, "status": DONE} for action_id in ids[:3]]
+    )
+    make_old(dbpath, [ids[0], ids[3]], days=10)
+
+    assert database.delete_dataflow_actions(status=DONE, older_than=timedelta(1)) == 1
+    assert sorted(statuses(database)) == sorted(ids[1:])
+
+    naive_cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(1)
+    assert database.delete_dataflow_actions(older_than=naive_cutoff) == 1
+    assert database.delete_dataflow_actions(status=DONE) == 2
+    assert sorted(statuses(database)) == sorted(ids[4:])
+
+    assert database.delete_dataflow_actions() == 2
+    assert statuses(database) == {}
+
+
+def test_delete_by_ids_in_batches(database, monkeypatch):
+    monkeypatch.setattr(db, "DELETE_DATAFLOW_ACTIONS_BATCH_SIZE", 2)
+    ids = create_actions(database, 6)
+    database.update_dataflow_action_by_local_id(ids[0], status=DONE)
+
+    assert database.delete_dataflow_actions(ids=iter(ids[:5]), status=PENDING) == 4
+    assert sorted(statuses(database)) == sorted([ids[0], ids[5]])
+    assert database.delete_dataflow_actions(ids=[]) == 0
+    assert len(statuses(database)) == 2
+
+
+def test_bulk_updates(database):
+    ids = create_actions(database, 4)
+    database.update_dataflow_action_by_local_id(ids[3], status=DONE)
+
+    df_response = models.DataflowResponseModel(status=False, paths=[])
+    assert (
+        database.update_dataflow_actions_bulk(
+            [
+                {"action_id": ids[0], "remote_action_id": "r0"},
+                {"remote_action_id": "r0", "status": DONE},
+                {
+                    "action_id": ids[1],
+                    "response_b64": database._encode_dataflow_action_request_to_b64(
+                        df_response
+                    ),
+                },
+                # not a response, ignored
+                {
+                    "action_id": ids[2],
+                    "response_b64": database._encode_dataflow_action_request_to_b64(
+                        "paths"
+                    ),
+                },
+                # a DONE action keeps its status
+                {"action_id": ids[3], "status": PENDING},
+                {"remote_action_id": "missing", "status": DONE},
+            ]
+        )
+        == 4
+    )
+
+    assert statuses(database) == {
+        ids[0]: DONE,
+        ids[1]: PENDING,
+        ids[2]: PENDING,
+        ids[3]: DONE,
+    }
+    assert database.get_dataflow_action(ids[0]).remote_action_id == "r0"
+    assert database.get_dataflow_action(ids[1]).response == df_response
+    assert database.get_dataflow_action(ids[2]).response.status
+
+
+def test_bulk_update_without_a_key_changes_nothing(database):
+    ids = create_actions(database, 2)
+
+    with pytest.raises(ValueError):
+        database.update_dataflow_actions_bulk(
+            [{"action_id": ids[0], "status": DONE}, {"status": DONE}]
+        )
+    assert set(statuses(database).values()) == {PENDING}
@@ -0,0 +1,98 @@
+import sqlite3
+
+from eptalights import models
+
+from tests.conftest import fid_of
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+
+
+def create_actions(database, num_of_actions: int) -> list[str]:
+    df_request = models.DataflowRequestModel(
+        function=database.get_function_by_id(fid_of("top")),
+        source_variable_name="a",
+        sink_specs=[MEMCPY_SINK],
+    )
+    return [
+        str(database.create_dataflow_action(df_request).action_id)
+        for _ in range(num_of_actions)
+    ]
+
+
+def set_data_created(dbpath: str, data_created: dict[str, str]):
+    conn = sqlite3.connect(dbpath)
+    try:
+        conn.executemany(
+            "UPDATE dataflow_actions SET data_created = ? WHERE action_id = ?",
+            [(created, action_id) for action_id, created in data_created.items()],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def action_ids(df_actions) -> list[str]:
+    return [str(df_action.action_id) for df_action in df_actions]
+
+
+def test_pages_follow_creation_order(dbpath, database):
+    ids = create_actions(database, 7)
+    # created newest first, with a tie broken by action_id
+    set_data_created(
+        dbpath,
+        {
+            action_id: f"2026-01-0{min(7 - i, 5)} 00:00:00"
+            for i, action_id in enumerate(ids)
+        },
+    )
+    expected = [ids[6], ids[5], ids[4], ids[3], *sorted(ids[:3])]
+
+    assert action_ids(database.iter_dataflow_actions()) == expected
+    for page_size in (1, 2, 3, 7, 8):
+        actions = database.iter_dataflow_actions(page_size=page_size)
+        assert action_ids(actions) == expected
+        summaries = database.iter_dataflow_action_summaries(page_size=page_size)
+        assert action_ids(summaries) == expected
+
+
+def test_status_filter(database):
+    ids = create_actions(database, 5)
+    for action_id in ids[::2]:
+        database.update_dataflow_action_by_local_id(
+            action_id, status=models.DataflowActionStatusType.DONE
+        )
+
+    assert sorted(
+        action_ids(
+            database.iter_dataflow_actions(
+                status=models.DataflowActionStatusType.DONE, page_size=2
+            )
+        )
+    ) == sorted(ids[::2])
+    assert sorted(
+        action_ids(
+            database.iter_dataflow_action_summaries(
+                status=models.DataflowActionStatusType.LOCAL_PENDING, page_size=1
+            )
+        )
+    ) == sorted(ids[1::2])
+
+
+def test_changes_while_iterating_skip_and_repeat_nothing(database):
+    ids = create_actions(database, 6)
+    expected = action_ids(database.iter_dataflow_actions())
+
+    seen = []
+    for df_action in database.iter_dataflow_actions(page_size=2):
+        seen.append(str(df_action.action_id))
+        database.update_dataflow_action_by_local_id(
+            df_action.action_id, status=models.DataflowActionStatusType.DONE
+        )
+        if len(seen) == 1:
+            # an action already seen
+            database.delete_dataflow_action(df_action.action_id)
+
+    assert seen == expected
+    assert sorted(action_ids(database.iter_dataflow_actions())) == sorted(
+        set(ids) - {seen[0]}
+    )
@@ -0,0 +1,118 @@
+import sqlite3
+from datetime import timedelta
+
+from eptalights import DatabaseAPI, models
+
+from tests.conftest import call_step, fid_of, make_function, return_step
+from tests.conftest import write_functions
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+DONE = models.DataflowActionStatusType.DONE
+
+
+def top_request(database) -> models.DataflowRequestModel:
+    return models.DataflowRequestModel(
+        function=database.get_function_by_id(fid_of("top")),
+        source_variable_name="a",
+        sink_specs=[MEMCPY_SINK],
+    )
+
+
+def finish(database, df_action, status: bool = True):
+    database.update_dataflow_action_by_local_id(
+        df_action.action_id,
+        status=DONE,
+        response_b64=database._encode_dataflow_action_request_to_b64(
+            models.DataflowResponseModel(status=status, paths=[])
+        ),
+    )
+
+
+def cached_action_id(database, **options):
+    df_action = database.create_dataflow_action(
+        top_request(database), use_cached_response=True, **options
+    )
+    return df_action.action_id
+
+
+def test_only_successful_done_actions_are_reused(database):
+    df_action = database.create_dataflow_action(top_request(database))
+    assert cached_action_id(database) != df_action.action_id
+
+    finish(database, df_action, status=False)
+    assert cached_action_id(database) != df_action.action_id
+
+    finish(database, df_action)
+    assert cached_action_id(database) == df_action.action_id
+    assert database.get_cached_dataflow_action(df_action.request_hash) == (
+        database.get_dataflow_action(df_action.action_id)
+    )
+
+
+def test_cache_is_scoped_by_engine_and_age(dbpath, database):
+    df_action = database.create_dataflow_action(top_request(database), engine="local")
+    finish(database, df_action)
+
+    assert cached_action_id(database, engine="local") == df_action.action_id
+    assert cached_action_id(database) != df_action.action_id
+
+    conn = sqlite3.connect(dbpath)
+    conn.execute(
+        "UPDATE dataflow_actions SET data_created = datetime('now', '-2 hours') "
+        "WHERE action_id = ?",
+        (str(df_action.action_id),),
+    )
+    conn.commit()
+    conn.close()
+    assert (
+        cached_action_id(database, engine="local", cache_max_age=3600)
+        != df_action.action_id
+    )
+    assert (
+        cached_action_id(database, engine="local", cache_max_age=timedelta(hours=3))
+        == df_action.action_id
+    )
+
+
+def test_delete_after_read_actions_are_not_reused(database):
+    df_action = database.create_dataflow_action(
+        top_request(database), delete_after_read=True
+    )
+    finish(database, df_action)
+
+    assert database.get_cached_dataflow_action(df_action.request_hash) is None
+
+
+def test_rewritten_functions_are_not_served_from_the_cache(dbpath, database):
+    df_action = database.dataflow_run_local(top_request(database))
+    cached_action = database.dataflow_run_local(top_request(database))
+    assert cached_action.action_id == df_action.action_id
+    new_action = database.dataflow_run_local(
+        top_request(database), use_cached_response=False
+    )
+    assert new_action.action_id != df_action.action_id
+
+    # top now copies n instead of y
+    write_functions(
+        dbpath,
+        [
+            make_function(
+                "top",
+                ["n", "a"],
+                [
+                    call_step(0, "mid", ["n_0", "a_0"], dst="y_1"),
+                    call_step(1, "memcpy", ["buf_0", "n_0"]),
+                    return_step(2, "y_1"),
+                ],
+            )
+        ],
+    )
+    database = DatabaseAPI(dbpath)
+    new_action = database.dataflow_run_local(top_request(database))
+    assert new_action.request_hash != df_action.request_hash
+    assert new_action.response.paths == []
+
+    assert database.invalidate_dataflow_cache() == 2
+    assert [df_action.action_id for df_action in database.iter_dataflow_actions()] == [
+        new_action.action_id
+    ]
@@ -0,0 +1,129 @@
+import pytest
+
+from eptalights import models
+from eptalights.core.dataflow_engine import (
+    LocalDataflowEngine,
+    summarize_function_dataflow,
+)
+
+from tests.conftest import chain_functions, fid_of
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+
+
+@pytest.fixture
+def functions() -> dict[str, models.FunctionModel]:
+    return {function.name: function for function in chain_functions()}
+
+
+@pytest.fixture
+def engine(functions) -> LocalDataflowEngine:
+    def resolve_callees(function, fname):
+        return [functions[fname]] if fname in functions else []
+
+    def resolve_callers(function):
+        callers = []
+        for caller in functions.values():
+            for callsite in caller.callsite_manager.callsites.values():
+                if function.name in callsite.fn_name:
+                    callers.append((caller, callsite.step_index))
+        return callers
+
+    def resolve_summary(function, deadline=None):
+        return summarize_function_dataflow(function, function.fid, deadline=deadline)
+
+    return LocalDataflowEngine(resolve_callees, resolve_callers, resolve_summary)
+
+
+def run(engine, function, source_variable_name, max_call_depth, sink_specs=None):
+    df_response = engine.run(
+        models.DataflowRequestModel(
+            function=function,
+            source_variable_name=source_variable_name,
+            sink_specs=sink_specs or [MEMCPY_SINK],
+            max_call_depth=max_call_depth,
+        )
+    )
+    assert df_response.status
+    return df_response.paths
+
+
+def event_trail(path) -> list[tuple]:
+    return [
+        (event.fid, event.variable_name, event.step_index, event.data_direction)
+        for event in path.events
+    ]
+
+
+def test_argument_flows_into_matching_parameter(engine, functions):
+    (path,) = run(engine, functions["top"], "a", max_call_depth=2)
+
+    assert event_trail(path) == [
+        (fid_of("top"), "a", 0, "read"),
+        (fid_of("mid"), "q", 0, "read"),
+        (fid_of("leaf"), "l", 0, "read"),
+        (fid_of("mid"), "t", 0, "write"),
+        (fid_of("mid"), "t", 1, "read"),
+        (fid_of("top"), "y", 0, "write"),
+        (fid_of("top"), "y", 1, "read"),
+    ]
+
+
+def test_argument_of_unused_parameter_stops(engine, functions):
+    # mid never uses p, so n does not reach its return value
+    assert run(engine, functions["top"], "n", max_call_depth=2) == []
+
+
+def test_return_flows_into_call_destination(engine, functions):
+    # ascending from leaf to mid, and from mid to top, at their call steps
+    (path,) = run(engine, functions["leaf"], "l", max_call_depth=2)
+
+    assert event_trail(path) == [
+        (fid_of("leaf"), "l", 0, "read"),
+        (fid_of("mid"), "t", 0, "write"),
+        (fid_of("mid"), "t", 1, "read"),
+        (fid_of("top"), "y", 0, "write"),
+        (fid_of("top"), "y", 1, "read"),
+    ]
+
+
+def test_calls_past_max_call_depth_use_summaries(engine, functions):
+    (path,) = run(engine, functions["top"], "a", max_call_depth=1)
+    assert fid_of("leaf") not in {event.fid for event in path.events}
+    assert (fid_of("mid"), "t", 0, "write") in event_trail(path)
+
+    (path,) = run(engine, functions["top"], "a", max_call_depth=0)
+    assert {event.fid for event in path.events} == {fid_of("top")}
+
+    assert run(engine, functions["top"], "n", max_call_depth=0) == []
+
+
+def run_local(database, function_name, source_variable_name, sink_specs):
+    df_action = database.dataflow_run_local(
+        models.DataflowRequestModel(
+            function=database.get_function_by_id(fid_of(function_name)),
+            source_variable_name=source_variable_name,
+            sink_specs=sink_specs,
+            max_call_depth=2,
+        )
+    )
+    assert df_action.response.status
+    return df_action.response.paths
+
+
+def test_database_resolves_callees_and_callers(database, engine, functions):
+    # the functions and callsites tables resolve calls as the resolvers above
+    for function_name, source_variable_name in (("top", "a"), ("leaf", "l")):
+        paths = run_local(database, function_name, source_variable_name, [MEMCPY_SINK])
+        assert len(paths) == 1
+        assert [event_trail(path) for path in paths] == [
+            event_trail(path)
+            for path in run(
+                engine,
+                functions[function_name],
+                source_variable_name,
+                max_call_depth=2,
+            )
+        ]
+
+    assert run_local(database, "top", "n", [MEMCPY_SINK]) == []
@@ -0,0 +1,135 @@
+import sqlite3
+
+import pytest
+
+from eptalights import models
+
+from tests.conftest import FILEPATH, fid_of
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+RETURN_SINK = models.SinkSpecModel(op=models.OpType.RETURN)
+
+
+def run_local(database, function_name, source_variable_name, sink_specs):
+    df_action = database.dataflow_run_local(
+        models.DataflowRequestModel(
+            function=database.get_function_by_id(fid_of(function_name)),
+            source_variable_name=source_variable_name,
+            sink_specs=sink_specs,
+            max_call_depth=2,
+        )
+    )
+    assert df_action.response.status
+    return df_action
+
+
+@pytest.fixture
+def actions(database) -> dict[str, models.DataflowActionModel]:
+    return {
+        "a": run_local(database, "top", "a", [MEMCPY_SINK]),
+        "n": run_local(database, "top", "n", [MEMCPY_SINK]),
+        "l": run_local(database, "leaf", "l", [RETURN_SINK]),
+    }
+
+
+def search_paths(database, **filters) -> list[tuple]:
+    return [
+        (str(path.action_id), path.sink_fid, path.sink_op, path.sink_step_index)
+        for path in database.search_dataflow_paths(**filters)
+    ]
+
+
+def test_search_dataflow_paths_by_action(database, actions):
+    assert search_paths(database, action_id=actions["a"].action_id) == [
+        (str(actions["a"].action_id), fid_of("top"), models.OpType.CALL, 1)
+    ]
+    assert search_paths(database, action_id=actions["n"].action_id) == []
+
+
+def test_search_dataflow_paths_by_sink(database, actions):
+    assert search_paths(database, filter_by_sink_op=models.OpType.RETURN) == [
+        (str(actions["l"].action_id), fid_of("leaf"), models.OpType.RETURN, 0)
+    ]
+    assert search_paths(database, filter_by_sink_op="CALL") == [
+        (str(actions["a"].action_id), fid_of("top"), models.OpType.CALL, 1)
+    ]
+    assert search_paths(database, filter_by_sink_fid=fid_of("leaf")) == (
+        search_paths(database, filter_by_sink_op=models.OpType.RETURN)
+    )
+    assert len(search_paths(database, filter_by_sink_filepath="chain.c")) == 2
+    assert search_paths(database, filter_by_sink_filepath=FILEPATH + ".h") == []
+
+
+def test_search_dataflow_paths_by_event(database, actions):
+    action_ids = {
+        path[0]
+        for path in search_paths(
+            database, filter_by_fid=fid_of("mid"), filter_by_variable_name="q"
+        )
+    }
+    assert action_ids == {str(actions["a"].action_id)}
+
+    assert (
+        search_paths(database, filter_by_fid=fid_of("mid"), filter_by_variable_name="p")
+        == []
+    )
+    assert (
+        search_paths(database, filter_by_fid=fid_of("top"), filter_by_step_index=2)
+        == []
+    )
+
+
+def test_search_dataflow_paths_by_callsite(database, actions):
+    assert search_paths(database, filter_by_callsite_name="mid") == [
+        (str(actions["a"].action_id), fid_of("top"), models.OpType.CALL, 1)
+    ]
+    assert search_paths(database, filter_by_callsite_name="memcpy") == (
+        search_paths(database, filter_by_callsite_name="mid")
+    )
+    assert search_paths(database, filter_by_callsite_name="strcpy") == []
+
+
+def test_search_dataflow_paths_only_reads_the_index(database, actions):
+    # as for actions stored before the index existed
+    conn = sqlite3.connect(database.dbpath)
+    conn.execute("UPDATE dataflow_actions SET num_of_paths = NULL")
+    for tbl in ("dataflow_paths", "dataflow_events", "dataflow_path_callsites"):
+        conn.execute(f"DELETE FROM {tbl}")
+    conn.commit()
+    conn.close()
+
+    assert search_paths(database) == []
+    assert database.build_dataflow_paths_index() == 3
+    assert search_paths(database, action_id=actions["a"].action_id) == [
+        (str(actions["a"].action_id), fid_of("top"), models.OpType.CALL, 1)
+    ]
+    assert database.build_dataflow_paths_index() == 0
+
+
+def test_updated_responses_are_indexed(database, actions):
+    df_action = database.create_dataflow_action(actions["a"].request)
+    assert search_paths(database, action_id=df_action.action_id) == []
+
+    database.update_dataflow_action_by_local_id(
+        df_action.action_id,
+        status=models.DataflowActionStatusType.DONE,
+        response_b64=database._encode_dataflow_action_request_to_b64(
+            actions["a"].response
+        ),
+    )
+    assert search_paths(database, action_id=df_action.action_id) == [
+        (str(df_action.action_id), fid_of("top"), models.OpType.CALL, 1)
+    ]
+
+
+def test_get_dataflow_path_loads_the_full_path(database, actions):
+    (summary,) = database.search_dataflow_paths(action_id=actions["a"].action_id)
+    assert summary.sink_filepath == FILEPATH
+    assert summary.sink_variable_name == "y"
+
+    path = database.get_dataflow_path(summary.action_id, summary.path_idx)
+    assert path == actions["a"].response.paths[0]
+    assert len(path.events) == summary.num_of_events
+
+    with pytest.raises(ValueError):
+        database.get_dataflow_path(summary.action_id, 1)
@@ -0,0 +1,71 @@
+import pytest
+
+from eptalights import DatabaseAPI, models
+
+from tests.conftest import fid_of
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+RETURN_SINK = models.SinkSpecModel(op=models.OpType.RETURN)
+
+
+def requests(database) -> list[models.DataflowRequestModel]:
+    return [
+        models.DataflowRequestModel(
+            function=database.get_function_by_id(fid_of(function_name)),
+            source_variable_name=source_variable_name,
+            sink_specs=[MEMCPY_SINK, RETURN_SINK],
+            max_call_depth=2,
+        )
+        for function_name, source_variable_name in (
+            ("top", "a"),
+            ("top", "n"),
+            ("mid", "q"),
+            ("leaf", "l"),
+        )
+    ]
+
+
+def test_runs_match_local_runs_in_request_order(database):
+    df_actions = list(database.dataflow_run_many(requests(database), workers=2))
+
+    assert [df_action.request.function.fid for df_action in df_actions] == [
+        fid_of("top"),
+        fid_of("top"),
+        fid_of("mid"),
+        fid_of("leaf"),
+    ]
+    assert {df_action.status for df_action in df_actions} == {
+        models.DataflowActionStatusType.DONE
+    }
+
+    # the same requests, one at a time in this process
+    local_database = DatabaseAPI(database.dbpath)
+    for df_action, df_request in zip(df_actions, requests(database)):
+        local_action = local_database.dataflow_run_local(
+            df_request, use_cached_response=False
+        )
+        assert df_action.response == local_action.response
+
+
+def test_runs_are_stored_and_reused(database):
+    df_actions = list(database.dataflow_run_many(requests(database), workers=2))
+    assert {df_action.action_id for df_action in database.iter_dataflow_actions()} == {
+        df_action.action_id for df_action in df_actions
+    }
+
+    cached_actions = list(
+        database.dataflow_run_many(requests(database), workers=2, ordered=False)
+    )
+    assert sorted(str(df_action.action_id) for df_action in cached_actions) == sorted(
+        str(df_action.action_id) for df_action in df_actions
+    )
+
+
+def test_requests_must_share_one_sink_callback(database):
+    df_requests = requests(database)
+    df_requests[1] = df_requests[1].model_copy(
+        update={"sink_callback_fn": lambda state: models.SinkResultType.OK}
+    )
+
+    with pytest.raises(ValueError):
+        list(database.dataflow_run_many(df_requests, workers=2))
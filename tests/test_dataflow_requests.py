@@ -0,0 +1,82 @@
+import base64
+
+import dill
+import pytest
+from sqlalchemy import select
+
+from eptalights import DatabaseAPI, models
+from eptalights.core.db import DATAFLOW_REQUEST_REF_KEY, DataflowActionTbl
+
+from tests.conftest import chain_functions, fid_of, return_step, write_functions
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+
+
+@pytest.fixture(params=["full", "sparse"])
+def database(request, tmp_path) -> DatabaseAPI:
+    dbpath = str(tmp_path / "chain.db")
+    functions = chain_functions()
+    if request.param == "sparse":
+        # as the build service writes them, leaving defaults out
+        functions = [
+            function.model_dump(mode="json", exclude_defaults=True)
+            for function in functions
+        ]
+    write_functions(dbpath, functions)
+    return DatabaseAPI(dbpath)
+
+
+def stored_request(database, action_id):
+    with database._db_session() as session:
+        request_b64 = session.execute(
+            select(DataflowActionTbl.dataflow_request_b64).where(
+                DataflowActionTbl.action_id == str(action_id)
+            )
+        ).scalar_one()
+    return dill.loads(base64.b64decode(request_b64))
+
+
+def create_action(database, function):
+    return database.create_dataflow_action(
+        models.DataflowRequestModel(
+            function=function, source_variable_name="a", sink_specs=[MEMCPY_SINK]
+        )
+    )
+
+
+def test_stored_function_is_sent_by_reference(database):
+    function = database.get_function_by_id(fid_of("top"))
+    df_action = create_action(database, function)
+
+    df_request_ref = stored_request(database, df_action.action_id)
+    assert df_request_ref[DATAFLOW_REQUEST_REF_KEY] == {
+        "fid": fid_of("top"),
+        "content_hash": database.get_function_content_hash(fid_of("top")),
+    }
+
+    df_request = database.get_dataflow_action(df_action.action_id).request
+    assert df_request.function == function
+    assert df_request.source_variable_name == "a"
+
+
+def test_modified_function_is_sent_whole(database):
+    function = database.get_function_by_id(fid_of("top")).model_copy(deep=True)
+    function.steps[2] = models.SophiaIRReturnModel(**return_step(2, "a_0"))
+    df_action = create_action(database, function)
+
+    df_request = stored_request(database, df_action.action_id)
+    assert isinstance(df_request, models.DataflowRequestModel)
+    assert df_request.function == function
+
+
+def test_request_on_changed_function_is_dropped(database, tmp_path):
+    df_action = create_action(database, database.get_function_by_id(fid_of("top")))
+
+    (top,) = [function for function in chain_functions() if function.name == "top"]
+    top.steps = top.steps[:2]
+    write_functions(database.dbpath, [top])
+
+    assert (
+        DatabaseAPI(database.dbpath).get_dataflow_action(df_action.action_id).request
+        is None
+    )
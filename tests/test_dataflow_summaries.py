@@ -0,0 +1,112 @@
+import time
+
+from eptalights import DatabaseAPI, models
+from eptalights.core import db as eptalights_db
+from eptalights.core.dataflow_engine import LocalDataflowEngine
+
+from tests.conftest import fid_of, make_function, return_step, write_functions
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+
+
+def test_summaries_are_stored_and_reused(database, monkeypatch):
+    summary = database.get_function_dataflow_summary(fid_of("mid"))
+    assert summary.complete
+    assert summary.params_to_return == [1]
+    assert summary.params_to_calls == {1: ["leaf"]}
+
+    def summarize_function_dataflow(*args, **kwargs):
+        raise AssertionError("summary computed again")
+
+    monkeypatch.setattr(
+        eptalights_db, "summarize_function_dataflow", summarize_function_dataflow
+    )
+    assert database.get_function_dataflow_summary(fid_of("mid")) == summary
+    assert (
+        DatabaseAPI(database.dbpath).get_function_dataflow_summary(fid_of("mid"))
+        == summary
+    )
+
+
+def test_summaries_follow_function_changes(dbpath):
+    summary = DatabaseAPI(dbpath).get_function_dataflow_summary(fid_of("mid"))
+    assert summary.params_to_return == [1]
+
+    # mid now returns p instead
+    write_functions(dbpath, [make_function("mid", ["p", "q"], [return_step(0, "p_0")])])
+
+    database = DatabaseAPI(dbpath)
+    changed_summary = database.get_function_dataflow_summary(fid_of("mid"))
+    assert changed_summary.content_hash != summary.content_hash
+    assert changed_summary.params_to_return == [0]
+    assert changed_summary.params_to_calls == {}
+
+
+def test_summaries_out_of_their_own_time_are_stored(database, monkeypatch):
+    summarize_function_dataflow = eptalights_db.summarize_function_dataflow
+
+    def summarize_without_time(function, content_hash, deadline=None):
+        return summarize_function_dataflow(
+            function, content_hash, timeout_secs=0, deadline=deadline
+        )
+
+    monkeypatch.setattr(
+        eptalights_db, "summarize_function_dataflow", summarize_without_time
+    )
+    summary = database.get_function_dataflow_summary(fid_of("mid"))
+    assert not summary.complete
+
+    # it would run out of time again, so it isn't computed again
+    def summarize_again(*args, **kwargs):
+        raise AssertionError("summary computed again")
+
+    monkeypatch.setattr(eptalights_db, "summarize_function_dataflow", summarize_again)
+    assert (
+        DatabaseAPI(database.dbpath).get_function_dataflow_summary(fid_of("mid"))
+        == summary
+    )
+
+
+def test_summaries_cut_short_by_the_request_are_computed_again(database):
+    summary = database.get_function_dataflow_summary(
+        fid_of("mid"), deadline=time.monotonic()
+    )
+    assert not summary.complete
+
+    summary = database.get_function_dataflow_summary(fid_of("mid"))
+    assert summary.complete
+    assert summary.params_to_return == [1]
+
+
+def test_sources_not_found_leave_summaries_complete(database, monkeypatch):
+    def run(self, df_request, deadline=None):
+        return models.DataflowResponseModel(
+            status=False, error_message="Source variable not found"
+        )
+
+    monkeypatch.setattr(LocalDataflowEngine, "run", run)
+    summary = database.get_function_dataflow_summary(fid_of("mid"))
+    assert summary.complete
+    assert summary.params_to_return == []
+    assert summary.params_to_calls == {}
+
+
+def test_local_runs_store_the_summaries_they_use(database, monkeypatch):
+    # past max_call_depth, the call to mid uses its summary
+    df_action = database.dataflow_run_local(
+        models.DataflowRequestModel(
+            function=database.get_function_by_id(fid_of("top")),
+            source_variable_name="a",
+            sink_specs=[MEMCPY_SINK],
+        )
+    )
+    (path,) = df_action.response.paths
+    assert {event.fid for event in path.events} == {fid_of("top")}
+
+    def summarize_function_dataflow(*args, **kwargs):
+        raise AssertionError("summary computed again")
+
+    monkeypatch.setattr(
+        eptalights_db, "summarize_function_dataflow", summarize_function_dataflow
+    )
+    assert database.get_function_dataflow_summary(fid_of("mid")).params_to_return == [1]
@@ -0,0 +1,63 @@
+from eptalights import DatabaseAPI
+from eptalights.core.cache import LRUCache
+
+from tests.conftest import fid_of
+
+
+def test_repeated_lookups_share_the_cached_model(database):
+    function = database.get_function_by_id(fid_of("top"))
+
+    assert database.get_function_by_id(fid_of("top")) is function
+    assert (
+        database.get_functions_by_ids([fid_of("top"), fid_of("mid")])[fid_of("top")]
+        is function
+    )
+    assert database.get_callsite_by_id(f"{fid_of('top')}:mid_0")[0] is function
+
+    stats = database.function_cache_stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 3
+
+
+def test_component_getters_read_cached_models(database):
+    function = database.get_function_by_id(fid_of("top"))
+
+    assert database.get_function_cfg(fid_of("top")) == function.cfg
+    assert database.get_function_steps(fid_of("top"), 1) == function.steps[1:]
+    assert database.get_function_callsites(fid_of("top")) == function.callsite_manager
+
+
+def test_disabled_cache_decodes_every_lookup(dbpath):
+    database = DatabaseAPI(dbpath, function_cache_max_entries=0)
+
+    function = database.get_function_by_id(fid_of("top"))
+    assert database.get_function_by_id(fid_of("top")) is not function
+    assert database.get_function_by_id(fid_of("top")) == function
+    assert database.function_cache_stats()["entries"] == 0
+
+
+def test_cache_is_bounded(dbpath):
+    database = DatabaseAPI(dbpath, function_cache_max_entries=2)
+    database.get_functions_by_ids([fid_of("leaf"), fid_of("mid"), fid_of("top")])
+
+    stats = database.function_cache_stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+
+    database.clear_function_cache()
+    assert database.function_cache_stats()["entries"] == 0
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, max_bytes=10)
+    cache.put("a", 1, size=4)
+    cache.put("b", 2, size=4)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3, size=4)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    cache.put("d", 4, size=9)
+    assert list(cache._entries) == ["d"]
+    assert cache.stats()["bytes"] == 9
@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+
+from eptalights import DatabaseAPI, DatabaseWriter
+
+from tests.conftest import chain_functions, fid_of
+
+
+def execute(dbpath: str, sql: str) -> list[tuple]:
+    conn = sqlite3.connect(dbpath)
+    try:
+        rows = conn.execute(sql).fetchall()
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+
+def uncached(dbpath) -> DatabaseAPI:
+    return DatabaseAPI(dbpath, function_cache_max_entries=0)
+
+
+def components(database, fid) -> tuple:
+    return (
+        database.get_function_cfg(fid),
+        database.get_function_variables(fid),
+        database.get_function_callsites(fid),
+        database.get_function_steps(fid),
+    )
+
+
+def expected_components(fid) -> tuple:
+    (function,) = [function for function in chain_functions() if function.fid == fid]
+    return (
+        function.cfg,
+        function.variable_manager,
+        function.callsite_manager,
+        function.steps,
+    )
+
+
+def test_components_are_read_without_function_data(tmp_path):
+    dbpath = str(tmp_path / "chain.db")
+    with DatabaseWriter(dbpath, with_components=True) as writer:
+        writer.add_functions(chain_functions())
+
+    # only the components can answer now
+    execute(dbpath, "UPDATE functions SET function_data = X'C0'")
+    database = uncached(dbpath)
+    for name in ("leaf", "mid", "top"):
+        assert components(database, fid_of(name)) == expected_components(fid_of(name))
+
+
+def test_steps_are_sliced_without_decoding_the_rest(tmp_path):
+    dbpath = str(tmp_path / "chain.db")
+    with DatabaseWriter(dbpath, with_components=True) as writer:
+        writer.add_functions(chain_functions())
+    database = uncached(dbpath)
+    steps = expected_components(fid_of("top"))[3]
+
+    assert database.get_function_steps(fid_of("top"), 1) == steps[1:]
+    assert database.get_function_steps(fid_of("top"), 0, 2) == steps[:2]
+    assert database.get_function_steps(fid_of("top"), -1) == steps[-1:]
+    assert database.get_function_steps(fid_of("top"), 5) == []
+
+
+def test_components_fall_back_to_function_data(dbpath):
+    database = uncached(dbpath)
+    assert execute(dbpath, "SELECT count(*) FROM function_components") == [(0,)]
+    assert components(database, fid_of("top")) == expected_components(fid_of("top"))
+
+    assert database.build_function_components() == 3
+    assert database.build_function_components() == 0
+    assert components(database, fid_of("top")) == expected_components(fid_of("top"))
+
+
+def test_stale_components_are_ignored_and_split_again(dbpath):
+    database = uncached(dbpath)
+    database.build_function_components()
+
+    # as if top was rewritten since its components were split
+    execute(
+        dbpath, f"UPDATE functions SET content_hash = 'x' WHERE fid = '{fid_of('top')}'"
+    )
+    execute(
+        dbpath,
+        "UPDATE function_components SET cfg = X'C0', steps = X'90' "
+        f"WHERE fid = '{fid_of('top')}'",
+    )
+    assert components(database, fid_of("top")) == expected_components(fid_of("top"))
+
+    assert database.build_function_components() == 1
+    assert components(database, fid_of("top")) == expected_components(fid_of("top"))
+
+
+def test_unknown_function_is_rejected(database):
+    with pytest.raises(ValueError):
+        database.get_function_steps("/src/chain.c:missing#1")
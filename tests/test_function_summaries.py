@@ -0,0 +1,68 @@
+import sqlite3
+
+from eptalights import DatabaseAPI
+
+from tests.conftest import fid_of
+
+
+def summaries(database, **filters) -> dict:
+    return {
+        summary.name: summary
+        for summary in database.search_function_summaries(**filters)
+    }
+
+
+def drop_summaries(dbpath):
+    # as in a downloaded build not indexed yet
+    conn = sqlite3.connect(dbpath)
+    conn.execute("UPDATE functions SET num_of_steps = NULL, content_hash = NULL")
+    conn.commit()
+    conn.close()
+
+
+def test_summaries_are_read_from_the_summary_columns(database):
+    summary = summaries(database)["top"]
+
+    assert summary.fid == fid_of("top")
+    assert summary.filepath == "/src/chain.c"
+    assert (summary.num_of_steps, summary.num_of_callsites) == (3, 2)
+    assert (summary.lineno_start, summary.lineno_end) == (1, 3)
+    assert summary.content_hash == database.get_function_content_hash(fid_of("top"))
+
+    assert sorted(summaries(database, filter_by_min_steps=2)) == ["mid", "top"]
+    assert sorted(summaries(database, filter_by_name="to")) == ["top"]
+
+
+def test_missing_summaries_are_computed_without_writing(dbpath):
+    expected = summaries(DatabaseAPI(dbpath))
+    drop_summaries(dbpath)
+
+    database = DatabaseAPI(dbpath)
+    computed = summaries(database)
+    assert computed.keys() == expected.keys()
+    for name, summary in computed.items():
+        # hashing validates every step, listings leave it out
+        assert summary.content_hash is None
+        assert summary == expected[name].model_copy(update={"content_hash": None})
+
+    assert sorted(summaries(database, filter_by_min_steps=2)) == ["mid", "top"]
+    assert database.get_function_content_hash(fid_of("top")) == (
+        expected["top"].content_hash
+    )
+
+    conn = sqlite3.connect(dbpath)
+    assert conn.execute(
+        "SELECT count(*) FROM functions WHERE num_of_steps IS NULL"
+    ).fetchone() == (3,)
+    conn.close()
+
+
+def test_build_function_summaries_fills_missing_ones(dbpath):
+    expected = summaries(DatabaseAPI(dbpath))
+    drop_summaries(dbpath)
+
+    database = DatabaseAPI(dbpath)
+    assert database.build_function_summaries() == 3
+    assert database.build_function_summaries() == 0
+    assert summaries(database) == expected
+    assert database.build_function_summaries(rebuild=True) == 3
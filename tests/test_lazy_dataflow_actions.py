@@ -0,0 +1,84 @@
+import pytest
+
+from eptalights import models
+from eptalights.core.lazy import LazyDataflowActionModel
+
+from tests.conftest import fid_of
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+
+
+def run_local(database, **options) -> models.DataflowActionModel:
+    return database.dataflow_run_local(
+        models.DataflowRequestModel(
+            function=database.get_function_by_id(fid_of("top")),
+            source_variable_name="a",
+            sink_specs=[MEMCPY_SINK],
+        ),
+        **options,
+    )
+
+
+def counting_decodes(database, monkeypatch) -> list:
+    decoded = []
+    decode = database._decode_dataflow_action_request_from_b64
+
+    def counting_decode(b64_str):
+        decoded.append(b64_str)
+        return decode(b64_str)
+
+    monkeypatch.setattr(
+        database, "_decode_dataflow_action_request_from_b64", counting_decode
+    )
+    return decoded
+
+
+def test_lazy_action_decodes_on_first_access(database, monkeypatch):
+    df_action = run_local(database)
+    decoded = counting_decodes(database, monkeypatch)
+
+    lazy_action = database.get_dataflow_action(df_action.action_id, lazy=True)
+    assert isinstance(lazy_action, LazyDataflowActionModel)
+    assert (lazy_action.action_id, lazy_action.status) == (
+        df_action.action_id,
+        models.DataflowActionStatusType.DONE,
+    )
+    assert not lazy_action.is_loaded
+    assert decoded == []
+
+    assert lazy_action.response == df_action.response
+    assert decoded == [lazy_action.response_b64]
+    assert lazy_action.request.source_variable_name == "a"
+    assert lazy_action.is_loaded
+    assert lazy_action.response is lazy_action.response
+    assert len(decoded) == 2
+
+    assert lazy_action.model == database.get_dataflow_action(df_action.action_id)
+
+
+def test_lazy_iteration_decodes_nothing(database, monkeypatch):
+    df_actions = [run_local(database, use_cached_response=False) for _ in range(3)]
+    decoded = counting_decodes(database, monkeypatch)
+
+    lazy_actions = list(database.iter_dataflow_actions(lazy=True))
+    assert sorted(str(df_action.action_id) for df_action in lazy_actions) == sorted(
+        str(df_action.action_id) for df_action in df_actions
+    )
+    assert decoded == []
+    assert [df_action.model for df_action in lazy_actions] == list(
+        database.iter_dataflow_actions()
+    )
+
+
+def test_lazy_read_still_deletes_after_read(database):
+    df_action = database.create_dataflow_action(
+        run_local(database).request, delete_after_read=True
+    )
+    database.update_dataflow_action_by_local_id(
+        df_action.action_id, status=models.DataflowActionStatusType.DONE
+    )
+
+    lazy_action = database.get_dataflow_action(df_action.action_id, lazy=True)
+    assert lazy_action.response == df_action.response
+    with pytest.raises(ValueError):
+        database.get_dataflow_action(df_action.action_id, lazy=True)
@@ -0,0 +1,50 @@
+import copy
+
+from eptalights.core.lazy import LazyCallsiteModel, LazyFunctionModel
+
+from tests.conftest import FILEPATH, fid_of
+
+
+def test_lazy_functions_load_on_first_access(database):
+    functions = {
+        function.name: function
+        for function in database.search_functions(filter_by_filepath="chain", lazy=True)
+    }
+    top = functions["top"]
+
+    assert isinstance(top, LazyFunctionModel)
+    assert (top.fid, top.filepath, top.class_name) == (fid_of("top"), FILEPATH, None)
+    assert not top.is_loaded
+
+    # copying reads no attributes through the model
+    copy.copy(top)
+    assert not top.is_loaded
+
+    assert [step.step_index for step in top.steps] == [0, 1, 2]
+    assert top.is_loaded
+    assert top.model == database.get_function_by_id(fid_of("top"))
+
+
+def test_lazy_functions_by_filepath(database):
+    functions = list(database.get_functions_by_filepath(FILEPATH, lazy=True))
+
+    assert sorted(function.name for function in functions) == ["leaf", "mid", "top"]
+    assert not any(function.is_loaded for function in functions)
+    assert list(database.get_functions_by_filepath("/src/other.c", lazy=True)) == []
+
+
+def test_lazy_callsites_resolve_from_their_function(database):
+    callsites = {
+        callsite.name: (function, callsite)
+        for function, callsite in database.search_callsites(lazy=True)
+    }
+    function, callsite = callsites["memcpy"]
+
+    assert isinstance(callsite, LazyCallsiteModel)
+    assert (callsite.ssa_name, callsite.num_of_args) == ("memcpy_1", 2)
+    assert callsite.function is function
+    assert not function.is_loaded
+
+    assert callsite.step_index == 1
+    assert function.is_loaded
+    assert callsite.model is function.callsite_manager.callsites["memcpy_1"]
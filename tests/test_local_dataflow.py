@@ -0,0 +1,100 @@
+import pytest
+
+from eptalights import models
+from eptalights.core.dataflow_engine import LocalDataflowEngine
+
+from tests.conftest import chain_functions, fid_of
+
+MEMCPY_SINK = models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})
+
+
+@pytest.fixture
+def top() -> models.FunctionModel:
+    (top,) = [function for function in chain_functions() if function.name == "top"]
+    return top
+
+
+def run(function, source_variable_name, **options) -> models.DataflowResponseModel:
+    return LocalDataflowEngine().run(
+        models.DataflowRequestModel(
+            function=function,
+            source_variable_name=source_variable_name,
+            sink_specs=[MEMCPY_SINK],
+            **options,
+        )
+    )
+
+
+def test_unresolved_calls_pass_arguments_to_destination(top):
+    # without resolvers, mid is opaque and both of its arguments reach y
+    for source_variable_name in ("n", "a"):
+        (path,) = run(top, source_variable_name).paths
+        assert [
+            (event.variable_name, event.step_index, event.data_direction)
+            for event in path.events
+        ] == [
+            (source_variable_name, 0, "read"),
+            ("y", 0, "write"),
+            ("y", 1, "read"),
+        ]
+        assert path.passthru_callsites == [
+            f"{fid_of('top')}:mid_0",
+            f"{fid_of('top')}:memcpy_1",
+        ]
+
+
+def test_start_from_step_index(top):
+    assert len(run(top, "y", start_from_step_index=0).paths) == 1
+    assert len(run(top, "y", start_from_step_index=1).paths) == 1
+    # memcpy comes before the return
+    assert run(top, "y", start_from_step_index=2).paths == []
+
+
+def test_failed_runs_report_why(top):
+    df_response = run(top, "missing")
+    assert not df_response.status
+    assert df_response.error_message == "Source variable missing not found"
+
+    df_response = run(top, "a", timeout_secs=0)
+    assert not df_response.status
+    assert "timed out" in df_response.error_message
+
+
+def run_local(database, function_name, source_variable_name, sink_specs):
+    df_action = database.dataflow_run_local(
+        models.DataflowRequestModel(
+            function=database.get_function_by_id(fid_of(function_name)),
+            source_variable_name=source_variable_name,
+            sink_specs=sink_specs,
+            max_call_depth=2,
+        )
+    )
+    assert df_action.response.status
+    return df_action
+
+
+def test_local_runs_leave_no_pending_action(database, monkeypatch):
+    run_local_dataflow_engine = database._run_local_dataflow_engine
+
+    def crash(*args, **kwargs):
+        # nothing for dataflow_update to send while the engine runs
+        assert not list(
+            database.iter_dataflow_actions(
+                status=models.DataflowActionStatusType.LOCAL_PENDING
+            )
+        )
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(database, "_run_local_dataflow_engine", crash)
+    with pytest.raises(KeyboardInterrupt):
+        run_local(database, "top", "a", [MEMCPY_SINK])
+    assert not list(database.iter_dataflow_actions())
+
+    monkeypatch.setattr(
+        database, "_run_local_dataflow_engine", run_local_dataflow_engine
+    )
+    df_action = run_local(database, "top", "a", [MEMCPY_SINK])
+    assert [action.action_id for action in database.iter_dataflow_actions()] == [
+        df_action.action_id
+    ]
+    assert df_action.status == models.DataflowActionStatusType.DONE
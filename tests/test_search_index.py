@@ -0,0 +1,110 @@
+import sqlite3
+
+import pytest
+
+from eptalights import DatabaseAPI, models
+
+from tests.conftest import call_step, fid_of, make_function, write_functions
+
+
+def function_names(functions) -> list[str]:
+    return sorted(function.name for function in functions)
+
+
+def callsite_names(callsites) -> list[str]:
+    return sorted(callsite.fn_name[0] for _, callsite in callsites)
+
+
+def write_without_index(dbpath, functions, monkeypatch):
+    # as when sqlite lacks FTS5, the writer leaves the index as it was
+    with monkeypatch.context() as patch:
+        patch.setattr(DatabaseAPI, "build_search_index", lambda self: None)
+        write_functions(dbpath, functions)
+
+
+@pytest.fixture
+def unindexed_database(dbpath) -> DatabaseAPI:
+    conn = sqlite3.connect(dbpath)
+    conn.execute("DROP TABLE search_index_state")
+    conn.close()
+    return DatabaseAPI(dbpath)
+
+
+def test_searches_match_with_and_without_the_index(unindexed_database):
+    database = unindexed_database
+
+    def searches():
+        return (
+            function_names(database.search_functions("i", lazy=True)),
+            function_names(database.search_functions("eaf", lazy=True)),
+            function_names(
+                database.search_functions("to", lazy=True, match_type="prefix")
+            ),
+            function_names(
+                database.search_functions(
+                    "*i?", lazy=True, match_type=models.SearchMatchType.GLOB
+                )
+            ),
+            callsite_names(database.search_callsites("e", lazy=True)),
+            callsite_names(database.search_callsites("mcp", lazy=True)),
+        )
+
+    assert not database._has_search_index()
+    expected = searches()
+    assert expected == (
+        ["mid"],
+        ["leaf"],
+        ["top"],
+        ["mid"],
+        ["leaf", "memcpy"],
+        ["memcpy"],
+    )
+
+    database.build_search_index()
+    assert database._has_search_index()
+    assert searches() == expected
+
+
+def test_index_is_stale_after_writes(dbpath, monkeypatch):
+    database = DatabaseAPI(dbpath)
+    assert database._has_search_index()
+
+    write_without_index(
+        dbpath,
+        [make_function("bottom", ["b"], [call_step(0, "leaf", ["b_0"])])],
+        monkeypatch,
+    )
+    assert not database._has_search_index()
+    assert function_names(database.search_functions("bot", lazy=True)) == ["bottom"]
+
+    database.build_search_index()
+    assert database._has_search_index()
+    assert function_names(database.search_functions("bot", lazy=True)) == ["bottom"]
+
+
+def test_index_is_stale_after_replacing_a_function(dbpath, monkeypatch):
+    database = DatabaseAPI(dbpath)
+    assert database._has_search_index()
+
+    # as many functions and callsites as before
+    write_without_index(
+        dbpath,
+        [make_function("mid", ["p", "q"], [call_step(0, "free", ["q_0"])])],
+        monkeypatch,
+    )
+    assert not database._has_search_index()
+    assert callsite_names(database.search_callsites("fre", lazy=True)) == ["free"]
+
+
+def test_index_check_is_kept_until_tables_change(database, monkeypatch):
+    assert database._has_search_index()
+
+    def check_search_index():
+        raise AssertionError("search index checked again")
+
+    monkeypatch.setattr(database, "_check_search_index", check_search_index)
+    assert database._has_search_index()
+    assert function_names(database.search_functions("to", lazy=True)) == ["top"]
+    assert fid_of("top") in {
+        function.fid for function in database.search_functions("top", lazy=True)
+    }
@@ -0,0 +1,127 @@
+import pytest
+
+from eptalights import models
+from eptalights.core.dataflow_engine import LocalDataflowEngine, SinkMatcher
+
+from tests.conftest import call_step, chain_functions, fid_of, make_function
+
+
+def _call_event(step, ssa_name, data_direction="read"):
+    return models.DataflowEventModel(
+        op=models.OpType.CALL,
+        lineno=step.lineno,
+        variable_name=ssa_name.rsplit("_", 1)[0],
+        ssa_variable_name=ssa_name,
+        ssa_version=int(ssa_name.rsplit("_", 1)[1]),
+        data_direction=data_direction,
+        var_depth_pos=0,
+        step_index=step.step_index,
+    )
+
+
+@pytest.fixture
+def memcpy_step():
+    function = make_function("f", [], [call_step(0, "memcpy", ["d_0", "s_0", "n_0"])])
+    return function.steps[0]
+
+
+def test_sink_matcher_first_matching_spec_wins(memcpy_step):
+    sink_matcher = SinkMatcher(
+        [
+            models.SinkSpecModel(
+                op=models.OpType.CALL,
+                fnames={"memcpy"},
+                result=models.SinkResultType.STOP,
+            ),
+            models.SinkSpecModel(op=models.OpType.CALL),
+        ]
+    )
+    assert (
+        sink_matcher.match(_call_event(memcpy_step, "s_0"), memcpy_step)
+        == models.SinkResultType.STOP
+    )
+
+    sink_matcher = SinkMatcher(
+        [
+            models.SinkSpecModel(op=models.OpType.CALL),
+            models.SinkSpecModel(
+                op=models.OpType.CALL,
+                fnames={"memcpy"},
+                result=models.SinkResultType.STOP,
+            ),
+        ]
+    )
+    assert (
+        sink_matcher.match(_call_event(memcpy_step, "s_0"), memcpy_step)
+        == models.SinkResultType.OK
+    )
+
+
+def test_sink_matcher_skips_non_matching_specs(memcpy_step):
+    sink_matcher = SinkMatcher(
+        [
+            models.SinkSpecModel(op=models.OpType.RETURN),
+            models.SinkSpecModel(op=models.OpType.CALL, fnames={"strcpy"}),
+            models.SinkSpecModel(
+                op=models.OpType.CALL, fnames={"memcpy"}, data_direction="write"
+            ),
+            models.SinkSpecModel(
+                op=models.OpType.CALL,
+                fnames={"memcpy"},
+                arg_indexes={2},
+                result=models.SinkResultType.CONTINUE,
+            ),
+        ]
+    )
+
+    assert (
+        sink_matcher.match(_call_event(memcpy_step, "n_0"), memcpy_step)
+        == models.SinkResultType.CONTINUE
+    )
+    assert sink_matcher.match(_call_event(memcpy_step, "s_0"), memcpy_step) is None
+    assert (
+        sink_matcher.match(_call_event(memcpy_step, "s_0", "write"), memcpy_step)
+        == models.SinkResultType.OK
+    )
+
+
+def run_top(source_variable_name, sink_specs, sink_callback_fn=None):
+    (top,) = [function for function in chain_functions() if function.name == "top"]
+    df_response = LocalDataflowEngine().run(
+        models.DataflowRequestModel(
+            function=top,
+            source_variable_name=source_variable_name,
+            sink_specs=sink_specs,
+            sink_callback_fn=sink_callback_fn,
+        )
+    )
+    assert df_response.status
+    return df_response.paths
+
+
+def test_specs_decide_before_the_callback():
+    seen = []
+
+    def sink_callback_fn(state):
+        seen.append(state.current_step.step_index)
+        return models.SinkResultType.CONTINUE
+
+    (path,) = run_top(
+        "a",
+        [models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"})],
+        sink_callback_fn,
+    )
+    assert (path.events[-1].fid, path.events[-1].step_index) == (fid_of("top"), 1)
+    # the memcpy event was matched by its spec
+    assert 1 not in seen and 0 in seen
+
+
+def test_stop_spec_abandons_the_path():
+    sink_specs = [
+        models.SinkSpecModel(
+            op=models.OpType.CALL, fnames={"mid"}, result=models.SinkResultType.STOP
+        ),
+        models.SinkSpecModel(op=models.OpType.CALL, fnames={"memcpy"}),
+    ]
+    assert run_top("a", sink_specs) == []
+    assert len(run_top("a", sink_specs[1:])) == 1
@@ -0,0 +1,91 @@
+import pytest
+
+from eptalights import DatabaseAPI, DatabaseWriter
+
+from tests.conftest import chain_functions, fid_of
+
+
+def steps(database, **filters) -> list[tuple]:
+    return [(step.fid, step.step_index) for step in database.search_steps(**filters)]
+
+
+def test_steps_index_must_be_built(database):
+    with pytest.raises(ValueError):
+        list(database.search_steps())
+
+    assert database.build_steps_index() == 3
+    assert database.build_steps_index() == 0
+    assert database.build_steps_index(rebuild=True) == 3
+    assert len(steps(database)) == 6
+
+
+def test_step_summaries_match_the_functions(database):
+    database.build_steps_index()
+
+    expected = [
+        (function.fid, step.step_index, step.op.value, step.lineno)
+        for function in chain_functions()
+        for step in function.steps
+    ]
+    assert [
+        (step.fid, step.step_index, step.op.value, step.lineno)
+        for step in database.search_steps()
+    ] == expected
+
+    (memcpy,) = database.search_steps(filter_by_fname="memcpy")
+    assert (memcpy.fid, memcpy.step_index, memcpy.num_of_args) == (fid_of("top"), 1, 2)
+    assert [
+        (arg.arg_index, arg.ssa_name, arg.variable_name, arg.value)
+        for arg in memcpy.args
+    ] == [(0, "buf_0", "buf", "buf_0"), (1, "y_1", "y", "y_1")]
+    assert [arg.token_types for arg in memcpy.args] == [["IS_VARIABLE"]] * 2
+
+
+def test_step_filters(database):
+    database.build_steps_index()
+
+    assert steps(database, filter_by_op="return") == [
+        (fid_of("leaf"), 0),
+        (fid_of("mid"), 1),
+        (fid_of("top"), 2),
+    ]
+    assert steps(database, filter_by_fid=fid_of("top"), filter_by_op="call") == [
+        (fid_of("top"), 0),
+        (fid_of("top"), 1),
+    ]
+    assert steps(database, filter_by_num_of_args=1) == [(fid_of("mid"), 0)]
+
+    assert steps(database, filter_by_fname="m") == []
+    assert steps(database, filter_by_fname="m", match_type="prefix") == [
+        (fid_of("top"), 0),
+        (fid_of("top"), 1),
+    ]
+
+
+def test_arg_filters_hold_for_the_same_argument(database):
+    database.build_steps_index()
+
+    assert steps(database, filter_by_arg_variable_name="y") == [(fid_of("top"), 1)]
+    assert steps(database, filter_by_arg_index=1, filter_by_arg_variable_name="y") == [
+        (fid_of("top"), 1)
+    ]
+    assert steps(database, filter_by_arg_index=0, filter_by_arg_variable_name="y") == []
+
+    assert steps(database, filter_by_arg_value="_1", match_type="substring") == [
+        (fid_of("top"), 1)
+    ]
+    assert steps(
+        database, filter_by_arg_token_type="is_variable", filter_by_arg_index=1
+    ) == [(fid_of("top"), 0), (fid_of("top"), 1)]
+
+
+def test_writer_and_batch_size_give_the_same_index(dbpath, tmp_path):
+    database = DatabaseAPI(dbpath)
+    database.build_steps_index()
+    expected = list(database.search_steps())
+
+    written_dbpath = str(tmp_path / "written.db")
+    with DatabaseWriter(written_dbpath, with_steps_index=True) as writer:
+        writer.add_functions(chain_functions())
+    assert list(DatabaseAPI(written_dbpath).search_steps()) == expected
+    assert list(DatabaseAPI(dbpath, stream_batch_size=1).search_steps()) == expected
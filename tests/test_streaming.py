@@ -0,0 +1,38 @@
+from eptalights import DatabaseAPI
+
+
+def searches(database) -> tuple:
+    return (
+        [function.fid for function in database.search_functions()],
+        [summary.fid for summary in database.search_function_summaries()],
+        [
+            (function.fid, callsite.cid)
+            for function, callsite in database.search_callsites()
+        ],
+    )
+
+
+def test_batch_size_does_not_change_results(dbpath):
+    expected = searches(DatabaseAPI(dbpath))
+
+    assert len(expected[0]) == 3 and len(expected[2]) == 3
+    assert searches(DatabaseAPI(dbpath, stream_batch_size=1)) == expected
+
+
+def test_connection_is_released_when_the_consumer_stops(dbpath):
+    database = DatabaseAPI(dbpath, stream_batch_size=1)
+    pool = database._db_engine.pool
+
+    functions = database.search_functions(lazy=True)
+    next(functions)
+    assert pool.checkedout() == 1
+
+    functions.close()
+    assert pool.checkedout() == 0
+
+    for _ in database.search_callsites(lazy=True):
+        break
+    assert pool.checkedout() == 0
+
+    assert len(list(database.search_function_summaries())) == 3
+    assert pool.checkedout() == 0
@@ -0,0 +1,51 @@
+import pytest
+
+from eptalights import DatabaseAPI, models
+
+from tests.conftest import chain_functions, fid_of
+
+
+@pytest.mark.parametrize("mode", ["python", "json"])
+def test_trusted_decode_matches_validation(mode):
+    for function in chain_functions():
+        data = function.model_dump(mode=mode)
+
+        trusted = models.FunctionModel.model_validate_trusted(data)
+        validated = models.FunctionModel.model_validate(data)
+        assert trusted == validated
+        assert [type(step) for step in trusted.steps] == [
+            type(step) for step in validated.steps
+        ]
+
+
+def test_trusted_decode_marks_steps_set_as_validation_does():
+    (top,) = [function for function in chain_functions() if function.name == "top"]
+
+    for data in (
+        top.model_dump(exclude_unset=True),
+        top.model_dump(exclude_unset=True, exclude={"steps"}),
+    ):
+        trusted = models.FunctionModel.model_validate_trusted(data)
+        validated = models.FunctionModel.model_validate(data)
+        assert trusted.model_fields_set == validated.model_fields_set
+        assert trusted.model_dump(exclude_unset=True) == validated.model_dump(
+            exclude_unset=True
+        )
+
+
+def test_trusted_decode_rejects_unknown_ops():
+    data = chain_functions()[0].model_dump()
+    data["steps"][0]["op"] = "JUMP"
+
+    with pytest.raises(Exception):
+        models.FunctionModel.model_validate_trusted(data)
+
+
+def test_databases_decode_the_same_either_way(dbpath):
+    trusted = DatabaseAPI(dbpath, trusted=True)
+    validated = DatabaseAPI(dbpath, trusted=False)
+
+    for name in ("leaf", "mid", "top"):
+        assert trusted.get_function_by_id(fid_of(name)) == (
+            validated.get_function_by_id(fid_of(name))
+        )
@@ -0,0 +1,102 @@
+import pytest
+
+from eptalights import DatabaseAPI, DatabaseWriter, models
+
+from tests.conftest import chain_functions, fid_of
+
+
+def variables(database, **filters) -> list[tuple]:
+    return sorted(
+        (variable.fid, variable.name)
+        for variable in database.search_variable_summaries(**filters)
+    )
+
+
+def test_variables_index_must_be_built(database):
+    with pytest.raises(ValueError):
+        list(database.search_variable_summaries())
+
+    # counted from the function summaries until then
+    assert database.get_total_variables() == 8
+
+    assert database.build_variables_index() == 3
+    assert database.build_variables_index() == 0
+    assert database.build_variables_index(rebuild=True) == 3
+    assert database.get_total_variables() == 8
+
+
+def test_variable_summaries_match_the_functions(database):
+    database.build_variables_index()
+
+    expected = sorted(
+        (
+            function.fid,
+            name,
+            function.filepath,
+            variable.vartype,
+            variable.type_declaration,
+            variable.full_declaration,
+            len(variable.unique_ssa_variables),
+        )
+        for function in chain_functions()
+        for name, variable in function.variable_manager.variables.items()
+    )
+    assert (
+        sorted(
+            (
+                variable.fid,
+                variable.name,
+                variable.filepath,
+                variable.vartype,
+                variable.type_declaration,
+                variable.full_declaration,
+                variable.num_of_ssa_versions,
+            )
+            for variable in database.search_variable_summaries()
+        )
+        == expected
+    )
+
+
+def test_variable_filters(database):
+    database.build_variables_index()
+
+    assert variables(database, filter_by_name="y") == [(fid_of("top"), "y")]
+    assert variables(database, filter_by_name="b") == []
+    assert variables(database, filter_by_name="b", match_type="prefix") == [
+        (fid_of("top"), "buf")
+    ]
+    assert variables(database, filter_by_full_decl="int t") == [(fid_of("mid"), "t")]
+    assert len(variables(database, filter_by_filepath="chain")) == 8
+    assert variables(database, filter_by_filepath="other.c") == []
+
+    assert variables(database, is_local_var=True) == [
+        (fid_of("mid"), "t"),
+        (fid_of("top"), "buf"),
+        (fid_of("top"), "y"),
+    ]
+    assert len(variables(database, is_farg=True)) == 5
+    assert len(variables(database, is_farg=True, is_local_var=True)) == 8
+    assert variables(database, is_tmp=True) == []
+
+
+def test_search_variables_returns_the_function_variables(database):
+    database.build_variables_index()
+
+    results = list(database.search_variables(filter_by_type_decl="int", is_farg=True))
+    assert len(results) == 5
+    for function, variable in results:
+        assert variable.vartype == models.VarType.FUNCTION_ARGUMENT
+        assert function.variable_manager.variables[variable.name] == variable
+
+
+def test_writer_builds_the_same_index(dbpath, tmp_path):
+    database = DatabaseAPI(dbpath)
+    database.build_variables_index()
+
+    written_dbpath = str(tmp_path / "written.db")
+    with DatabaseWriter(written_dbpath, with_variables_index=True) as writer:
+        writer.add_functions(chain_functions())
+    assert list(DatabaseAPI(written_dbpath).search_variable_summaries()) == list(
+        database.search_variable_summaries()
+    )
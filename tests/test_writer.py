@@ -0,0 +1,103 @@
+import sqlite3
+
+from eptalights import DatabaseAPI, DatabaseWriter
+
+from tests.conftest import call_step, chain_functions, fid_of, make_function
+from tests.conftest import return_step
+
+
+def rows(dbpath: str, sql: str) -> list[tuple]:
+    conn = sqlite3.connect(dbpath)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def new_mid():
+    # calls free instead of leaf, with other variables
+    return make_function(
+        "mid",
+        ["p", "q"],
+        [call_step(0, "free", ["p_0"], dst="u_1"), return_step(1, "u_1")],
+    )
+
+
+def write(dbpath, functions, **options):
+    with DatabaseWriter(dbpath, batch_size=2, **options) as writer:
+        writer.add_functions(functions)
+    return writer.stats()
+
+
+def derived_rows(dbpath, fid):
+    return {
+        tbl: rows(dbpath, f"SELECT * FROM {tbl} WHERE fid = '{fid}' ORDER BY 1, 2")
+        for tbl in ("callsites", "function_components", "steps", "variables")
+    }
+
+
+INDEX_OPTIONS = dict(
+    with_components=True, with_steps_index=True, with_variables_index=True
+)
+
+
+def test_writes_functions_and_callsites(tmp_path):
+    dbpath = str(tmp_path / "chain.db")
+    stats = write(dbpath, chain_functions())
+
+    assert stats["rows"]["functions"] == 3
+    assert stats["rows"]["callsites"] == 3
+    database = DatabaseAPI(dbpath)
+    assert database.get_function_by_id(fid_of("top")) == chain_functions()[2]
+    assert sorted(
+        callsite.fn_name[0] for _, callsite in database.search_callsites()
+    ) == ["leaf", "memcpy", "mid"]
+
+
+def test_replacing_a_function_replaces_its_rows(tmp_path):
+    dbpath = str(tmp_path / "chain.db")
+    write(dbpath, chain_functions(), **INDEX_OPTIONS)
+    DatabaseAPI(dbpath).get_callgraph()
+
+    write(dbpath, [new_mid()], **INDEX_OPTIONS)
+
+    expected_dbpath = str(tmp_path / "expected.db")
+    write(expected_dbpath, [new_mid()], **INDEX_OPTIONS)
+    assert derived_rows(dbpath, fid_of("mid")) == derived_rows(
+        expected_dbpath, fid_of("mid")
+    )
+    assert rows(dbpath, "SELECT count(*) FROM callgraph") == [(0,)]
+    assert rows(dbpath, "SELECT count(*) FROM callsites") == [(3,)]
+
+
+def test_adding_a_function_twice_keeps_the_last(tmp_path):
+    dbpath = str(tmp_path / "chain.db")
+    functions = chain_functions()
+    write(dbpath, [functions[1], *functions, new_mid()], **INDEX_OPTIONS)
+
+    expected_dbpath = str(tmp_path / "expected.db")
+    write(expected_dbpath, [functions[0], functions[2], new_mid()], **INDEX_OPTIONS)
+    for fid in (fid_of("leaf"), fid_of("mid"), fid_of("top")):
+        assert derived_rows(dbpath, fid) == derived_rows(expected_dbpath, fid)
+
+
+def test_close_without_commit_discards_rows(tmp_path):
+    dbpath = str(tmp_path / "chain.db")
+    writer = DatabaseWriter(dbpath)
+    writer.add_functions(chain_functions())
+    writer.close(commit=False)
+
+    assert DatabaseAPI(dbpath).get_total_functions() == 0
+
+
+def test_deferred_indexes_are_created_on_close(tmp_path):
+    dbpath = str(tmp_path / "chain.db")
+    write(dbpath, chain_functions())
+
+    indexes = {
+        name
+        for (name,) in rows(
+            dbpath, "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )
+    }
+    assert {"ix_callsites_fid", "ix_callsites_name", "ix_functions_name"} <= indexes